@@ -0,0 +1,75 @@
+# -*- coding: utf-8 -*-
+
+
+"""
+================================
+Boolean Dynamics Benchmark Setup
+================================
+
+:Author:
+    Moritz Emanuel Beber
+:Date:
+    2026-10-18
+:Copyright:
+    Copyright |c| 2026, Jacobs University Bremen gGmbH, all rights reserved.
+:File:
+    conftest.py
+
+.. |c| unicode:: U+A9
+"""
+
+
+from __future__ import (absolute_import, unicode_literals)
+
+
+import numpy as np
+import networkx as nx
+import pytest
+
+import booleandynamics as bd
+
+
+# number of nodes in the benchmarked networks
+SIZES = [100, 1000, 10000]
+# average number of regulatory links per node
+DENSITIES = [2, 8]
+
+
+def regulatory_network(num_nodes, density, seed=1):
+    """
+    Random regulatory network with equal numbers of activating and inhibiting
+    links and self-inhibition of every node.
+    """
+    rnd = np.random.RandomState(seed)
+    net = nx.gnm_random_graph(num_nodes, num_nodes * density, seed=seed,
+            directed=True)
+    functions = rnd.choice([-1, 1], size=net.number_of_edges())
+    for ((u, v), func) in zip(list(net.edges()), functions):
+        net[u][v]["function"] = int(func)
+    for node in list(net.nodes()):
+        if not net.has_edge(node, node):
+            net.add_edge(node, node, function=-1)
+    return net
+
+
+@pytest.fixture(scope="session", params=SIZES, ids="N={}".format)
+def num_nodes(request):
+    return request.param
+
+@pytest.fixture(scope="session", params=DENSITIES, ids="k={}".format)
+def density(request):
+    return request.param
+
+@pytest.fixture(scope="session")
+def network(num_nodes, density):
+    return regulatory_network(num_nodes, density)
+
+@pytest.fixture(scope="session")
+def rbn(network):
+    return bd.BooleanDynamics(network, function="function")
+
+@pytest.fixture(scope="session")
+def states(rbn):
+    rnd = np.random.RandomState(2)
+    return rnd.randint(0, 2, rbn.num_nodes).astype(np.ubyte)
+
@@ -0,0 +1,147 @@
+# -*- coding: utf-8 -*-
+
+
+"""
+===========================
+Boolean Dynamics Benchmarks
+===========================
+
+:Author:
+    Moritz Emanuel Beber
+:Date:
+    2026-10-18
+:Copyright:
+    Copyright |c| 2026, Jacobs University Bremen gGmbH, all rights reserved.
+:File:
+    test_dynamics.py
+
+Run with ``pytest benchmarks/`` (requires pytest-benchmark) and compare runs
+with ``--benchmark-autosave`` and ``--benchmark-compare``.
+
+.. |c| unicode:: U+A9
+"""
+
+
+from __future__ import (absolute_import, unicode_literals)
+
+
+import numpy as np
+import pytest
+
+import booleandynamics as bd
+
+from conftest import regulatory_network
+
+
+STEPS = 100
+REPEAT = 10
+WINDOW = 10
+
+
+def test_from_trn(benchmark, network):
+    benchmark(bd.BooleanDynamics, network, function="function")
+
+def test_from_edge_arrays(benchmark, rbn):
+    targets = np.repeat(np.arange(rbn.num_nodes), np.diff(rbn.incidence_ptr))
+    benchmark(bd.BooleanDynamics.from_edge_arrays, rbn.incidence_adj, targets,
+            rbn.incidence_func, rbn.num_nodes)
+
+def test_random_regulatory_dynamics(benchmark, num_nodes, density):
+    num_links = density * num_nodes
+    rbn = benchmark(bd.random_regulatory_dynamics, num_nodes,
+            num_links - num_links // 3, num_links // 3, seed=1)
+    assert rbn.num_nodes == num_nodes
+
+def test_to_networkx(benchmark, rbn):
+    benchmark(rbn.to_networkx, function="function")
+
+def test_time_series(benchmark, rbn, states):
+    series = benchmark(rbn.time_series, STEPS, states=states)
+    assert series.shape == (rbn.num_nodes, STEPS + 1)
+
+@pytest.mark.parametrize("n_threads", [1, 4], ids="threads={}".format)
+def test_run_ensemble(benchmark, rbn, n_threads):
+    initial_states = np.random.default_rng(3).integers(2,
+            size=(4 * REPEAT, rbn.num_nodes), dtype=np.ubyte)
+    benchmark(rbn.run_ensemble, initial_states, STEPS, n_threads=n_threads,
+            asynchronous=True, seed=3)
+
+def test_stitch_series(benchmark, rbn):
+    series = benchmark(bd.stitch_series, rbn, REPEAT, STEPS, seed=3)
+    assert series.shape == (rbn.num_nodes, REPEAT * STEPS)
+
+def test_stitch_window_counts(benchmark, rbn):
+    counts = benchmark(bd.stitch_series, rbn, REPEAT, STEPS, seed=3,
+            window=WINDOW)
+    assert counts.shape == (rbn.num_nodes, REPEAT * STEPS // WINDOW)
+
+
+@pytest.mark.parametrize("rule", ["majority", "threshold"])
+@pytest.mark.parametrize("small", [12, 20], ids="N={}".format)
+def test_state_transition_map(benchmark, small, rule):
+    rbn = bd.BooleanDynamics(regulatory_network(small, 2),
+            function="function")
+    rbn.set_rule(rule)
+    successors = benchmark(rbn.state_transition_map)
+    assert len(successors) == 2 ** small
+
+@pytest.mark.parametrize("small", [12, 20], ids="N={}".format)
+def test_basins_of_attraction(benchmark, small):
+    rbn = bd.BooleanDynamics(regulatory_network(small, 2),
+            function="function")
+    successors = rbn.state_transition_map()
+    (_, _, _, sizes, _) = benchmark(rbn.basins_of_attraction, successors)
+    assert sizes.sum() == 2 ** small
+
+@pytest.mark.parametrize("num_states", [1000, 100000], ids="states={}".format)
+def test_unique_states(benchmark, num_nodes, num_states):
+    states = benchmark(bd.unique_states, num_states, num_nodes, seed=3)
+    assert states.shape == (num_states, num_nodes)
+
+def test_damage_spreading(benchmark, rbn, states):
+    flips = np.arange(0, rbn.num_nodes, max(1, rbn.num_nodes // 100))
+    distances = benchmark(rbn.damage_spreading, states, flips, STEPS)
+    assert distances.shape == (len(flips), STEPS + 1)
+
+def test_derrida_map(benchmark, rbn):
+    (_, means) = benchmark(rbn.derrida_map, num_states=REPEAT, seed=3)
+    assert len(means) <= 32
+
+def test_knockout_screen(benchmark, rbn):
+    nodes = np.arange(0, rbn.num_nodes, max(1, rbn.num_nodes // 10))
+    activity = benchmark(rbn.knockout_screen, REPEAT, STEPS, nodes=nodes,
+            seed=3)
+    assert activity.shape == (len(nodes), rbn.num_nodes)
+
+def test_clamped_copy(benchmark, rbn):
+    def variant():
+        other = rbn.copy()
+        other.clamp(0, 0)
+        other.flip_edge(other.incidence_adj[0], 0)
+        return other
+    benchmark(variant)
+
+def test_reorder(benchmark, rbn):
+    other = rbn.copy()
+
+    def reordered():
+        other.reorder("rcm")
+        return other._kernel()
+
+    (kernel, rank) = benchmark(reordered)
+    assert len(rank) == rbn.num_nodes
+
+@pytest.mark.parametrize("method", [None, "rcm"], ids="order={}".format)
+def test_reordered_time_series(benchmark, method):
+    # a lattice of local links hidden by random node indices whose states do
+    # not fit into the L2 cache
+    num_nodes = 2 ** 21
+    rnd = np.random.default_rng(5)
+    labels = rnd.permutation(num_nodes)
+    targets = np.repeat(np.arange(num_nodes), 3)
+    sources = (targets + np.tile([-1, 1, 7], num_nodes)) % num_nodes
+    rbn = bd.BooleanDynamics.from_edge_arrays(labels[sources], labels[targets],
+            rnd.choice([-1, 1], size=len(targets)), num_nodes, reorder=method)
+    states = rnd.integers(2, size=num_nodes, dtype=np.ubyte)
+    series = benchmark(rbn.time_series, 10, states=states)
+    assert series.shape == (num_nodes, 11)
@@ -0,0 +1,61 @@
+# -*- coding: utf-8 -*-
+
+
+"""
+==================================
+Boolean Dynamics Import Benchmarks
+==================================
+
+:Author:
+    Moritz Emanuel Beber
+:Date:
+    2026-10-18
+:Copyright:
+    Copyright |c| 2026, Jacobs University Bremen gGmbH, all rights reserved.
+:File:
+    test_import.py
+
+.. |c| unicode:: U+A9
+"""
+
+
+from __future__ import (absolute_import, unicode_literals)
+
+
+import sys
+import importlib
+import subprocess
+
+import pytest
+
+import booleandynamics as bd
+
+
+# packages that only the lazily imported layers need
+HEAVY = ["networkx", "sqlalchemy", "pandas"]
+
+
+def run_python(code):
+    return subprocess.check_output([sys.executable, "-c", code])
+
+
+def test_import_core(benchmark):
+    benchmark.pedantic(run_python, args=("import booleandynamics",),
+            rounds=5, iterations=1)
+
+def test_import_all(benchmark):
+    benchmark.pedantic(run_python, args=("import booleandynamics as bd;"\
+            " bd.Job; bd.random_regulatory",), rounds=5, iterations=1)
+
+def test_core_without_heavy_packages():
+    loaded = run_python("import sys; import booleandynamics as bd;"\
+            " bd.BooleanDynamics; bd.SimulationCache;"\
+            " print(' '.join(sorted(sys.modules)))").decode("utf-8").split()
+    assert not set(HEAVY).intersection(loaded)
+
+@pytest.mark.parametrize("module", sorted(bd.LAZY_MODULES))
+def test_lazy_names(module):
+    names = importlib.import_module("booleandynamics." + module).__all__
+    assert sorted(bd.LAZY_MODULES[module]) == sorted(names)
+    for name in names:
+        assert getattr(bd, name) is getattr(getattr(bd, module), name)
@@ -0,0 +1,57 @@
+# -*- coding: utf-8 -*-
+
+
+"""
+===================================
+Boolean Dynamics Utility Benchmarks
+===================================
+
+:Author:
+    Moritz Emanuel Beber
+:Date:
+    2026-10-18
+:Copyright:
+    Copyright |c| 2026, Jacobs University Bremen gGmbH, all rights reserved.
+:File:
+    test_utils.py
+
+.. |c| unicode:: U+A9
+"""
+
+
+from __future__ import (absolute_import, unicode_literals)
+
+
+import pytest
+
+import booleandynamics as bd
+
+
+STEPS = 1000
+WINDOWS = [10, 100]
+
+
+@pytest.fixture(scope="module")
+def series(rbn, states):
+    return rbn.time_series(STEPS - 1, states=states)
+
+
+@pytest.mark.parametrize("size", WINDOWS, ids="window={}".format)
+@pytest.mark.parametrize("norm", ["window", "total"])
+def test_to_expression(benchmark, series, size, norm):
+    expr = benchmark(bd.to_expression, series, size, norm=norm)
+    assert expr.shape == (series.shape[0], STEPS // size)
+
+@pytest.mark.parametrize("size", WINDOWS, ids="window={}".format)
+def test_to_expression_overlap(benchmark, series, size):
+    overlap = size // 2
+    expr = benchmark(bd.to_expression, series, size, overlap=overlap)
+    assert expr.shape == (series.shape[0],
+            (STEPS - size) // (size - overlap) + 1)
+
+
+@pytest.mark.parametrize("size", WINDOWS, ids="window={}".format)
+def test_to_expression_streamed(benchmark, rbn, states, size):
+    expr = benchmark(lambda: bd.to_expression(rbn.iter_series(STEPS - 1,
+            states=states, chunk=STEPS // 10), size))
+    assert expr.shape == (rbn.num_nodes, STEPS // size)
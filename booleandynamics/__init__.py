@@ -21,8 +21,51 @@ Boolean Dynamics on Networks
 
 from __future__ import (absolute_import, unicode_literals)
 
+import sys
+import importlib
+
+from . import (classes, utils, store, cache, profiling)
 from .classes import *
-from .networks import *
-from .models import *
 from .utils import *
+from .store import *
+from .cache import *
+# the generic helpers stage and count stay in booleandynamics.profiling
+from .profiling import (Metrics, recording)
+
+
+# the graph generators need networkx and the job database SQLAlchemy and
+# pandas, those layers are only imported when one of their names is accessed
+LAZY_MODULES = {
+    "networks": ["random_regulatory", "random_regulatory_dynamics",
+            "test_feedback"],
+    "models": ["Base", "Session", "Job", "ControlResult", "JobMetrics",
+            "ResultWriter", "upgrade_schema"]
+}
+
+_LAZY_NAMES = dict((name, module) for (module, names) in LAZY_MODULES.items()
+        for name in names)
+
+__all__ = classes.__all__ + utils.__all__ + store.__all__ + cache.__all__ +\
+        ["Metrics", "recording"] + sorted(_LAZY_NAMES)
+
+
+def __getattr__(name):
+    if name in LAZY_MODULES:
+        return importlib.import_module("." + name, __name__)
+    if name in _LAZY_NAMES:
+        module = importlib.import_module("." + _LAZY_NAMES[name], __name__)
+        value = getattr(module, name)
+        # later lookups do not pass through here
+        globals()[name] = value
+        return value
+    raise AttributeError("module '{}' has no attribute '{}'".format(__name__,
+            name))
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_NAMES) | set(LAZY_MODULES))
+
 
+if sys.version_info < (3, 7):
+    # module level __getattr__ is not supported (PEP 562)
+    from .networks import *
+    from .models import *
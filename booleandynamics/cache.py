@@ -0,0 +1,236 @@
+# -*- coding: utf-8 -*-
+
+
+"""
+======================
+Boolean Dynamics Cache
+======================
+
+:Author:
+    Moritz Emanuel Beber
+:Date:
+    2026-10-18
+:Copyright:
+    Copyright |c| 2026, Jacobs University Bremen gGmbH, all rights reserved.
+:File:
+    cache.py
+
+.. |c| unicode:: U+A9
+"""
+
+
+from __future__ import (absolute_import, unicode_literals)
+
+
+__all__ = ["cache_key", "SimulationCache"]
+
+
+import os
+import io
+import json
+import errno
+import hashlib
+import logging
+
+import numpy as np
+
+from .classes import BooleanDynamics
+from .store import SeriesStore
+
+
+LOGGER = logging.getLogger(__name__)
+LOGGER.addHandler(logging.NullHandler())
+
+
+# rule parameters, clamped nodes, and node ordering stored alongside the
+# topology
+RULE_ARRAYS = ("weights", "thresholds", "truth_tables", "table_ptr",
+        "canalizing", "canalized", "defaults", "clamps", "ordering")
+
+
+def cache_key(**params):
+    """
+    Compute the key of a cache entry from JSON serializable parameters, e.g.,
+    those of a network generator or a simulation.
+    """
+    content = json.dumps(params, sort_keys=True).encode("utf-8")
+    return hashlib.sha1(content).hexdigest()
+
+
+class SimulationCache(object):
+    """
+    Content-addressed cache of network topologies and simulated series on disk.
+
+    Topologies are kept as ``<key>.npz`` files of the CSR arrays and rule
+    parameters, series as ``<key>.bds`` files of a `SeriesStore`. Entries are
+    written under a temporary name and renamed, so several processes can share
+    one directory. Once the total size exceeds the limit, the least recently
+    used entries are removed. Node labels are stored as JSON, networks with
+    other labels, e.g., tuples, are not cached.
+    """
+
+    def __init__(self, directory, max_bytes=2**30):
+        """
+        Parameters
+        ----------
+        directory: str
+            Directory of the cache, created if missing.
+        max_bytes: int (optional)
+            Upper bound on the total size of all entries.
+        """
+        self.directory = directory
+        self.max_bytes = max_bytes
+        try:
+            os.makedirs(directory)
+        except OSError as err:
+            if err.errno != errno.EEXIST:
+                raise
+
+    def _path(self, key, extension):
+        return os.path.join(self.directory, key + extension)
+
+    def _temporary(self, path):
+        return "{}.{:d}.tmp".format(path, os.getpid())
+
+    def _touch(self, path):
+        """
+        Mark an entry as used, returns False if it does not exist.
+        """
+        try:
+            os.utime(path, None)
+        except OSError as err:
+            if err.errno == errno.ENOENT:
+                return False
+            raise
+        return True
+
+    def fetch_network(self, key, build):
+        """
+        Load a cached topology or build and cache it.
+
+        Parameters
+        ----------
+        key: str
+            Key of the entry, see `cache_key`.
+        build: callable
+            Called without arguments on a miss, returns a `BooleanDynamics`.
+
+        Returns
+        -------
+        A `BooleanDynamics` instance.
+        """
+        path = self._path(key, ".npz")
+        if self._touch(path):
+            LOGGER.debug("network cache hit %s", key)
+            return self._load_network(path)
+        rbn = build()
+        try:
+            labels = json.dumps(rbn.nodes)
+        except TypeError:
+            labels = None
+        if labels is None or json.loads(labels) != rbn.nodes:
+            # e.g., tuples would come back as lists
+            LOGGER.warning("network %s is not cached, its node labels are"\
+                    " not JSON types", key)
+            return rbn
+        arrays = dict(incidence_ptr=rbn.incidence_ptr,
+                incidence_adj=rbn.incidence_adj,
+                incidence_func=rbn.incidence_func,
+                rule=np.array(rbn.rule))
+        for name in RULE_ARRAYS:
+            if getattr(rbn, name) is not None:
+                arrays[name] = getattr(rbn, name)
+        if rbn.nodes != list(range(rbn.num_nodes)):
+            # any mix of labels loads without pickle
+            arrays["nodes"] = np.array(labels)
+        tmp = self._temporary(path)
+        with io.open(tmp, "wb") as file_h:
+            np.savez(file_h, **arrays)
+        os.rename(tmp, path)
+        self.evict()
+        return rbn
+
+    def _load_network(self, path):
+        with np.load(path, allow_pickle=False) as arrays:
+            ptr = arrays["incidence_ptr"]
+            num_nodes = len(ptr) - 1
+            nodes = None
+            if "nodes" in arrays:
+                nodes = arrays["nodes"]
+                # earlier entries stored the labels as an array
+                nodes = json.loads(str(nodes)) if nodes.ndim == 0 else\
+                        nodes.tolist()
+            rbn = BooleanDynamics.from_edge_arrays(arrays["incidence_adj"],
+                    np.repeat(np.arange(num_nodes), np.diff(ptr)),
+                    arrays["incidence_func"], num_nodes, nodes=nodes)
+            # restore the rule parameters exactly instead of drawing them
+            rbn.rule = str(arrays["rule"])
+            for name in RULE_ARRAYS:
+                setattr(rbn, name, arrays[name] if name in arrays else None)
+        return rbn
+
+    def fetch_series(self, key, rbn, num_series, steps, simulate, **kw_args):
+        """
+        Open cached series or simulate and cache them.
+
+        Parameters
+        ----------
+        key: str
+            Key of the entry, see `cache_key`.
+        rbn: BooleanDynamics
+            The dynamics whose series are stored.
+        num_series: int
+            The number of series, e.g., repeats.
+        steps: int
+            The number of steps per series, i.e., there are `steps` + 1 time
+            points.
+        simulate: callable
+            Called on a miss with the writable (`num_series` x `steps` + 1 x
+            number of nodes) array to fill, e.g., the `out` argument of
+            `stitch_series`.
+
+        Additional keyword arguments are passed on to `SeriesStore.create`.
+
+        Returns
+        -------
+        A read-only `SeriesStore`.
+        """
+        path = self._path(key, ".bds")
+        if self._touch(path):
+            LOGGER.debug("series cache hit %s", key)
+            return SeriesStore(path)
+        tmp = self._temporary(path)
+        store = SeriesStore.create(tmp, rbn, num_series, steps, **kw_args)
+        simulate(store.series)
+        store.flush()
+        del store
+        os.rename(tmp, path)
+        self.evict()
+        return SeriesStore(path)
+
+    def evict(self):
+        """
+        Remove the least recently used entries until the cache fits its size
+        limit.
+        """
+        entries = list()
+        for name in os.listdir(self.directory):
+            if not (name.endswith(".npz") or name.endswith(".bds")):
+                continue
+            path = os.path.join(self.directory, name)
+            try:
+                info = os.stat(path)
+            except OSError:
+                continue
+            entries.append((info.st_mtime, info.st_size, path))
+        total = sum(size for (_, size, _) in entries)
+        # the most recent entry always stays
+        for (_, size, path) in sorted(entries)[:-1]:
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            LOGGER.debug("evicted %s", path)
+            total -= size
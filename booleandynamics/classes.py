@@ -22,30 +22,155 @@ Boolean Dynamics Classes
 from __future__ import (absolute_import, unicode_literals)
 
 
-__all__ = ["BooleanDynamicsError", "BooleanDynamics"]
+__all__ = ["BooleanDynamicsError", "BooleanDynamics", "unique_states"]
 
 
 import logging
+import numbers
+import multiprocessing
+from multiprocessing.pool import ThreadPool
 
 import numpy as np
 
 from . import _dynamics as dyn
+from . import profiling
 
 
 LOGGER = logging.getLogger(__name__)
 LOGGER.addHandler(logging.NullHandler())
 
 
+UPDATE_SCHEMES = {
+    "synchronous": dyn.UPDATE_SYNCHRONOUS,
+    "sequential": dyn.UPDATE_SEQUENTIAL,
+    "random-sequential": dyn.UPDATE_RANDOM_SEQUENTIAL,
+    "random-single": dyn.UPDATE_RANDOM_SINGLE
+}
+
+RULES = {
+    "majority": dyn.RULE_MAJORITY,
+    "threshold": dyn.RULE_THRESHOLD,
+    "truth-table": dyn.RULE_TRUTH_TABLE,
+    "canalizing": dyn.RULE_CANALIZING
+}
+
+# largest in-degree for which complete truth tables are stored
+MAX_TABLE_INPUTS = 30
+
+# largest network whose state space is enumerated, state ids are uint32
+MAX_STATE_SPACE_NODES = 31
+
+# distinct states are sampled by id if there are at most this many states per
+# requested one, otherwise random states rarely collide
+SAMPLE_BY_ID = 64
+
+
 class BooleanDynamicsError(Exception):
     pass
 
 
+def _seed_sequence(seed):
+    """
+    Turn an integer seed, a numpy.random.Generator, or None into a
+    numpy.random.SeedSequence from which independent child streams are spawned.
+    """
+    if isinstance(seed, np.random.SeedSequence):
+        return seed
+    if isinstance(seed, np.random.Generator):
+        # advances the generator so that repeated calls spawn new streams
+        return np.random.SeedSequence(seed.integers(np.iinfo(np.uint32).max,
+                size=4, dtype=np.uint32, endpoint=True))
+    return np.random.SeedSequence(seed)
+
+def _map_slices(func, num_items, n_threads, align=1):
+    """
+    Call `func` with (start, stop) bounds of contiguous slices of items on a
+    pool of threads. Inner bounds are multiples of `align`.
+
+    The compiled kernels release the GIL, so the threads run in parallel while
+    sharing all read-only data.
+    """
+    num_blocks = -(-num_items // align)
+    n_threads = min(n_threads, num_blocks)
+    if n_threads <= 1:
+        if num_items > 0:
+            func((0, num_items))
+        return
+    limits = np.minimum(np.linspace(0, num_blocks, n_threads + 1).astype(int) *
+            align, num_items)
+    pool = ThreadPool(n_threads)
+    try:
+        pool.map(func, list(zip(limits[:-1].tolist(), limits[1:].tolist())))
+    finally:
+        pool.close()
+        pool.join()
+
+def _kernel_streams(seed, num_streams):
+    """
+    Spawn one random number generator state for the compiled kernels per
+    trajectory.
+    """
+    children = _seed_sequence(seed).spawn(num_streams)
+    return np.concatenate([child.generate_state(4, np.uint64)
+            for child in children])
+
+def unique_states(num_states, num_nodes, seed=None):
+    """
+    Draw distinct random ON/OFF states.
+
+    Small state spaces are sampled without replacement by integer id. Otherwise
+    states are drawn in bulk as packed bytes, duplicates are removed on that
+    compact representation, and only the missing states are drawn again.
+
+    Parameters
+    ----------
+    num_states: int
+        The number of distinct states.
+    num_nodes: int
+        The number of nodes per state.
+    seed: int, numpy.random.Generator, or numpy.random.SeedSequence (optional)
+        Source of randomness.
+
+    Returns
+    -------
+    A ubyte array of shape (`num_states` x `num_nodes`) in the order drawn.
+    """
+    if num_nodes < 63 and num_states > 2 ** num_nodes:
+        raise BooleanDynamicsError("cannot draw {:d} distinct states of {:d}"\
+                " nodes, there are only {:d}".format(num_states, num_nodes,
+                2 ** num_nodes))
+    rng = np.random.default_rng(_seed_sequence(seed))
+    if num_nodes < 63 and 2 ** num_nodes <= SAMPLE_BY_ID * num_states:
+        ids = rng.choice(2 ** num_nodes, size=num_states, replace=False)
+        return ((ids[:, np.newaxis] >> np.arange(num_nodes)) & 1).astype(
+                np.ubyte)
+    num_bytes = -(-num_nodes // 8)
+    # unused high bits of the last byte are cleared
+    mask = np.uint8((1 << (num_nodes - 8 * (num_bytes - 1))) - 1)
+    packed = np.zeros((0, num_bytes), dtype=np.uint8)
+    while len(packed) < num_states:
+        draw = rng.integers(256, size=(num_states - len(packed), num_bytes),
+                dtype=np.uint8)
+        draw[:, -1] &= mask
+        packed = np.concatenate([packed, draw])
+        # one opaque item per state, the first occurrences are kept in order
+        rows = packed.view(np.dtype((np.void, num_bytes))).ravel()
+        (_, index) = np.unique(rows, return_index=True)
+        packed = packed[np.sort(index)]
+    return np.unpackbits(packed, axis=1, count=num_nodes, bitorder="little")
+
+
 class BooleanDynamics(object):
     """
     """
 
-    def __init__(self, net, node2id=None, function="regulatory"):
+    def __init__(self, net=None, node2id=None, function="regulatory",
+            rule="majority", reorder=None, **kw_args):
         """
+        Without a network the instance stays empty, see the alternative
+        constructors `from_edge_arrays` and `from_scipy_sparse`. The nodes are
+        renumbered internally with the `reorder` method if given, see
+        `reorder`. Additional keyword arguments are passed on to `set_rule`.
         """
         self.num_nodes = None
         self.nodes = None
@@ -53,7 +178,124 @@ class BooleanDynamics(object):
         self.incidence_ptr = None
         self.incidence_adj = None
         self.incidence_func = None
-        self.from_trn(net, node2id, function)
+        self.rule = None
+        self.weights = None
+        self.thresholds = None
+        self.truth_tables = None
+        self.table_ptr = None
+        self.canalizing = None
+        self.canalized = None
+        self.defaults = None
+        self.clamps = None
+        self.ordering = None
+        self._reordered = None
+        if net is not None:
+            self.from_trn(net, node2id, function)
+            self.set_rule(rule, **kw_args)
+            if reorder is not None:
+                self.reorder(reorder)
+
+    @classmethod
+    def from_edge_arrays(cls, sources, targets, functions, num_nodes,
+            nodes=None, rule="majority", reorder=None, **kw_args):
+        """
+        Prepare data structures for boolean dynamics from arrays of links.
+
+        Parameters
+        ----------
+        sources: iterable
+            Index of the regulating node of each link.
+        targets: iterable
+            Index of the regulated node of each link.
+        functions: iterable
+            Integer regulatory function of each link, e.g., 1 for activating and
+            -1 for inhibiting.
+        num_nodes: int
+            The number of nodes, indices run from 0 to (`num_nodes` - 1).
+        nodes: list (optional)
+            Node labels in the order of their indices (default: indices).
+        rule: str (optional)
+            The update rule, additional keyword arguments are passed on to
+            `set_rule`.
+        reorder: str (optional)
+            Renumber the nodes internally, see `reorder`.
+        """
+        rbn = cls()
+        rbn._build_incidence(sources, targets, functions, num_nodes, nodes)
+        rbn.set_rule(rule, **kw_args)
+        if reorder is not None:
+            rbn.reorder(reorder)
+        return rbn
+
+    @classmethod
+    def from_scipy_sparse(cls, matrix, nodes=None, rule="majority",
+            reorder=None, **kw_args):
+        """
+        Prepare data structures for boolean dynamics from a sparse matrix.
+
+        Parameters
+        ----------
+        matrix: scipy.sparse matrix
+            Square matrix whose explicitly stored entry at row ``u`` and column
+            ``v`` is the integer regulatory function of the link from node
+            ``u`` to node ``v``.
+        nodes: list (optional)
+            Node labels in the order of the rows (default: indices).
+        rule: str (optional)
+            The update rule, additional keyword arguments are passed on to
+            `set_rule`.
+        reorder: str (optional)
+            Renumber the nodes internally, see `reorder`.
+        """
+        (num_rows, num_cols) = matrix.shape
+        if num_rows != num_cols:
+            raise BooleanDynamicsError("adjacency matrix must be square")
+        # the compressed columns already are the incoming links per node, a
+        # copy such that removing explicit zeros leaves the caller's matrix
+        csc = matrix.tocsc(copy=True)
+        csc.eliminate_zeros()
+        rbn = cls()
+        rbn._set_incidence(csc.indptr, csc.indices, csc.data, num_rows, nodes)
+        rbn.set_rule(rule, **kw_args)
+        if reorder is not None:
+            rbn.reorder(reorder)
+        return rbn
+
+    def _set_incidence(self, inc_ptr, inc_adj, inc_func, num_nodes,
+            nodes=None):
+        if nodes is None:
+            nodes = list(range(num_nodes))
+        elif len(nodes) != num_nodes:
+            raise BooleanDynamicsError("expected {:d} node labels".format(
+                    num_nodes))
+        self.num_nodes = num_nodes
+        self.nodes = list(nodes)
+        self.node2id = dict(zip(self.nodes, range(num_nodes)))
+        # own copies since topology edits modify them in place
+        self.incidence_ptr = np.array(inc_ptr, dtype=np.int32)
+        self.incidence_adj = np.array(inc_adj, dtype=np.int32)
+        self.incidence_func = np.array(inc_func, dtype=np.int32)
+        self.clamps = None
+        self.ordering = None
+        self._reordered = None
+
+    def _build_incidence(self, sources, targets, functions, num_nodes,
+            nodes=None):
+        sources = np.asarray(sources, dtype=np.int32)
+        targets = np.asarray(targets, dtype=np.int32)
+        functions = np.asarray(functions, dtype=np.int32)
+        if not (len(sources) == len(targets) == len(functions)):
+            raise BooleanDynamicsError("link arrays must have the same length")
+        if len(sources) > 0 and (min(sources.min(), targets.min()) < 0 or
+                max(sources.max(), targets.max()) >= num_nodes):
+            raise BooleanDynamicsError("node indices must lie in [0, {:d})"\
+                    .format(num_nodes))
+        # a stable sort keeps the given order of links per target
+        order = np.argsort(targets, kind="mergesort")
+        inc_ptr = np.zeros(num_nodes + 1, dtype=np.int32)
+        np.cumsum(np.bincount(targets, minlength=num_nodes), out=inc_ptr[1:])
+        self._set_incidence(inc_ptr, sources[order], functions[order],
+                num_nodes, nodes)
 
     def from_trn(self, trn, node2id=None, function="regulatory"):
         """
@@ -70,39 +312,513 @@ class BooleanDynamics(object):
             In case of a DiGraph, the keyword for edge data that describes the
             regulatory function. For a MultiDiGraph the key is used.
         """
-        if len(trn) < 2 or trn.size() < 2:
+        if len(trn) < 2:
             raise BooleanDynamicsError("aborting due to small network size")
-        self.nodes = sorted(trn.nodes())
-        self.num_nodes = len(self.nodes)
-        if node2id is None:
-            self.node2id = {n: i for (i, n) in enumerate(self.nodes)}
+        nodes = list(trn.nodes())
+        num_nodes = len(nodes)
+        if node2id is not None:
+            if sorted(node2id.values()) != list(range(num_nodes)) or\
+                    any(node not in node2id for node in nodes):
+                raise BooleanDynamicsError("node2id must map every node to"\
+                        " a distinct index from 0 to {:d}".format(
+                        num_nodes - 1))
+            nodes = sorted(node2id, key=node2id.get)
         else:
-            self.node2id = node2id
-        self.incidence_ptr = np.zeros(self.num_nodes + 1, dtype=np.int32)
-        self.incidence_adj = np.zeros(trn.size(), dtype=np.int32)
-        self.incidence_func = np.zeros(trn.size(), dtype=np.int32)
+            labels = np.asarray(nodes)
+            if labels.ndim == 1 and labels.dtype.kind in "biuf":
+                nodes = np.sort(labels).tolist()
+            else:
+                nodes = sorted(nodes)
+        # walk the predecessor adjacency directly, much faster than edge views
         if trn.is_multigraph():
-            for n in self.nodes:
-                i = self.node2id[n]
-                i_ptr = self.incidence_ptr[i]
-                in_edges = trn.in_edges(n, keys=True)
-                self.incidence_ptr[i + 1] = i_ptr + len(in_edges)
-                for (j_ptr, (u, v, k)) in enumerate(in_edges, start=i_ptr):
-                    j = self.node2id[u]
-                    self.incidence_adj[j_ptr] = j
-                    self.incidence_func[j_ptr] = k
+            links = [(u, v, k) for (v, pred) in trn.pred.items()
+                    for (u, keys) in pred.items() for k in keys]
         else:
-            for n in self.nodes:
-                i = self.node2id[n]
-                i_ptr = self.incidence_ptr[i]
-                in_edges = trn.in_edges(n, data=True)
-                self.incidence_ptr[i + 1] = i_ptr + len(in_edges)
-                for (j_ptr, (u, v, data)) in enumerate(in_edges, start=i_ptr):
-                    j = self.node2id[u]
-                    self.incidence_adj[j_ptr] = j
-                    self.incidence_func[j_ptr] = data[function]
-
-    def time_series(self, steps, states=None, asynchronous=False, seed=None):
+            links = [(u, v, data[function]) for (v, pred) in trn.pred.items()
+                    for (u, data) in pred.items()]
+        if len(links) < 2:
+            raise BooleanDynamicsError("aborting due to small network size")
+        functions = [func for (_, _, func) in links]
+        if node2id is None and nodes == list(range(num_nodes)):
+            # labels already are the indices
+            sources = [u for (u, _, _) in links]
+            targets = [v for (_, v, _) in links]
+        else:
+            if node2id is None:
+                node2id = dict(zip(nodes, range(num_nodes)))
+            sources = [node2id[u] for (u, _, _) in links]
+            targets = [node2id[v] for (_, v, _) in links]
+        self._build_incidence(sources, targets, functions, num_nodes, nodes)
+        if node2id is not None:
+            self.node2id = node2id
+
+    def to_networkx(self, function="regulatory", multigraph=False):
+        """
+        Build the regulatory network described by the incidence structure.
+
+        Parameters
+        ----------
+        function: hashable (optional)
+            In case of a DiGraph, the keyword for edge data that describes the
+            regulatory function.
+        multigraph: bool (optional)
+            Return a MultiDiGraph that stores the regulatory function as the
+            key of each link instead.
+
+        Returns
+        -------
+        A networkx DiGraph or MultiDiGraph with the labels in `nodes`.
+        """
+        import networkx as nx
+
+        targets = np.repeat(np.arange(self.num_nodes),
+                np.diff(self.incidence_ptr))
+        sources = [self.nodes[u] for u in self.incidence_adj.tolist()]
+        targets = [self.nodes[v] for v in targets.tolist()]
+        functions = self.incidence_func.tolist()
+        if multigraph:
+            net = nx.MultiDiGraph()
+            net.add_nodes_from(self.nodes)
+            net.add_edges_from(zip(sources, targets, functions))
+        else:
+            net = nx.DiGraph()
+            net.add_nodes_from(self.nodes)
+            net.add_edges_from((u, v, {function: func}) for (u, v, func) in
+                    zip(sources, targets, functions))
+        return net
+
+    def set_rule(self, rule, weights=None, thresholds=None, tables=None,
+            canalizing=None, canalized=None, defaults=None, bias=0.5,
+            seed=None):
+        """
+        Choose the compiled rule by which nodes update their state.
+
+        All per link arguments follow the order of `incidence_adj`, i.e., the
+        predecessors of node ``i`` are
+        ``incidence_adj[incidence_ptr[i]:incidence_ptr[i + 1]]``.
+
+        Parameters
+        ----------
+        rule: str
+            One of 'majority' (signed sum of the active inputs weighted by
+            `incidence_func`), 'threshold' (weighted sum of the active inputs
+            compared with a threshold per node), 'truth-table' (Kauffman style
+            lookup table per node), or 'canalizing' (nested canalizing
+            functions). For 'majority' and 'threshold' a node keeps its state
+            if the sum equals the threshold.
+        weights: iterable (optional)
+            Real valued weight per link for the 'threshold' rule (default:
+            `incidence_func`).
+        thresholds: iterable (optional)
+            Threshold per node for the 'threshold' rule (default: 0).
+        tables: iterable (optional)
+            For the 'truth-table' rule, one sequence of 2^k ON/OFF outputs per
+            node with k predecessors. The state of the j-th predecessor is
+            bit j of the index into the table. Drawn at random if missing.
+        canalizing: iterable (optional)
+            For the 'canalizing' rule, the input value per link that determines
+            the output of its target. The first canalizing input in the order of
+            the predecessors wins. Drawn at random if missing.
+        canalized: iterable (optional)
+            For the 'canalizing' rule, the output value per link when its input
+            is canalizing. Drawn at random if missing.
+        defaults: iterable (optional)
+            For the 'canalizing' rule, the output per node if no input is
+            canalizing (default: opposite of the last canalized value).
+        bias: float (optional)
+            Probability of an ON output in random truth tables.
+        seed: int, numpy.random.Generator, or numpy.random.SeedSequence
+                (optional)
+            Source of randomness for drawing rule parameters.
+        """
+        if rule not in RULES:
+            raise BooleanDynamicsError("unknown rule '{}'".format(rule))
+        self._reordered = None
+        num_links = len(self.incidence_adj)
+        in_degree = np.diff(self.incidence_ptr)
+        rng = np.random.default_rng(seed)
+        self.weights = None
+        self.thresholds = None
+        self.truth_tables = None
+        self.table_ptr = None
+        self.canalizing = None
+        self.canalized = None
+        self.defaults = None
+        if rule == "threshold":
+            if weights is None:
+                weights = self.incidence_func
+            self.weights = np.array(weights, dtype=np.double)
+            if thresholds is None:
+                thresholds = np.zeros(self.num_nodes)
+            self.thresholds = np.array(thresholds, dtype=np.double)
+            if len(self.weights) != num_links or\
+                    len(self.thresholds) != self.num_nodes:
+                raise BooleanDynamicsError("expected one weight per link and"\
+                        " one threshold per node")
+        elif rule == "truth-table":
+            if in_degree.max() > MAX_TABLE_INPUTS:
+                raise BooleanDynamicsError("truth tables are limited to {:d}"\
+                        " inputs".format(MAX_TABLE_INPUTS))
+            # every table occupies at least one 64 bit word
+            sizes = np.left_shift(1, in_degree.astype(np.int64))
+            num_words = (sizes + 63) // 64
+            self.table_ptr = np.zeros(self.num_nodes + 1, dtype=np.int64)
+            np.cumsum(num_words, out=self.table_ptr[1:])
+            bits = np.zeros(self.table_ptr[-1] * 64, dtype=np.ubyte)
+            for i in range(self.num_nodes):
+                if tables is None:
+                    table = (rng.random(sizes[i]) < bias)
+                else:
+                    table = np.asarray(tables[i], dtype=np.ubyte)
+                    if len(table) != sizes[i]:
+                        raise BooleanDynamicsError("truth table of node {:d}"\
+                                " must have {:d} entries".format(i, sizes[i]))
+                start = self.table_ptr[i] * 64
+                bits[start:start + sizes[i]] = table
+            self.truth_tables = np.packbits(bits, bitorder="little").view(
+                    "<u8").astype(np.uint64)
+        elif rule == "canalizing":
+            if canalizing is None:
+                canalizing = rng.integers(2, size=num_links)
+            self.canalizing = np.array(canalizing, dtype=np.ubyte)
+            if canalized is None:
+                canalized = rng.integers(2, size=num_links)
+            self.canalized = np.array(canalized, dtype=np.ubyte)
+            if len(self.canalizing) != num_links or\
+                    len(self.canalized) != num_links:
+                raise BooleanDynamicsError("expected one canalizing input and"\
+                        " output per link")
+            if defaults is None:
+                defaults = np.zeros(self.num_nodes, dtype=np.ubyte)
+                has_input = (in_degree > 0)
+                defaults[has_input] = 1 - self.canalized[
+                        self.incidence_ptr[1:][has_input] - 1]
+            self.defaults = np.array(defaults, dtype=np.ubyte)
+            if len(self.defaults) != self.num_nodes:
+                raise BooleanDynamicsError("expected one default output per"\
+                        " node")
+        self.rule = rule
+
+    def copy(self):
+        """
+        Return an independent copy, e.g., as the starting point of a
+        structural variant.
+        """
+        other = self.__class__()
+        for (name, value) in self.__dict__.items():
+            if isinstance(value, np.ndarray):
+                value = value.copy()
+            elif isinstance(value, (list, dict)):
+                value = type(value)(value)
+            setattr(other, name, value)
+        return other
+
+    def clamp(self, nodes, value):
+        """
+        Hold nodes at a fixed state regardless of their inputs, e.g., OFF for a
+        knockout or ON for overexpression. Initial states are overridden, too.
+
+        Parameters
+        ----------
+        nodes: int or iterable
+            Node indices, see `node2id`.
+        value: int or iterable
+            The state (0 or 1) of all or of each of the nodes.
+        """
+        nodes = np.atleast_1d(np.asarray(nodes, dtype=np.int64))
+        if ((nodes < 0) | (nodes >= self.num_nodes)).any():
+            raise BooleanDynamicsError("clamped nodes must be node indices")
+        if self.clamps is None:
+            self.clamps = np.full(self.num_nodes, -1, dtype=np.int8)
+        self.clamps[nodes] = (np.asarray(value) != 0)
+        self._reordered = None
+
+    def release(self, nodes=None):
+        """
+        Let clamped nodes follow their rule again, by default all of them.
+        """
+        if self.clamps is None:
+            return
+        self._reordered = None
+        if nodes is None:
+            self.clamps = None
+            return
+        self.clamps[np.asarray(nodes, dtype=np.int64)] = -1
+        if (self.clamps < 0).all():
+            self.clamps = None
+
+    def _link(self, source, target):
+        """
+        Find the position of the first link from `source` to `target` in the
+        incidence arrays.
+        """
+        begin = self.incidence_ptr[target]
+        positions = np.flatnonzero(self.incidence_adj[begin:
+                self.incidence_ptr[target + 1]] == source)
+        if len(positions) == 0:
+            raise BooleanDynamicsError("there is no link from {:d} to {:d}"\
+                    .format(source, target))
+        return (begin + positions[0], positions[0])
+
+    def _table(self, node):
+        """
+        The truth table of a node as ON/OFF outputs.
+        """
+        words = self.truth_tables[self.table_ptr[node]:
+                self.table_ptr[node + 1]]
+        bits = np.unpackbits(words.astype("<u8").view(np.uint8),
+                bitorder="little")
+        return bits[:2 ** (self.incidence_ptr[node + 1] -
+                self.incidence_ptr[node])]
+
+    def _set_table(self, node, table):
+        """
+        Replace the truth table of a node, its size may change.
+        """
+        padded = np.zeros(-(-len(table) // 64) * 64, dtype=np.ubyte)
+        padded[:len(table)] = table
+        words = np.packbits(padded, bitorder="little").view("<u8").astype(
+                np.uint64)
+        (begin, end) = (self.table_ptr[node], self.table_ptr[node + 1])
+        self.truth_tables = np.concatenate([self.truth_tables[:begin], words,
+                self.truth_tables[end:]])
+        self.table_ptr[node + 1:] += len(words) - (end - begin)
+
+    def flip_edge(self, source, target):
+        """
+        Turn the first link from `source` to `target` from activating into
+        inhibiting or vice versa.
+
+        Only the parameters of that link are patched. Under the 'canalizing'
+        rule the canalizing input value is inverted and under the
+        'truth-table' rule the table of the target reads the inverted input.
+
+        Parameters
+        ----------
+        source: int
+            Index of the regulating node.
+        target: int
+            Index of the regulated node.
+        """
+        (link, position) = self._link(source, target)
+        self._reordered = None
+        self.incidence_func[link] = -self.incidence_func[link]
+        if self.rule == "threshold":
+            self.weights[link] = -self.weights[link]
+        elif self.rule == "canalizing":
+            self.canalizing[link] = 1 - self.canalizing[link]
+        elif self.rule == "truth-table":
+            table = self._table(target)
+            self._set_table(target, table[np.arange(len(table)) ^
+                    (1 << position)])
+
+    def remove_edge(self, source, target):
+        """
+        Remove the first link from `source` to `target`.
+
+        The link is cut out of the incidence arrays and the per link rule
+        parameters. The truth table of the target keeps the outputs for an OFF
+        input, i.e., the input is treated as absent.
+
+        Parameters
+        ----------
+        source: int
+            Index of the regulating node.
+        target: int
+            Index of the regulated node.
+        """
+        (link, position) = self._link(source, target)
+        self._reordered = None
+        if self.rule == "truth-table":
+            table = self._table(target)
+            self._set_table(target, table[(np.arange(len(table)) >>
+                    position) & 1 == 0])
+        self.incidence_adj = np.delete(self.incidence_adj, link)
+        self.incidence_func = np.delete(self.incidence_func, link)
+        self.incidence_ptr[target + 1:] -= 1
+        if self.weights is not None:
+            self.weights = np.delete(self.weights, link)
+        if self.canalizing is not None:
+            self.canalizing = np.delete(self.canalizing, link)
+            self.canalized = np.delete(self.canalized, link)
+
+    def reorder(self, method="rcm"):
+        """
+        Renumber the nodes internally such that the states read by each node
+        lie close together in memory.
+
+        The compiled kernels gather the states of all inputs of a node in every
+        update. On large sparse networks with arbitrary node indices those
+        reads are scattered over the whole state array. The public arrays,
+        `node2id`, and all arguments and results of the simulation methods keep
+        the original node order, only the kernels see renumbered copies of the
+        topology which are rebuilt after edits through the methods of this
+        class.
+
+        Deterministic dynamics are unaffected by the renumbering. Random update
+        schemes draw their node orders over the internal indices, i.e., the
+        same seed produces different but equally distributed trajectories.
+        Arranging the states in and out of the internal order costs a little
+        time per call, such that only networks whose states exceed the CPU
+        caches and whose links are mostly local benefit.
+
+        Parameters
+        ----------
+        method: str (optional)
+            'rcm' for the reverse Cuthill-McKee ordering of the undirected
+            links, 'degree' for decreasing total degree, or None to restore
+            the original order.
+        """
+        self._reordered = None
+        if method is None:
+            self.ordering = None
+            return
+        if method == "degree":
+            targets = np.repeat(np.arange(self.num_nodes, dtype=np.int32),
+                    np.diff(self.incidence_ptr))
+            mask = (self.incidence_adj != targets)
+            degree = np.bincount(self.incidence_adj[mask],
+                    minlength=self.num_nodes) + np.bincount(targets[mask],
+                    minlength=self.num_nodes)
+            ordering = np.argsort(-degree, kind="mergesort")
+        elif method == "rcm":
+            ordering = dyn.cuthill_mckee(self.incidence_ptr,
+                    np.append(self.incidence_adj, 0).astype(np.int32),
+                    np.empty(self.num_nodes, dtype=np.int32))
+            ordering = np.asarray(ordering)[::-1]
+        else:
+            raise BooleanDynamicsError("unknown node ordering '{}'".format(
+                    method))
+        LOGGER.debug("reordered %d nodes with %d links by '%s'",
+                self.num_nodes, len(self.incidence_adj), method)
+        self.ordering = np.ascontiguousarray(ordering, dtype=np.int32)
+
+    def _kernel(self):
+        """
+        The instance whose arrays the compiled kernels see and the position of
+        each node in it.
+        """
+        if self.ordering is None:
+            return (self, None)
+        if self._reordered is not None:
+            return self._reordered
+        order = self.ordering
+        rank = np.empty(self.num_nodes, dtype=np.int32)
+        rank[order] = np.arange(self.num_nodes, dtype=np.int32)
+        in_degree = np.diff(self.incidence_ptr)[order]
+        ptr = np.zeros(self.num_nodes + 1, dtype=np.int32)
+        np.cumsum(in_degree, out=ptr[1:])
+        # the links of each node keep their order such that truth tables and
+        # canalizing inputs stay valid
+        links = np.repeat(self.incidence_ptr[order] - ptr[:-1], in_degree) +\
+                np.arange(ptr[-1])
+        kernel = self.__class__()
+        kernel._set_incidence(ptr, rank[self.incidence_adj[links]],
+                self.incidence_func[links], self.num_nodes)
+        kernel.rule = self.rule
+        for name in ("weights", "canalizing", "canalized"):
+            if getattr(self, name) is not None:
+                setattr(kernel, name, getattr(self, name)[links])
+        for name in ("thresholds", "defaults", "clamps"):
+            if getattr(self, name) is not None:
+                setattr(kernel, name, getattr(self, name)[order])
+        if self.truth_tables is not None:
+            num_words = np.diff(self.table_ptr)[order]
+            kernel.table_ptr = np.zeros(self.num_nodes + 1, dtype=np.int64)
+            np.cumsum(num_words, out=kernel.table_ptr[1:])
+            kernel.truth_tables = self.truth_tables[np.repeat(
+                    self.table_ptr[order] - kernel.table_ptr[:-1],
+                    num_words) + np.arange(kernel.table_ptr[-1])]
+        self._reordered = (kernel, rank)
+        return self._reordered
+
+    def _to_kernel(self, states):
+        """
+        Arrange states whose last axis are nodes in the internal order.
+        """
+        if self.ordering is None:
+            return states
+        return np.ascontiguousarray(states[..., self.ordering])
+
+    def _from_kernel(self, array):
+        """
+        Restore the original node order along the last axis in place.
+        """
+        if self.ordering is None:
+            return array
+        rank = self._kernel()[1].astype(np.intp)
+        rows = array.reshape((-1, self.num_nodes))
+        # blocks of rows limit the temporary copy of large series
+        block = max(1, 2 ** 16 // self.num_nodes)
+        buffer = np.empty((block, self.num_nodes), dtype=array.dtype)
+        for start in range(0, len(rows), block):
+            chunk = rows[start:start + block]
+            np.take(chunk, rank, axis=1, out=buffer[:len(chunk)])
+            chunk[:] = buffer[:len(chunk)]
+        return array
+
+    def _network(self):
+        """
+        Bundle topology and rule parameters for the compiled kernels.
+        """
+        def dummy(value, dtype):
+            # the kernels never access parameters of other rules
+            if value is None:
+                return np.zeros(1, dtype=dtype)
+            return value
+
+        return dyn.Network(self.num_nodes, self.incidence_ptr,
+                self.incidence_adj, self.incidence_func, RULES[self.rule],
+                dummy(self.weights, np.double),
+                dummy(self.thresholds, np.double),
+                dummy(self.truth_tables, np.uint64),
+                dummy(self.table_ptr, np.int64),
+                dummy(self.canalizing, np.ubyte),
+                dummy(self.canalized, np.ubyte),
+                dummy(self.defaults, np.ubyte), self.clamps)
+
+    def _count(self, num_steps, num_bytes):
+        """
+        Report simulated steps, evaluated links, and allocated bytes to the
+        metrics being recorded.
+        """
+        profiling.count("steps", num_steps)
+        profiling.count("edges", num_steps * len(self.incidence_adj))
+        profiling.count("bytes", num_bytes)
+
+    def _update_scheme(self, asynchronous, order, seed, num_streams,
+            internal=False):
+        """
+        Translate the update arguments into what the compiled kernels expect,
+        with `internal` for the renumbered nodes of `reorder`.
+        """
+        if asynchronous is False:
+            asynchronous = "synchronous"
+        elif asynchronous is True:
+            asynchronous = "random-sequential"
+        try:
+            mode = UPDATE_SCHEMES[asynchronous]
+        except KeyError:
+            raise BooleanDynamicsError("unknown update scheme '{}'".format(
+                    asynchronous))
+        if order is None:
+            order = np.arange(self.num_nodes, dtype=np.int32)
+        else:
+            order = np.ascontiguousarray(order, dtype=np.int32)
+            if not np.array_equal(np.sort(order), np.arange(self.num_nodes)):
+                raise BooleanDynamicsError("update order must be a"\
+                        " permutation of the node indices")
+        if internal and self.ordering is not None:
+            order = self._kernel()[1][order]
+        if mode in (dyn.UPDATE_RANDOM_SEQUENTIAL, dyn.UPDATE_RANDOM_SINGLE):
+            rng_states = _kernel_streams(seed, max(num_streams, 1))
+        else:
+            # deterministic schemes never touch the generators
+            rng_states = np.zeros(4 * max(num_streams, 1), dtype=np.uint64)
+        return (mode, order, rng_states)
+
+    def time_series(self, steps, states=None, asynchronous=False, seed=None,
+            detect_cycle=False, order=None, window=None):
         """
         Follow the ON/OFF states of all nodes for a number of time steps.
 
@@ -112,27 +828,816 @@ class BooleanDynamics(object):
             Number of steps in the time series.
         states: bool (optional)
             Provide initial ON/OFF states for each node.
-        asynchronous: bool (optional)
-            Switch between a synchronous (default) and an asynchronous state update.
-        seed: hashable (optional)
-            Set the state of the seed for the random number generator.
+        asynchronous: bool or str (optional)
+            Switch between a synchronous (default) and an asynchronous state
+            update. Asynchronous schemes are 'sequential' (fixed order),
+            'random-sequential' (new random order every step, same as True),
+            and 'random-single' (as many updates of uniformly drawn nodes as
+            there are nodes per step).
+        seed: int, numpy.random.Generator, or numpy.random.SeedSequence
+                (optional)
+            Source of randomness for the initial states and the asynchronous
+            update. Separate child streams are spawned for both, the global
+            numpy state is never touched.
+        detect_cycle: bool (optional)
+            Stop computing new states once the trajectory repeats a state and
+            fill the remaining time points with copies of the cycle instead.
+            Not available with random update schemes.
+        order: iterable (optional)
+            Permutation of node indices used by the 'sequential' scheme
+            (default: increasing indices).
+        window: int (optional)
+            Only count the ON states per node in consecutive windows of this
+            size instead of returning the series. Equivalent to
+            ``window_counts(series, window)`` without ever storing the series.
 
         Returns
         -------
         A two dimensional array, where the first dimension corresponds to the
         nodes and the second to the time points. The number of time points is
         `steps` + 1, i.e., initial state and all time steps.
+
+        If `window` is given, a two dimensional array of counts, where the
+        first dimension corresponds to the nodes and the second to the
+        complete windows.
+
+        If `detect_cycle` is true, a triple of the above series, the time point
+        at which the cycle was first entered, and the length of the cycle is
+        returned instead. The latter two are None if no state repeated.
         """
         steps = steps + 1
-        if seed is not None:
-            np.random.seed(seed)
+        (states, update_seed) = self._initial_states(states, seed)
+        if window is not None:
+            return self.ensemble_series(states[np.newaxis, :], steps - 1,
+                    detect_cycle=detect_cycle, asynchronous=asynchronous,
+                    seed=update_seed, order=order, window=window)
+        (mode, order, rng_state) = self._update_scheme(asynchronous, order,
+                update_seed, 1, internal=True)
+        if detect_cycle and mode in (dyn.UPDATE_RANDOM_SEQUENTIAL,
+                dyn.UPDATE_RANDOM_SINGLE):
+            raise BooleanDynamicsError("cannot detect cycles of random"\
+                    " asynchronous updates")
+        series = np.empty(self.num_nodes * steps, dtype=np.ubyte)
+        (transient, period) = dyn.time_series(self._kernel()[0]._network(),
+                self._to_kernel(states), series, steps, mode, order,
+                rng_state, detect_cycle)
+        self._count(steps - 1 if period == 0 else
+                min(steps - 1, transient + period), series.nbytes)
+        series = self._from_kernel(series.reshape((steps, self.num_nodes))).T
+        if detect_cycle:
+            if period == 0:
+                return (series, None, None)
+            return (series, transient, period)
+        return series
+
+    def iter_series(self, steps, states=None, chunk=1024, asynchronous=False,
+            seed=None, order=None):
+        """
+        Follow the ON/OFF states of all nodes like `time_series` but yield the
+        series in chunks of time points.
+
+        Only one chunk is held in memory at any time. The compiled kernel
+        resumes from the last state and random stream position of the previous
+        chunk, so the concatenated chunks are identical to the series returned
+        by `time_series` with the same arguments.
+
+        Parameters
+        ----------
+        steps: int
+            Number of steps in the time series.
+        states: bool (optional)
+            Provide initial ON/OFF states for each node.
+        chunk: int (optional)
+            Maximum number of time points per chunk.
+        asynchronous: bool or str (optional)
+            The update scheme as described for `time_series`.
+        seed: int, numpy.random.Generator, or numpy.random.SeedSequence
+                (optional)
+            Source of randomness as described for `time_series`.
+        order: iterable (optional)
+            Permutation of node indices used by the 'sequential' scheme.
+
+        Yields
+        ------
+        Two dimensional arrays, where the first dimension corresponds to the
+        nodes and the second to consecutive time points. The chunks cover
+        `steps` + 1 time points in total.
+        """
+        if chunk < 1:
+            raise BooleanDynamicsError("chunks must contain at least one time"\
+                    " point")
+        (states, update_seed) = self._initial_states(states, seed)
+        (mode, order, rng_state) = self._update_scheme(asynchronous, order,
+                update_seed, 1, internal=True)
+        network = self._kernel()[0]._network()
+        states = self._to_kernel(states)
+        total = steps + 1
+        done = 0
+        while done < total:
+            length = min(chunk, total - done)
+            # later chunks start from a copy of the previous state which is
+            # dropped again, the stream position persists in rng_state
+            offset = 0 if done == 0 else 1
+            series = np.empty((length + offset) * self.num_nodes,
+                    dtype=np.ubyte)
+            dyn.time_series(network, states, series, length + offset, mode,
+                    order, rng_state, False)
+            self._count(length + offset - 1, series.nbytes)
+            series = series.reshape((length + offset, self.num_nodes))[offset:]
+            states = series[-1].copy()
+            done += length
+            yield self._from_kernel(series).T
+
+    def _initial_states(self, states, seed):
+        """
+        Draw or convert initial states and spawn the stream for the update.
+        """
+        (state_seed, update_seed) = _seed_sequence(seed).spawn(2)
         if states is None:
-            states = np.random.random_integers(0, 1,
-                    self.num_nodes).astype(np.ubyte)
+            states = np.random.default_rng(state_seed).integers(2,
+                    size=self.num_nodes, dtype=np.ubyte)
         else:
-            states = np.asarray(states, dtype=np.ubyte)
-        series = np.zeros(self.num_nodes * steps, dtype=np.ubyte)
-        dyn.time_series(states, self.incidence_adj, self.incidence_func,
-                self.incidence_ptr, self.num_nodes, series, steps)
-        return series.reshape((steps, self.num_nodes)).T
+            states = np.ascontiguousarray(states, dtype=np.ubyte)
+        return (self._clamp_states(states), update_seed)
+
+    def _clamp_states(self, states):
+        """
+        Set clamped nodes to their value in a copy of the states.
+        """
+        if self.clamps is None:
+            return states
+        clamped = (self.clamps >= 0)
+        states = states.copy()
+        states[..., clamped] = self.clamps[clamped]
+        return states
+
+    def ensemble_series(self, initial_states, steps, out=None,
+            detect_cycle=False, asynchronous=False, seed=None, order=None,
+            window=None, n_threads=1):
+        """
+        Follow the ON/OFF states of all nodes for many initial states at once.
+
+        Parameters
+        ----------
+        initial_states: numpy.ndarray or int
+            Two dimensional array of ON/OFF states of shape (number of
+            initial states x number of nodes), or the number of distinct
+            random initial states drawn from `seed`, see `unique_states`.
+        steps: int
+            Number of steps in each time series.
+        out: numpy.ndarray (optional)
+            A preallocated, C-contiguous ubyte array of shape (number of
+            initial states x `steps` + 1 x number of nodes) that the series are
+            written into.
+        detect_cycle: bool (optional)
+            Stop computing new states once a trajectory repeats a state and
+            fill its remaining time points with copies of the cycle instead.
+            Not available with random update schemes.
+        asynchronous: bool or str (optional)
+            The update scheme as described for `time_series`.
+        seed: int, numpy.random.Generator, or numpy.random.SeedSequence
+                (optional)
+            Source of randomness for random initial states and the
+            asynchronous update. Every trajectory draws from its own child
+            stream spawned in the order of the
+            initial states, so results do not depend on how trajectories are
+            distributed over threads or processes.
+        order: iterable (optional)
+            Permutation of node indices used by the 'sequential' scheme.
+        window: int (optional)
+            Only count the ON states per node in consecutive windows of this
+            size along the stitched series (see `stitch_series`) instead of
+            returning the series.
+        n_threads: int (optional)
+            Distribute the trajectories over this many threads, see
+            `run_ensemble`.
+
+        Returns
+        -------
+        A three dimensional array, where the first dimension corresponds to
+        the initial states, the second to the time points, and the third to
+        the nodes. The number of time points is `steps` + 1, i.e., initial
+        state and all time steps.
+
+        If `window` is given, a two dimensional array of counts, where the
+        first dimension corresponds to the nodes and the second to the
+        complete windows.
+
+        If `detect_cycle` is true, a triple of the above series, the time points
+        at which the cycles were first entered, and the lengths of the cycles is
+        returned instead. Trajectories without a repeated state have a
+        transient of -1 and a cycle length of 0.
+        """
+        steps = steps + 1
+        if isinstance(initial_states, numbers.Integral):
+            (state_seed, seed) = _seed_sequence(seed).spawn(2)
+            initial_states = unique_states(initial_states, self.num_nodes,
+                    state_seed)
+        initial_states = np.ascontiguousarray(initial_states, dtype=np.ubyte)
+        if initial_states.ndim != 2 or\
+                initial_states.shape[1] != self.num_nodes:
+            raise BooleanDynamicsError("initial states must be of shape"\
+                    " (number of states x {:d})".format(self.num_nodes))
+        initial_states = self._to_kernel(self._clamp_states(initial_states))
+        num_states = initial_states.shape[0]
+        (mode, order, rng_states) = self._update_scheme(asynchronous, order,
+                seed, num_states, internal=True)
+        network = self._kernel()[0]._network()
+        if window is not None:
+            if detect_cycle:
+                raise BooleanDynamicsError("cycle detection is not available"\
+                        " for window counts")
+            num_windows = (num_states * steps) // window
+            counts = np.zeros((num_windows, self.num_nodes), dtype=np.uint32)
+
+            def count(bounds):
+                # slices start at window boundaries of the stitched timeline
+                (start, stop) = bounds
+                first = (start * steps) // window
+                last = min((stop * steps) // window, num_windows)
+                if last > first:
+                    dyn.window_counts(network,
+                            initial_states[start:stop].ravel(), stop - start,
+                            steps, window, mode, order,
+                            rng_states[4 * start:4 * stop],
+                            counts[first:last].reshape(-1), last - first)
+
+            if num_windows > 0:
+                _map_slices(count, num_states, n_threads,
+                        window // int(np.gcd(window, steps)))
+            # the kernel stops after the last complete window
+            (complete, rest) = divmod(num_windows * window, steps)
+            self._count(complete * (steps - 1) + max(rest - 1, 0),
+                    counts.nbytes)
+            return self._from_kernel(counts).T
+        if detect_cycle and mode in (dyn.UPDATE_RANDOM_SEQUENTIAL,
+                dyn.UPDATE_RANDOM_SINGLE):
+            raise BooleanDynamicsError("cannot detect cycles of random"\
+                    " asynchronous updates")
+        shape = (num_states, steps, self.num_nodes)
+        num_bytes = 0
+        if out is None:
+            out = np.empty(shape, dtype=np.ubyte)
+            num_bytes = out.nbytes
+        elif out.shape != shape or out.dtype != np.ubyte or\
+                not out.flags.c_contiguous:
+            raise BooleanDynamicsError("output buffer must be a C-contiguous"\
+                    " ubyte array of shape {}".format(shape))
+        transients = np.full(num_states, -1, dtype=np.int64)
+        periods = np.zeros(num_states, dtype=np.int64)
+
+        def run(bounds):
+            (start, stop) = bounds
+            dyn.ensemble_series(network, initial_states[start:stop].ravel(),
+                    stop - start, out[start:stop].reshape(-1), steps, mode,
+                    order, rng_states[4 * start:4 * stop], detect_cycle,
+                    transients[start:stop], periods[start:stop])
+
+        _map_slices(run, num_states, n_threads)
+        # trajectories that settled are completed by copying their cycle
+        simulated = np.where(periods > 0, np.minimum(transients + periods,
+                steps - 1), steps - 1)
+        self._count(int(simulated.sum()), num_bytes)
+        self._from_kernel(out)
+        if detect_cycle:
+            return (out, transients, periods)
+        return out
+
+    def run_ensemble(self, initial_states, steps, n_threads=None, out=None,
+            detect_cycle=False, asynchronous=False, seed=None, order=None,
+            window=None):
+        """
+        Follow the ON/OFF states of all nodes for many initial states using a
+        pool of threads that share the topology.
+
+        The trajectories are split into one contiguous slice per thread, for
+        window counts at window boundaries of the stitched series. Since every
+        trajectory draws from its own random stream, the result is identical
+        to `ensemble_series` for any number of threads.
+
+        Parameters
+        ----------
+        initial_states: numpy.ndarray or int
+            Two dimensional array of ON/OFF states of shape (number of
+            initial states x number of nodes), or the number of distinct
+            random initial states.
+        steps: int
+            Number of steps in each time series.
+        n_threads: int (optional)
+            Number of threads to use (default: number of CPUs).
+
+        Further arguments and the return value are described for
+        `ensemble_series`.
+        """
+        if n_threads is None:
+            n_threads = multiprocessing.cpu_count()
+        return self.ensemble_series(initial_states, steps, out=out,
+                detect_cycle=detect_cycle, asynchronous=asynchronous,
+                seed=seed, order=order, window=window, n_threads=n_threads)
+
+    def damage_spreading(self, states, flips, steps, asynchronous=False,
+            seed=None, order=None, n_threads=1):
+        """
+        Follow how perturbations of initial states spread through the network.
+
+        For each initial state a reference trajectory is computed once and all
+        of its perturbed copies are advanced alongside it in one compiled loop.
+        Only the Hamming distances between the copies and the reference are
+        kept. Under the synchronous update only damaged nodes and their
+        targets are re-evaluated. Under random update schemes a copy replays
+        the random stream of its reference, i.e., any distance is due to the
+        perturbation alone.
+
+        Parameters
+        ----------
+        states: numpy.ndarray
+            Two dimensional array of ON/OFF states of shape (number of
+            initial states x number of nodes), or a single state.
+        flips: numpy.ndarray
+            The perturbations applied to every initial state. Either a one
+            dimensional array of node indices, each flipped on its own, or a
+            boolean array of shape (number of perturbations x number of nodes)
+            of the nodes flipped together. A boolean array of shape (number of
+            initial states x number of perturbations x number of nodes) applies
+            different perturbations to each initial state. Clamped nodes cannot
+            be flipped and are ignored.
+        steps: int
+            Number of steps to follow each trajectory.
+
+        Further arguments are described for `ensemble_series`.
+
+        Returns
+        -------
+        A uint32 array of Hamming distances, where the first dimension
+        corresponds to the initial states (omitted for a single state), the
+        second to the perturbations, and the third to the `steps` + 1 time
+        points.
+        """
+        steps = steps + 1
+        states = np.ascontiguousarray(states, dtype=np.ubyte)
+        single = (states.ndim == 1)
+        if single:
+            states = states[np.newaxis, :]
+        if states.ndim != 2 or states.shape[1] != self.num_nodes:
+            raise BooleanDynamicsError("initial states must be of shape"\
+                    " (number of states x {:d})".format(self.num_nodes))
+        states = self._clamp_states(states)
+        num_states = states.shape[0]
+        flips = np.asarray(flips)
+        shared = (flips.ndim < 3)
+        if flips.ndim == 1:
+            num_flips = len(flips)
+            flip_nodes = flips.astype(np.int32)
+            if ((flip_nodes < 0) | (flip_nodes >= self.num_nodes)).any():
+                raise BooleanDynamicsError("flipped nodes must be node"\
+                        " indices")
+            flip_ptr = np.arange(num_flips + 1, dtype=np.int64)
+        elif flips.ndim in (2, 3) and flips.shape[-1] == self.num_nodes and\
+                (shared or flips.shape[0] == num_states):
+            num_flips = flips.shape[-2]
+            (masks, nodes) = np.nonzero(flips.reshape((-1, self.num_nodes)))
+            flip_nodes = nodes.astype(np.int32)
+            flip_ptr = np.zeros(len(flips.reshape((-1, self.num_nodes))) + 1,
+                    dtype=np.int64)
+            np.cumsum(np.bincount(masks, minlength=len(flip_ptr) - 1),
+                    out=flip_ptr[1:])
+        else:
+            raise BooleanDynamicsError("flips must be node indices or masks of"\
+                    " shape (number of perturbations x {:d}) or (number of"\
+                    " states x number of perturbations x {:d})".format(
+                    self.num_nodes, self.num_nodes))
+        if self.clamps is not None:
+            # clamped nodes keep their state, flipping them has no effect
+            free = (self.clamps[flip_nodes] < 0)
+            perturbation = np.repeat(np.arange(len(flip_ptr) - 1),
+                    np.diff(flip_ptr))
+            flip_ptr = np.zeros_like(flip_ptr)
+            np.cumsum(np.bincount(perturbation[free],
+                    minlength=len(flip_ptr) - 1), out=flip_ptr[1:])
+            flip_nodes = flip_nodes[free]
+        (kernel, rank) = self._kernel()
+        if rank is not None:
+            flip_nodes = rank[flip_nodes]
+            states = self._to_kernel(states)
+        if len(flip_nodes) == 0:
+            # the kernel needs a valid pointer even without flipped nodes
+            flip_nodes = np.zeros(1, dtype=np.int32)
+        (mode, order, rng_states) = self._update_scheme(asynchronous, order,
+                seed, num_states, internal=True)
+        distances = np.zeros((num_states, num_flips, steps), dtype=np.uint32)
+        network = kernel._network()
+        # outgoing links in CSR format such that the synchronous update only
+        # re-evaluates the targets of damaged nodes
+        targets = np.repeat(np.arange(self.num_nodes, dtype=np.int32),
+                np.diff(kernel.incidence_ptr))
+        out_adj = np.append(targets[np.argsort(kernel.incidence_adj,
+                kind="stable")], 0).astype(np.int32)
+        out_ptr = np.zeros(self.num_nodes + 1, dtype=np.int32)
+        np.cumsum(np.bincount(kernel.incidence_adj, minlength=self.num_nodes),
+                out=out_ptr[1:])
+
+        def spread(bounds):
+            (start, stop) = bounds
+            dyn.damage_spreading(network, out_ptr, out_adj,
+                    states[start:stop].ravel(),
+                    stop - start, flip_ptr if shared else\
+                    flip_ptr[start * num_flips:stop * num_flips + 1],
+                    flip_nodes, num_flips, shared, steps, mode, order,
+                    rng_states[4 * start:4 * stop],
+                    distances[start:stop].reshape(-1))
+
+        if num_flips > 0:
+            _map_slices(spread, num_states, n_threads)
+        # copies stop being advanced once their damage has healed
+        self._count(num_states * (steps - 1) +
+                np.count_nonzero(distances[:, :, :-1]), distances.nbytes)
+        if single:
+            return distances[0]
+        return distances
+
+    def derrida_map(self, num_states=1000, distances=None,
+            asynchronous=False, seed=None, n_threads=1):
+        """
+        Estimate the Derrida map, i.e., the average Hamming distance after one
+        step between random states that initially differ in `d` nodes.
+
+        Parameters
+        ----------
+        num_states: int (optional)
+            The number of random initial states per distance.
+        distances: iterable (optional)
+            The initial distances, by default at most 32 evenly spaced ones
+            between 1 and the number of nodes.
+        asynchronous: bool or str (optional)
+            The update scheme as described for `time_series`.
+        seed: int, numpy.random.Generator, or numpy.random.SeedSequence
+                (optional)
+            Source of randomness for states, flipped nodes, and the update.
+        n_threads: int (optional)
+            The number of threads sharing the initial states.
+
+        Returns
+        -------
+        A pair of the initial distances and the mean distances after one step.
+        """
+        if distances is None:
+            distances = np.unique(np.linspace(1, self.num_nodes,
+                    min(self.num_nodes, 32)).astype(int))
+        distances = np.asarray(distances, dtype=int)
+        if ((distances < 0) | (distances > self.num_nodes)).any():
+            raise BooleanDynamicsError("initial distances must be between 0"\
+                    " and {:d}".format(self.num_nodes))
+        (state_seed, flip_seed, update_seed) = _seed_sequence(seed).spawn(3)
+        states = np.random.default_rng(state_seed).integers(2,
+                size=(num_states, self.num_nodes), dtype=np.ubyte)
+        # a random rank per node and state, flipping the nodes of rank below d
+        # perturbs d random nodes
+        ranks = np.random.default_rng(flip_seed).random(
+                (num_states, self.num_nodes)).argsort(axis=1).argsort(axis=1)
+        means = np.zeros(len(distances), dtype=float)
+        for (i, dist) in enumerate(distances):
+            result = self.damage_spreading(states,
+                    (ranks < dist)[:, np.newaxis, :], 1,
+                    asynchronous=asynchronous, seed=update_seed,
+                    n_threads=n_threads)
+            means[i] = result[:, 0, 1].mean()
+        return (distances, means)
+
+    def knockout_screen(self, initial_states, steps, nodes=None, value=0,
+            asynchronous=False, seed=None, order=None, n_threads=1):
+        """
+        Simulate one variant of the network per clamped node in a single call.
 
+        Every variant clamps one node in addition to the nodes clamped already
+        and replays the same initial states and random streams, such that
+        differences between variants are due to the clamped node alone.
+
+        Parameters
+        ----------
+        initial_states: numpy.ndarray or int
+            Two dimensional array of ON/OFF states of shape (number of
+            initial states x number of nodes), or the number of distinct
+            random initial states.
+        steps: int
+            Number of steps in each time series.
+        nodes: iterable (optional)
+            The indices of the nodes clamped one at a time (default: all).
+        value: int or iterable (optional)
+            The clamped state, 0 for knockouts and 1 for overexpression, for
+            all or for each of the nodes.
+
+        Further arguments are described for `ensemble_series`.
+
+        Returns
+        -------
+        A float array of shape (number of variants x number of nodes) of the
+        fraction of ON states per node over all time points of all
+        trajectories of a variant.
+        """
+        steps = steps + 1
+        if nodes is None:
+            nodes = np.arange(self.num_nodes, dtype=np.int32)
+        nodes = np.ascontiguousarray(nodes, dtype=np.int32)
+        if ((nodes < 0) | (nodes >= self.num_nodes)).any():
+            raise BooleanDynamicsError("clamped nodes must be node indices")
+        values = np.ascontiguousarray(np.broadcast_to(np.asarray(value) != 0,
+                nodes.shape), dtype=np.ubyte)
+        if isinstance(initial_states, numbers.Integral):
+            (state_seed, seed) = _seed_sequence(seed).spawn(2)
+            initial_states = unique_states(initial_states, self.num_nodes,
+                    state_seed)
+        initial_states = np.ascontiguousarray(initial_states, dtype=np.ubyte)
+        if initial_states.ndim != 2 or\
+                initial_states.shape[1] != self.num_nodes:
+            raise BooleanDynamicsError("initial states must be of shape"\
+                    " (number of states x {:d})".format(self.num_nodes))
+        initial_states = self._to_kernel(self._clamp_states(initial_states))
+        num_states = initial_states.shape[0]
+        (mode, order, rng_states) = self._update_scheme(asynchronous, order,
+                seed, num_states, internal=True)
+        counts = np.zeros((len(nodes), self.num_nodes), dtype=np.uint32)
+        (kernel, rank) = self._kernel()
+        network = kernel._network()
+        if rank is not None:
+            nodes = rank[nodes]
+
+        def screen(bounds):
+            (start, stop) = bounds
+            dyn.knockout_screen(network, nodes[start:stop],
+                    values[start:stop], stop - start, initial_states.ravel(),
+                    num_states, steps, mode, order, rng_states,
+                    counts[start:stop].reshape(-1))
+
+        if num_states > 0:
+            _map_slices(screen, len(nodes), n_threads)
+        self._count(len(nodes) * num_states * (steps - 1), counts.nbytes)
+        return self._from_kernel(counts) / float(max(num_states * steps, 1))
+
+    def packed_series(self, initial_states, steps, out=None):
+        """
+        Follow the ON/OFF states of all nodes for bit-packed initial states.
+
+        Each unsigned 64 bit word holds the state of one node in 64 different
+        trajectories such that the majority update advances all of them at
+        once.
+
+        Parameters
+        ----------
+        initial_states: numpy.ndarray
+            Two dimensional uint64 array of shape (number of words x number of
+            nodes) as returned by `pack_states`.
+        steps: int
+            Number of steps in each time series.
+        out: numpy.ndarray (optional)
+            A preallocated, C-contiguous uint64 array of shape (number of words
+            x `steps` + 1 x number of nodes) that the series are written into.
+
+        Returns
+        -------
+        A three dimensional uint64 array, where the first dimension corresponds
+        to the words of 64 trajectories each, the second to the time points,
+        and the third to the nodes. Use `unpack_series` in order to obtain one
+        ON/OFF series per trajectory.
+        """
+        if self.rule != "majority":
+            raise BooleanDynamicsError("the packed engine only supports the"\
+                    " majority rule")
+        steps = steps + 1
+        initial_states = np.ascontiguousarray(initial_states, dtype=np.uint64)
+        if initial_states.ndim != 2 or\
+                initial_states.shape[1] != self.num_nodes:
+            raise BooleanDynamicsError("packed initial states must be of shape"\
+                    " (number of words x {:d})".format(self.num_nodes))
+        num_words = initial_states.shape[0]
+        shape = (num_words, steps, self.num_nodes)
+        if out is None:
+            out = np.empty(shape, dtype=np.uint64)
+            profiling.count("bytes", out.nbytes)
+        elif out.shape != shape or out.dtype != np.uint64 or\
+                not out.flags.c_contiguous:
+            raise BooleanDynamicsError("output buffer must be a C-contiguous"\
+                    " uint64 array of shape {}".format(shape))
+        if num_words == 0:
+            return out
+        kernel = self._kernel()[0]
+        initial_states = self._to_kernel(initial_states)
+        (inc_ptr, inc_adj, inc_func) = (kernel.incidence_ptr,
+                kernel.incidence_adj, kernel.incidence_func)
+        if kernel.clamps is not None:
+            # without inputs a node keeps its state under the majority rule,
+            # so clamped nodes get no inputs and constant words
+            clamped = (kernel.clamps >= 0)
+            keep = np.repeat(~clamped, np.diff(inc_ptr))
+            inc_ptr = np.zeros_like(inc_ptr)
+            np.cumsum(np.where(clamped, 0, np.diff(kernel.incidence_ptr)),
+                    out=inc_ptr[1:])
+            inc_adj = np.append(inc_adj[keep], 0).astype(np.int32)
+            inc_func = np.append(inc_func[keep], 0).astype(np.int32)
+            initial_states = initial_states.copy()
+            initial_states[:, clamped] = np.where(kernel.clamps[clamped] > 0,
+                    ~np.uint64(0), np.uint64(0))
+        dyn.packed_ensemble_series(initial_states.ravel(), inc_adj, inc_func,
+                inc_ptr, self.num_nodes, num_words, out.reshape(-1), steps)
+        self._from_kernel(out)
+        # every link is evaluated once per word and step for 64 trajectories
+        profiling.count("steps", 64 * num_words * (steps - 1))
+        profiling.count("edges", num_words * (steps - 1) *
+                len(self.incidence_adj))
+        return out
+
+    def find_attractor(self, states, max_steps=None):
+        """
+        Follow the synchronous dynamics from one initial state to its attractor.
+
+        Parameters
+        ----------
+        states: numpy.ndarray
+            Initial ON/OFF states for each node.
+        max_steps: int (optional)
+            Give up if no cycle was found after this many steps.
+
+        Returns
+        -------
+        A triple of the length of the transient, the length of the cycle, and
+        the lexicographically smallest state on the cycle which identifies the
+        attractor. If no cycle was found within `max_steps` a
+        `BooleanDynamicsError` is raised.
+        """
+        states = np.asarray(states, dtype=np.ubyte)
+        (transients, periods, labels, attractors) = self.find_attractors(
+                states[np.newaxis, :], max_steps=max_steps)
+        if labels[0] < 0:
+            raise BooleanDynamicsError("no attractor was reached within {:d}"\
+                    " steps".format(max_steps))
+        return (int(transients[0]), int(periods[0]), attractors[0])
+
+    def find_attractors(self, initial_states, max_steps=None):
+        """
+        Follow the synchronous dynamics from many initial states to their
+        attractors.
+
+        Cycles are detected with Brent's algorithm, i.e., only a constant number
+        of states is ever stored per trajectory.
+
+        Parameters
+        ----------
+        initial_states: numpy.ndarray
+            Two dimensional array of ON/OFF states of shape (number of
+            initial states x number of nodes).
+        max_steps: int (optional)
+            Give up on trajectories that did not close a cycle after this many
+            steps.
+
+        Returns
+        -------
+        transients: numpy.ndarray
+            The number of steps before each trajectory enters its cycle (-1 if
+            not found).
+        periods: numpy.ndarray
+            The length of the cycle reached by each trajectory (0 if not found).
+        labels: numpy.ndarray
+            The index of the attractor in `attractors` reached by each
+            trajectory (-1 if not found).
+        attractors: numpy.ndarray
+            The lexicographically sorted, unique attractors identified by their
+            smallest state.
+        """
+        initial_states = np.ascontiguousarray(initial_states, dtype=np.ubyte)
+        if initial_states.ndim != 2 or\
+                initial_states.shape[1] != self.num_nodes:
+            raise BooleanDynamicsError("initial states must be of shape"\
+                    " (number of states x {:d})".format(self.num_nodes))
+        initial_states = self._clamp_states(initial_states)
+        num_states = initial_states.shape[0]
+        transients = np.zeros(num_states, dtype=np.int64)
+        periods = np.zeros(num_states, dtype=np.int64)
+        canonical = np.zeros((num_states, self.num_nodes), dtype=np.ubyte)
+        if num_states > 0:
+            dyn.find_attractors(self._network(), initial_states.ravel(),
+                    num_states, 0 if max_steps is None else max_steps,
+                    transients, periods, canonical.reshape(-1))
+        found = (periods > 0)
+        labels = np.full(num_states, -1, dtype=np.int64)
+        if found.any():
+            (attractors, labels[found]) = np.unique(canonical[found], axis=0,
+                    return_inverse=True)
+        else:
+            attractors = np.zeros((0, self.num_nodes), dtype=np.ubyte)
+        return (transients, periods, labels, attractors)
+
+    def state_transition_map(self, asynchronous=False, order=None,
+            n_threads=1, out=None):
+        """
+        Compute the successor of every state of a small network.
+
+        A state is identified by the integer whose bit `i` is the state of the
+        node with index `i`, see `states_to_ids`. The state space is split into
+        chunks of consecutive ids and those are advanced on `n_threads`
+        threads. Under the majority rule 64 states are advanced at once.
+
+        Parameters
+        ----------
+        asynchronous: bool or str (optional)
+            Only the deterministic 'synchronous' (False) and 'sequential'
+            update schemes define a transition map.
+        order: iterable (optional)
+            The node indices in the order of the sequential update.
+        n_threads: int (optional)
+            The number of threads sharing the work.
+        out: numpy.ndarray (optional)
+            A preallocated, C-contiguous uint32 array of length 2**N for N
+            nodes, e.g., a numpy.memmap.
+
+        Returns
+        -------
+        The uint32 array of successor ids indexed by state id.
+        """
+        if self.num_nodes > MAX_STATE_SPACE_NODES:
+            raise BooleanDynamicsError("cannot enumerate the states of more"\
+                    " than {:d} nodes".format(MAX_STATE_SPACE_NODES))
+        (mode, order, _) = self._update_scheme(asynchronous, order, None, 1)
+        if mode not in (dyn.UPDATE_SYNCHRONOUS, dyn.UPDATE_SEQUENTIAL):
+            raise BooleanDynamicsError("random update schemes do not define a"\
+                    " state transition map")
+        num_states = 2 ** self.num_nodes
+        if out is None:
+            out = np.empty(num_states, dtype=np.uint32)
+            profiling.count("bytes", out.nbytes)
+        elif out.shape != (num_states,) or out.dtype != np.uint32 or\
+                not out.flags.c_contiguous:
+            raise BooleanDynamicsError("output buffer must be a C-contiguous"\
+                    " uint32 array of length {:d}".format(num_states))
+        network = self._network()
+
+        def transitions(bounds):
+            (start, stop) = bounds
+            dyn.state_transitions(network, mode, order, start, stop - start,
+                    out[start:stop])
+
+        # chunks aligned to the 64 states per word of the majority rule
+        _map_slices(transitions, num_states, n_threads, align=64)
+        self._count(num_states, 0)
+        return out
+
+    def basins_of_attraction(self, successors=None, n_threads=1):
+        """
+        Partition the complete state space of a small network into the basins
+        of its attractors.
+
+        The transition map is a functional graph whose cycles are the
+        attractors. Each state is visited a constant number of times, such
+        that the whole analysis takes time linear in the number of states.
+
+        Parameters
+        ----------
+        successors: numpy.ndarray (optional)
+            The result of `state_transition_map`, the synchronous map is
+            computed if missing.
+        n_threads: int (optional)
+            The number of threads used to compute the map.
+
+        Returns
+        -------
+        basins: numpy.ndarray
+            The index of the attractor reached from each state.
+        attractors: numpy.ndarray
+            The smallest state id on each attractor in ascending order.
+        periods: numpy.ndarray
+            The number of states on each attractor.
+        sizes: numpy.ndarray
+            The number of states in each basin including the attractor.
+        garden_of_eden: numpy.ndarray
+            Boolean mask of the states without predecessor.
+        """
+        if successors is None:
+            successors = self.state_transition_map(n_threads=n_threads)
+        num_states = 2 ** self.num_nodes
+        successors = np.asarray(successors)
+        if successors.shape != (num_states,):
+            raise BooleanDynamicsError("expected one successor for each of the"\
+                    " {:d} states".format(num_states))
+        # the kernel follows every successor as an index, checked before the
+        # cast would wrap negative values
+        if successors.dtype.kind not in "iu" or (successors < 0).any() or\
+                (successors >= num_states).any():
+            raise BooleanDynamicsError("successors must be state ids from 0"\
+                    " to {:d}".format(num_states - 1))
+        successors = np.ascontiguousarray(successors, dtype=np.uint32)
+        basins = np.empty(len(successors), dtype=np.uint32)
+        cyclic = np.empty(len(successors), dtype=np.ubyte)
+        dyn.attractor_basins(successors, basins, cyclic)
+        # cyclic states in ascending order, the first one per attractor is its
+        # smallest and the attractors are relabelled in that order
+        on_cycle = np.flatnonzero(cyclic)
+        (labels, first, periods) = np.unique(basins[on_cycle],
+                return_index=True, return_counts=True)
+        attractors = on_cycle[first]
+        ordering = np.argsort(attractors)
+        relabel = np.empty(len(labels), dtype=np.uint32)
+        relabel[labels[ordering]] = np.arange(len(labels), dtype=np.uint32)
+        basins = relabel[basins]
+        sizes = np.bincount(basins, minlength=len(labels))
+        garden_of_eden = np.ones(len(successors), dtype=bool)
+        garden_of_eden[successors] = False
+        return (basins, attractors[ordering], periods[ordering], sizes,
+                garden_of_eden)
@@ -22,16 +22,20 @@ Boolean Dynamics Database Models
 from __future__ import (absolute_import, unicode_literals)
 
 
-__all__ = ["Base", "Session", "Job", "ControlResult"]
+__all__ = ["Base", "Session", "Job", "ControlResult", "JobMetrics",
+        "ResultWriter", "upgrade_schema"]
 
 
 import logging
+from datetime import (datetime, timedelta, timezone)
 
+import numpy as np
 from sqlalchemy import (Column, ForeignKey, Integer, String, Sequence,
-        Float, Boolean, select)
-from sqlalchemy.orm import (sessionmaker, relationship)
-from sqlalchemy.ext.declarative import declarative_base
-from pandas import DataFrame
+        Float, Boolean, DateTime, select, or_, and_, inspect, literal,
+        text)
+from sqlalchemy.orm import (sessionmaker, relationship, declarative_base)
+from pandas import (DataFrame, Series, Categorical, factorize)
+from pandas.arrays import IntegerArray
 
 LOGGER = logging.getLogger(__name__)
 LOGGER.addHandler(logging.NullHandler())
@@ -55,8 +59,124 @@ class Job(Base):
     function = Column(String()) # e.g., regulatory
     seed = Column(Integer)
     complete = Column(Boolean, default=False, nullable=False)
+    # lease protocol for several drivers working on the same table, the status
+    # is one of pending, running, or complete
+    status = Column(String(10), default="pending", index=True)
+    worker_id = Column(String(64)) # driver that claimed the job last
+    lease_expires = Column(DateTime) # in UTC, claimable again afterwards
+    attempts = Column(Integer, default=0, nullable=False)
     results = relationship("ControlResult", backref="job")
 
+    @classmethod
+    def claimable(cls, now, max_attempts=None):
+        """
+        Condition for jobs that are neither complete nor leased at `now`.
+        """
+        condition = and_(~cls.complete, or_(cls.status == None,
+                cls.status == "pending", and_(cls.status == "running",
+                cls.lease_expires < now)))
+        if max_attempts is not None:
+            condition = and_(condition, cls.attempts < max_attempts)
+        return condition
+
+    @classmethod
+    def claim(cls, session, worker_id, num_jobs, lease=3600,
+            max_attempts=None):
+        """
+        Atomically lease a batch of jobs to one driver.
+
+        On PostgreSQL the candidate rows are locked with ``FOR UPDATE SKIP
+        LOCKED`` and the leased ids are returned by ``UPDATE ... RETURNING``,
+        so concurrent drivers never wait for each other. Elsewhere, e.g., on
+        SQLite, a single ``UPDATE`` with a sub-select claims the jobs and they
+        are found again by worker id and lease expiry.
+
+        Parameters
+        ----------
+        session: sqlalchemy.orm.Session
+            The session used for claiming, it is committed.
+        worker_id: str
+            Unique name of the claiming driver.
+        num_jobs: int
+            The maximum number of jobs to claim.
+        lease: int (optional)
+            Seconds after which unfinished jobs may be claimed by others.
+        max_attempts: int (optional)
+            Never claim jobs that have been claimed this often.
+
+        Returns
+        -------
+        A list of claimed jobs ordered by id, detached from the session.
+        """
+        # lease expiry is stored as naive UTC
+        now = datetime.now(timezone.utc).replace(tzinfo=None)
+        expires = now + timedelta(seconds=lease)
+        job = cls.__table__
+        candidates = session.query(cls.id).filter(cls.claimable(now,
+                max_attempts)).order_by(cls.id).limit(num_jobs)
+        postgres = (session.get_bind().dialect.name == "postgresql")
+        if postgres:
+            candidates = candidates.with_for_update(skip_locked=True)
+        stmt = job.update().where(job.c.id.in_(candidates.statement)).values(
+                status="running", worker_id=worker_id, lease_expires=expires,
+                attempts=job.c.attempts + 1)
+        if postgres:
+            job_ids = [row[0] for row in session.execute(stmt.returning(
+                    job.c.id))]
+        else:
+            session.execute(stmt)
+            job_ids = [row[0] for row in session.query(cls.id).filter(
+                    cls.worker_id == worker_id, cls.lease_expires == expires,
+                    cls.status == "running")]
+        session.commit()
+        if len(job_ids) == 0:
+            return list()
+        jobs = session.query(cls).filter(job.c.id.in_(job_ids)).order_by(
+                cls.id).all()
+        for obj in jobs:
+            session.expunge(obj)
+        return jobs
+
+    @classmethod
+    def renew(cls, session, worker_id, lease=3600):
+        """
+        Extend the leases of all jobs that one driver is still running.
+
+        The session is not committed.
+
+        Returns
+        -------
+        The number of renewed leases.
+        """
+        job = cls.__table__
+        expires = datetime.now(timezone.utc).replace(tzinfo=None) +\
+                timedelta(seconds=lease)
+        result = session.execute(job.update().where(and_(
+                job.c.worker_id == worker_id, job.c.status == "running")
+                ).values(lease_expires=expires))
+        return result.rowcount
+
+    @classmethod
+    def iter_pending(cls, session, page_size=1000):
+        """
+        Yield pages of incomplete jobs in the order of their ids.
+
+        Only one page is loaded at a time. The jobs are detached from the
+        session so that they can be sent to other processes.
+        """
+        last_id = None
+        while True:
+            query = session.query(cls).filter(~cls.complete)
+            if last_id is not None:
+                query = query.filter(cls.id > last_id)
+            page = query.order_by(cls.id).limit(page_size).all()
+            if len(page) == 0:
+                return
+            for job in page:
+                session.expunge(job)
+            last_id = page[-1].id
+            yield page
+
 
 class ControlResult(Base):
     __tablename__ = "controlresult"
@@ -67,17 +187,354 @@ class ControlResult(Base):
     delay = Column(Integer) # usually between 1 and 6 with delay measures
 
     @classmethod
-    def load_frame(cls, session):
+    def load_frame(cls, session, job_columns=(), where=None,
+            chunk_size=100000, filename=None, **filters):
         """
-        Load part of the table into a well-formatted pandas.DataFrame.
+        Load results, optionally joined with the parameters of their jobs, into
+        a well-formatted pandas.DataFrame.
+
+        Filters and the join are evaluated by the database. Rows are fetched
+        in chunks and converted to typed NumPy columns right away, string
+        columns become categorical.
+
+        Parameters
+        ----------
+        session:
+            Any object with the execute method.
+        job_columns: iterable (optional)
+            Names of `Job` columns to include, e.g., ('num_nodes', 'win_size').
+        where: sqlalchemy clause (optional)
+            Additional condition, e.g., ``Job.num_nodes > 100``.
+        chunk_size: int (optional)
+            Number of rows converted at a time.
+        filename: str (optional)
+            Also write the frame to a Parquet ('.parquet') or Feather
+            ('.feather') file for repeated reads.
+
+        Additional keyword arguments select rows by the value, or list of
+        values, of a column of this table or of `Job`, e.g.,
+        ``measure="absolute"`` or ``win_size=[10, 20]``.
 
-        session can be any object with the execute method.
+        Returns
+        -------
+        A DataFrame indexed by the result id.
         """
         result = cls.__table__
-        stmt = select([result.c.id, result.c.ctc,
-                result.c.measure, result.c.delay])
-        result = session.execute(stmt)
-        df = DataFrame(iter(result), columns=result.keys())
+        job = Job.__table__
+        columns = [result.c.id, result.c.job_id, result.c.ctc,
+                result.c.measure, result.c.delay]
+        names = [col.name for col in columns]
+        joined = False
+        for name in job_columns:
+            if name == "id":
+                # already present as job_id
+                continue
+            columns.append(job.c[name])
+            names.append(name)
+            joined = True
+        conditions = list()
+        for (name, value) in filters.items():
+            if name in result.c:
+                col = result.c[name]
+            elif name in job.c:
+                col = job.c[name]
+                joined = True
+            else:
+                raise ValueError("unknown column '{}'".format(name))
+            if value is None:
+                conditions.append(col == None)
+            elif isinstance(value, (list, tuple, set)):
+                conditions.append(col.in_(list(value)))
+            else:
+                conditions.append(col == value)
+        if where is not None:
+            conditions.append(where)
+            joined = True
+        stmt = select(*columns)
+        if joined:
+            stmt = stmt.select_from(result.join(job,
+                    result.c.job_id == job.c.id))
+        if len(conditions) > 0:
+            stmt = stmt.where(and_(*conditions))
+        stmt = stmt.execution_options(stream_results=True)
+        converters = [_ColumnConverter(col) for col in columns]
+        rows = session.execute(stmt)
+        while True:
+            chunk = rows.fetchmany(chunk_size)
+            if len(chunk) == 0:
+                break
+            for (conv, values) in zip(converters, zip(*chunk)):
+                conv.add(values)
+        df = DataFrame(dict((name, conv.finish()) for (name, conv) in
+                zip(names, converters)), columns=names)
         df.set_index("id", inplace=True)
+        if filename is not None:
+            if filename.endswith(".parquet"):
+                df.to_parquet(filename)
+            elif filename.endswith(".feather"):
+                # feather does not store an index
+                df.reset_index().to_feather(filename)
+            else:
+                raise ValueError("unknown file format of '{}'".format(
+                        filename))
         return df
 
+
+class JobMetrics(Base):
+    __tablename__ = "jobmetrics"
+    id = Column(Integer, Sequence("jobmetrics_id_seq"), primary_key=True)
+    job_id = Column(Integer, ForeignKey("job.id"), index=True)
+    kind = Column(String(10)) # time or count
+    name = Column(String(30)) # e.g., simulate or steps
+    value = Column(Float) # seconds or count
+
+
+def upgrade_schema(bind):
+    """
+    Bring a database created by an earlier version up to date.
+
+    Missing tables are created and missing columns of existing tables are
+    added by ``ALTER TABLE``, e.g., the lease columns of `Job`. Jobs that were
+    complete before get the status 'complete'.
+
+    Parameters
+    ----------
+    bind: sqlalchemy.engine.Engine
+        The database connection.
+
+    Returns
+    -------
+    A list of the added columns as 'table.column'.
+    """
+    Base.metadata.create_all(bind)
+    added = list()
+    with bind.begin() as conn:
+        tables = set(inspect(conn).get_table_names())
+        for table in Base.metadata.sorted_tables:
+            if table.name not in tables:
+                continue
+            existing = set(col["name"] for col in
+                    inspect(conn).get_columns(table.name))
+            missing = [col for col in table.columns
+                    if col.name not in existing]
+            for col in missing:
+                ddl = "ALTER TABLE {} ADD COLUMN {} {}".format(table.name,
+                        col.name, col.type.compile(dialect=conn.dialect))
+                if col.default is not None and col.default.is_scalar:
+                    ddl += " DEFAULT {}".format(literal(col.default.arg,
+                            col.type).compile(dialect=conn.dialect,
+                            compile_kwargs={"literal_binds": True}))
+                    if not col.nullable:
+                        ddl += " NOT NULL"
+                conn.execute(text(ddl))
+                added.append("{}.{}".format(table.name, col.name))
+            names = set(col.name for col in missing)
+            for index in table.indexes:
+                if names.intersection(col.name for col in index.columns):
+                    index.create(conn)
+            if table.name == Job.__tablename__ and "status" in names:
+                conn.execute(table.update().where(table.c.complete).values(
+                        status="complete"))
+    if len(added) > 0:
+        LOGGER.info("added the columns %s", ", ".join(added))
+    return added
+
+
+class _ColumnConverter(object):
+    """
+    Collect the values of a result column chunk by chunk as NumPy arrays.
+    """
+
+    def __init__(self, column):
+        if isinstance(column.type, Boolean):
+            self.kind = "bool"
+        elif isinstance(column.type, Integer):
+            self.kind = "int"
+        elif isinstance(column.type, Float):
+            self.kind = "float"
+        elif isinstance(column.type, DateTime):
+            self.kind = "datetime"
+        elif isinstance(column.type, String):
+            self.kind = "category"
+        else:
+            self.kind = "object"
+        self.chunks = list()
+        self.masks = list()
+        self.categories = dict()
+
+    def add(self, values):
+        if self.kind == "int":
+            # missing values are masked, a detour through floats would round
+            # values above 2**53
+            mask = np.array([val is None for val in values], dtype=bool)
+            if mask.any():
+                values = [0 if val is None else val for val in values]
+            self.chunks.append(np.array(values, dtype=np.int64))
+            self.masks.append(mask)
+        elif self.kind == "float":
+            # missing values become NaN
+            self.chunks.append(np.array(values, dtype=np.float64))
+        elif self.kind == "bool":
+            self.chunks.append(np.array(values, dtype=object))
+        elif self.kind == "datetime":
+            self.chunks.append(np.array(values, dtype="datetime64[us]"))
+        elif self.kind == "category":
+            # only integer codes per row are kept
+            (codes, uniques) = factorize(np.array(values, dtype=object))
+            mapping = np.array([self.categories.setdefault(label,
+                    len(self.categories)) for label in uniques] + [-1],
+                    dtype=np.int32)
+            self.chunks.append(mapping[codes])
+        else:
+            self.chunks.append(np.array(values, dtype=object))
+
+    def finish(self):
+        if len(self.chunks) > 0:
+            values = np.concatenate(self.chunks)
+        else:
+            values = np.zeros(0, dtype={"category": np.int32,
+                    "int": np.int64}.get(self.kind, np.float64))
+        self.chunks = list()
+        if self.kind == "int":
+            mask = np.concatenate(self.masks) if len(self.masks) > 0 else\
+                    np.zeros(0, dtype=bool)
+            self.masks = list()
+            if mask.any():
+                return IntegerArray(values, mask)
+            return values
+        elif self.kind == "bool":
+            if any(val is None for val in values):
+                return Series(values).astype("boolean").values
+            return values.astype(bool)
+        elif self.kind == "category":
+            categories = sorted(self.categories, key=self.categories.get)
+            return Categorical.from_codes(values, categories=categories)
+        return values
+
+
+class ResultWriter(object):
+    """
+    Buffer the control results of many jobs and write them in one transaction.
+
+    All rows are inserted by a single executemany, optional `JobMetrics` rows
+    by another one, and the jobs are marked
+    complete by bulk updates. If a transaction fails, the jobs of the batch are
+    written one by one and failures are logged, those jobs simply remain
+    incomplete.
+
+    Drivers that claim jobs pass their `worker_id`. Then only jobs that are
+    still leased to that driver are completed, the results of jobs whose lease
+    was taken over by another driver are dropped, and the leases of the
+    remaining running jobs are renewed with every written batch.
+    """
+
+    # bound parameters per IN clause, SQLite allows 999 per statement
+    MAX_IDS = 500
+
+    def __init__(self, session, batch_size=100, worker_id=None, lease=3600):
+        """
+        Parameters
+        ----------
+        session: sqlalchemy.orm.Session
+            The session used for writing.
+        batch_size: int (optional)
+            Write once results of this many jobs are buffered.
+        worker_id: str (optional)
+            Name of the driver that claimed the jobs, see `Job.claim`.
+        lease: int (optional)
+            Seconds by which the leases of running jobs are extended.
+        """
+        self.session = session
+        self.batch_size = batch_size
+        self.worker_id = worker_id
+        self.lease = lease
+        self.job_ids = list()
+        self.rows = list()
+        self.metrics = list()
+
+    def add(self, job_id, rows, metrics=None):
+        """
+        Buffer the result rows of a job and write them if the batch is full.
+        Rows of `metrics`, e.g., from `Metrics.rows`, are written alongside.
+        """
+        self.job_ids.append(job_id)
+        self.rows.extend(rows)
+        if metrics is not None:
+            self.metrics.extend(metrics)
+        if len(self.job_ids) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        """
+        Write all buffered results.
+
+        Returns
+        -------
+        The number of jobs marked complete.
+        """
+        if len(self.job_ids) == 0:
+            return 0
+        (job_ids, rows, metrics) = (self.job_ids, self.rows, self.metrics)
+        self.job_ids = list()
+        self.rows = list()
+        self.metrics = list()
+        try:
+            return self._write(job_ids, rows, metrics)
+        except Exception:
+            self.session.rollback()
+            LOGGER.exception("failed to write the results of %d jobs at once,"\
+                    " retrying them one by one", len(job_ids))
+        num_written = 0
+        for job_id in job_ids:
+            try:
+                num_written += self._write([job_id], [row for row in rows
+                        if row["job_id"] == job_id], [row for row in metrics
+                        if row["job_id"] == job_id])
+            except Exception:
+                self.session.rollback()
+                LOGGER.exception("failed to write the results of job %d",
+                        job_id)
+        return num_written
+
+    def _write(self, job_ids, rows, metrics):
+        completed = set()
+        for start in range(0, len(job_ids), self.MAX_IDS):
+            completed.update(self._complete(job_ids[start:start +
+                    self.MAX_IDS]))
+        if len(completed) < len(job_ids):
+            LOGGER.warning("dropped the results of %d jobs no longer leased"\
+                    " to '%s'", len(job_ids) - len(completed), self.worker_id)
+            rows = [row for row in rows if row["job_id"] in completed]
+            metrics = [row for row in metrics if row["job_id"] in completed]
+        if len(rows) > 0:
+            self.session.execute(ControlResult.__table__.insert(), rows)
+        if len(metrics) > 0:
+            self.session.execute(JobMetrics.__table__.insert(), metrics)
+        if self.worker_id is not None:
+            Job.renew(self.session, self.worker_id, self.lease)
+        self.session.commit()
+        return len(completed)
+
+    def _complete(self, job_ids):
+        """
+        Mark jobs complete and return the ids of those that were.
+        """
+        job = Job.__table__
+        condition = job.c.id.in_(job_ids)
+        if self.worker_id is None:
+            self.session.execute(job.update().where(condition).values(
+                    complete=True, status="complete"))
+            return job_ids
+        # only jobs that are still leased to this driver
+        condition = and_(condition, job.c.worker_id == self.worker_id,
+                job.c.status == "running")
+        stmt = job.update().where(condition).values(complete=True,
+                status="complete")
+        # the dialect flag only exists as of SQLAlchemy 2.0
+        if getattr(self.session.get_bind().dialect, "update_returning", False):
+            return [row[0] for row in self.session.execute(stmt.returning(
+                    job.c.id))]
+        owned = [row[0] for row in self.session.execute(select(
+                job.c.id).where(condition))]
+        self.session.execute(stmt)
+        return owned
@@ -22,14 +22,16 @@ Boolean Dynamics Networks
 from __future__ import (absolute_import, unicode_literals)
 
 
-__all__ = ["random_regulatory", "test_feedback"]
+__all__ = ["random_regulatory", "random_regulatory_dynamics", "test_feedback"]
 
 
 import logging
-import random
 
+import numpy as np
 import networkx as nx
 
+from .classes import (BooleanDynamicsError, BooleanDynamics)
+
 
 LOGGER = logging.getLogger(__name__)
 LOGGER.addHandler(logging.NullHandler())
@@ -39,27 +41,81 @@ def add_self_inhibition(net, function="function"):
     if net.is_multigraph():
         for node in net:
             if not any(triple[2] == -1 for triple in\
-                    net.in_edges_iter(node, keys=True)):
+                    net.in_edges(node, keys=True)):
                 net.add_edge(node, node, key=-1)
     else:
         for node in net:
             if not any(data[function] == -1 for (_, _, data) in\
-                    net.in_edges_iter(node, data=True)):
+                    net.in_edges(node, data=True)):
                 net.add_edge(node, node, **{function: -1})
 
 def random_regulatory(num_nodes, num_activating, num_inhibiting,
         function="function", seed=None):
+    rng = np.random.default_rng(seed)
     net = nx.gnm_random_graph(num_nodes, num_activating + num_inhibiting,
-            seed=seed, directed=True)
-    edges = net.edges()
-    activating = random.sample(edges, num_activating)
-    for (u, v) in activating:
-        net[u][v][function] = 1
-    for (u, v) in list(set(edges) - set(activating)):
-        net[u][v][function] = -1
+            seed=int(rng.integers(np.iinfo(np.int32).max)), directed=True)
+    edges = list(net.edges())
+    signs = np.full(len(edges), -1, dtype=int)
+    signs[rng.permutation(len(edges))[:num_activating]] = 1
+    for ((u, v), sign) in zip(edges, signs.tolist()):
+        net[u][v][function] = sign
     add_self_inhibition(net, function)
     return net
 
+def random_regulatory_dynamics(num_nodes, num_activating, num_inhibiting,
+        seed=None, self_inhibition=True, rule="majority", **kw_args):
+    """
+    Generate a random regulatory network directly as boolean dynamics.
+
+    The same ensemble as `random_regulatory`, i.e., a directed G(n, m) random
+    graph without self-loops whose links are activating or inhibiting, but
+    sampled as arrays without ever building a networkx graph. Use
+    `BooleanDynamics.to_networkx` if the graph is needed.
+
+    Parameters
+    ----------
+    num_nodes: int
+        The number of nodes.
+    num_activating: int
+        The number of activating links (function 1).
+    num_inhibiting: int
+        The number of inhibiting links (function -1).
+    seed: int, numpy.random.Generator, or numpy.random.SeedSequence (optional)
+        Source of randomness for all draws.
+    self_inhibition: bool (optional)
+        Add an inhibiting self-loop to every node without inhibiting input.
+    rule: str (optional)
+        The update rule, additional keyword arguments are passed on to
+        `BooleanDynamics.set_rule`.
+
+    Returns
+    -------
+    A `BooleanDynamics` instance with nodes labelled 0 to (`num_nodes` - 1).
+    """
+    rng = np.random.default_rng(seed)
+    num_links = num_activating + num_inhibiting
+    max_links = num_nodes * (num_nodes - 1)
+    if num_activating < 0 or num_inhibiting < 0 or num_links > max_links:
+        raise BooleanDynamicsError("cannot place {:d} links among {:d}"\
+                " nodes".format(num_links, num_nodes))
+    # enumerate the ordered pairs without self-loops, the sample is in random
+    # order so that its head can be taken as the activating links
+    pairs = rng.choice(max_links, size=num_links, replace=False)
+    sources = pairs // (num_nodes - 1)
+    targets = pairs % (num_nodes - 1)
+    targets += (targets >= sources)
+    functions = np.full(num_links, -1, dtype=np.int32)
+    functions[:num_activating] = 1
+    if self_inhibition:
+        loops = np.flatnonzero(np.bincount(targets[num_activating:],
+                minlength=num_nodes) == 0)
+        sources = np.concatenate((sources, loops))
+        targets = np.concatenate((targets, loops))
+        functions = np.concatenate((functions,
+                np.full(len(loops), -1, dtype=np.int32)))
+    return BooleanDynamics.from_edge_arrays(sources, targets, functions,
+            num_nodes, rule=rule, **kw_args)
+
 def test_feedback():
     net = nx.DiGraph()
     net.add_edge("A", "B", function=1)
@@ -0,0 +1,128 @@
+# -*- coding: utf-8 -*-
+
+
+"""
+==========================
+Boolean Dynamics Profiling
+==========================
+
+:Author:
+    Moritz Emanuel Beber
+:Date:
+    2026-10-18
+:Copyright:
+    Copyright |c| 2026, Jacobs University Bremen gGmbH, all rights reserved.
+:File:
+    profiling.py
+
+.. |c| unicode:: U+A9
+"""
+
+
+from __future__ import (absolute_import, unicode_literals)
+
+
+__all__ = ["Metrics", "recording", "stage", "count"]
+
+
+import logging
+import threading
+from time import time
+from contextlib import contextmanager
+
+
+LOGGER = logging.getLogger(__name__)
+LOGGER.addHandler(logging.NullHandler())
+
+
+# metrics that are currently being recorded, per thread
+_ACTIVE = threading.local()
+
+
+class Metrics(object):
+    """
+    Timers and counters of one job.
+
+    Attributes
+    ----------
+    timers: dict
+        Accumulated wall-clock seconds per stage.
+    counters: dict
+        Accumulated values per counter, the simulations count 'steps'
+        (trajectory steps computed), 'edges' (links evaluated), and 'bytes'
+        (buffers allocated).
+    """
+
+    def __init__(self):
+        self.timers = dict()
+        self.counters = dict()
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def stage(self, name):
+        """
+        Time the enclosed block and add it to the stage `name`.
+        """
+        start = time()
+        try:
+            yield self
+        finally:
+            self.add_time(name, time() - start)
+
+    def add_time(self, name, seconds):
+        with self._lock:
+            self.timers[name] = self.timers.get(name, 0.0) + seconds
+
+    def count(self, name, value=1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def rows(self, job_id):
+        """
+        Describe all metrics as rows for the `JobMetrics` table.
+        """
+        rows = [{"job_id": job_id, "kind": "time", "name": name,
+                "value": value} for (name, value) in self.timers.items()]
+        rows.extend({"job_id": job_id, "kind": "count", "name": name,
+                "value": value} for (name, value) in self.counters.items())
+        return rows
+
+
+@contextmanager
+def recording(metrics=None):
+    """
+    Collect the timers and counters of the library into `metrics` while the
+    enclosed block runs in this thread.
+
+    Yields
+    ------
+    The `Metrics` instance, a new one if none was given.
+    """
+    if metrics is None:
+        metrics = Metrics()
+    previous = getattr(_ACTIVE, "metrics", None)
+    _ACTIVE.metrics = metrics
+    try:
+        yield metrics
+    finally:
+        _ACTIVE.metrics = previous
+
+@contextmanager
+def stage(name):
+    """
+    Time the enclosed block as stage `name` if metrics are being recorded.
+    """
+    metrics = getattr(_ACTIVE, "metrics", None)
+    if metrics is None:
+        yield None
+    else:
+        with metrics.stage(name):
+            yield metrics
+
+def count(name, value=1):
+    """
+    Add `value` to the counter `name` if metrics are being recorded.
+    """
+    metrics = getattr(_ACTIVE, "metrics", None)
+    if metrics is not None:
+        metrics.count(name, value)
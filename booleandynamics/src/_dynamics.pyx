@@ -20,16 +20,187 @@
 #"""
 
 
+from libc.stdint cimport (int64_t, uint32_t, uint64_t)
+
 cimport cdynamics as dyn
 
 
 ctypedef unsigned char UChar
 
 
-def time_series(UChar[:] states, int[:] inc_adj, int[:] inc_reg, int[:] inc_ptr,
-        int num_nodes, UChar[:] series, int steps):
-    # randomize initial state
-    dyn.time_series(&states[0], &inc_adj[0], &inc_reg[0], &inc_ptr[0], num_nodes,
-            &series[0], steps)
+UPDATE_SYNCHRONOUS = dyn.UPDATE_SYNCHRONOUS
+UPDATE_SEQUENTIAL = dyn.UPDATE_SEQUENTIAL
+UPDATE_RANDOM_SEQUENTIAL = dyn.UPDATE_RANDOM_SEQUENTIAL
+UPDATE_RANDOM_SINGLE = dyn.UPDATE_RANDOM_SINGLE
+
+
+RULE_MAJORITY = dyn.RULE_MAJORITY
+RULE_THRESHOLD = dyn.RULE_THRESHOLD
+RULE_TRUTH_TABLE = dyn.RULE_TRUTH_TABLE
+RULE_CANALIZING = dyn.RULE_CANALIZING
+
+
+cdef int check_status(int status, object buffers) except -1:
+    """
+    Turn the return codes of the kernels into exceptions.
+    """
+    if status == dyn.DYNAMICS_MEMORY_ERROR:
+        raise MemoryError("failed to allocate {}".format(buffers))
+    elif status < 0:
+        raise RuntimeError("kernel failed with status {:d}".format(status))
+    return 0
+
+
+cdef class Network:
+    """
+    Read-only view of the topology and rule parameters passed to the kernels.
+    """
+    cdef dyn.BooleanNetwork net
+    cdef int[:] inc_ptr
+    cdef int[:] inc_adj
+    cdef int[:] inc_reg
+    cdef double[:] weights
+    cdef double[:] thresholds
+    cdef uint64_t[:] tables
+    cdef int64_t[:] table_ptr
+    cdef UChar[:] canalizing
+    cdef UChar[:] canalized
+    cdef UChar[:] defaults
+    cdef signed char[:] clamps
+
+    def __cinit__(self, int num_nodes, int[:] inc_ptr, int[:] inc_adj,
+            int[:] inc_reg, int rule, double[:] weights, double[:] thresholds,
+            uint64_t[:] tables, int64_t[:] table_ptr, UChar[:] canalizing,
+            UChar[:] canalized, UChar[:] defaults, signed char[:] clamps=None):
+        # keep the buffers alive as long as the struct points into them
+        self.inc_ptr = inc_ptr
+        self.inc_adj = inc_adj
+        self.inc_reg = inc_reg
+        self.weights = weights
+        self.thresholds = thresholds
+        self.tables = tables
+        self.table_ptr = table_ptr
+        self.canalizing = canalizing
+        self.canalized = canalized
+        self.defaults = defaults
+        self.clamps = clamps
+        self.net.num_nodes = num_nodes
+        self.net.inc_ptr = &inc_ptr[0]
+        self.net.inc_adj = &inc_adj[0]
+        self.net.rule = rule
+        self.net.regulation = &inc_reg[0]
+        self.net.weights = &weights[0]
+        self.net.thresholds = &thresholds[0]
+        self.net.tables = &tables[0]
+        self.net.table_ptr = &table_ptr[0]
+        self.net.canalizing = &canalizing[0]
+        self.net.canalized = &canalized[0]
+        self.net.defaults = &defaults[0]
+        if clamps is None:
+            self.net.clamps = NULL
+        else:
+            self.net.clamps = &clamps[0]
+
+
+def time_series(Network network, UChar[:] states, UChar[:] series, int steps,
+        int mode, int[:] order, uint64_t[:] rng_state, bint detect_cycle=False):
+    cdef int64_t transient = -1
+    cdef int64_t period = 0
+    cdef int status
+    with nogil:
+        status = dyn.time_series(&network.net, &states[0], &series[0], steps,
+                mode, &order[0], &rng_state[0], detect_cycle, &transient,
+                &period)
+    check_status(status, "the update order")
+    return (transient, period)
+
+def ensemble_series(Network network, UChar[:] states, size_t num_states,
+        UChar[:] series, size_t steps, int mode, int[:] order,
+        uint64_t[:] rng_states, bint detect_cycle, int64_t[:] transients,
+        int64_t[:] periods):
+    cdef int status
+    with nogil:
+        status = dyn.ensemble_series(&network.net, &states[0], num_states,
+                &series[0], steps, mode, &order[0], &rng_states[0],
+                detect_cycle, &transients[0], &periods[0])
+    check_status(status, "the update order")
     return series
 
+def window_counts(Network network, UChar[:] states, size_t num_states,
+        size_t steps, size_t window, int mode, int[:] order,
+        uint64_t[:] rng_states, uint32_t[:] counts, size_t num_windows):
+    cdef int status
+    with nogil:
+        status = dyn.window_counts(&network.net, &states[0], num_states, steps,
+                window, mode, &order[0], &rng_states[0], &counts[0],
+                num_windows)
+    check_status(status, "the state buffers")
+    return counts
+
+def damage_spreading(Network network, int[:] out_ptr, int[:] out_adj,
+        UChar[:] states, size_t num_states, int64_t[:] flip_ptr,
+        int[:] flip_nodes, size_t num_flips, bint shared_flips, size_t steps,
+        int mode, int[:] order, uint64_t[:] rng_states,
+        uint32_t[:] distances):
+    cdef int status
+    with nogil:
+        status = dyn.damage_spreading(&network.net, &out_ptr[0], &out_adj[0],
+                &states[0], num_states, &flip_ptr[0], &flip_nodes[0],
+                num_flips, shared_flips, steps, mode, &order[0],
+                &rng_states[0], &distances[0])
+    check_status(status, "the reference trajectory")
+    return distances
+
+def knockout_screen(Network network, int[:] nodes, UChar[:] values,
+        size_t num_knockouts, UChar[:] states, size_t num_states, size_t steps,
+        int mode, int[:] order, uint64_t[:] rng_states, uint32_t[:] counts):
+    cdef int status
+    with nogil:
+        status = dyn.knockout_screen(&network.net, &nodes[0], &values[0],
+                num_knockouts, &states[0], num_states, steps, mode, &order[0],
+                &rng_states[0], &counts[0])
+    check_status(status, "the knockout buffers")
+    return counts
+
+def packed_ensemble_series(uint64_t[:] states, int[:] inc_adj, int[:] inc_reg,
+        int[:] inc_ptr, int num_nodes, size_t num_words, uint64_t[:] series,
+        size_t steps):
+    with nogil:
+        dyn.packed_ensemble_series(&states[0], &inc_adj[0], &inc_reg[0],
+                &inc_ptr[0], num_nodes, num_words, &series[0], steps)
+    return series
+
+def find_attractors(Network network, UChar[:] states, size_t num_states,
+        size_t max_steps, int64_t[:] transients, int64_t[:] periods,
+        UChar[:] attractors):
+    cdef int status
+    with nogil:
+        status = dyn.find_attractors(&network.net, &states[0], num_states,
+                max_steps, &transients[0], &periods[0], &attractors[0])
+    check_status(status, "the state buffers")
+    return status == dyn.DYNAMICS_SUCCESS
+
+def state_transitions(Network network, int mode, int[:] order, uint64_t first,
+        size_t num_states, uint32_t[:] successors):
+    cdef int status
+    with nogil:
+        status = dyn.state_transitions(&network.net, mode, &order[0], first,
+                num_states, &successors[0])
+    check_status(status, "the state buffers")
+    return successors
+
+def attractor_basins(uint32_t[:] successors, uint32_t[:] basins,
+        UChar[:] cyclic):
+    cdef size_t num_attractors
+    with nogil:
+        num_attractors = dyn.attractor_basins(&successors[0],
+                successors.shape[0], &basins[0], &cyclic[0])
+    return num_attractors
+
+def cuthill_mckee(int[:] inc_ptr, int[:] inc_adj, int[:] ordering):
+    cdef int status
+    with nogil:
+        status = dyn.cuthill_mckee(&inc_ptr[0], &inc_adj[0],
+                ordering.shape[0], &ordering[0])
+    check_status(status, "the visited nodes")
+    return ordering
@@ -20,9 +20,71 @@
 #"""
 
 
-cdef extern from "dynamics.h":
-    void attractor_finder(unsigned char *states, int *inc_adj, int *inc_reg, int *inc_ptr,
-            const int num_nodes, size_t *attractor_id, const size_t num_states)
-    void time_series(unsigned char *states, int *inc_adj, int *inc_reg, int *inc_ptr,
-            const int num_nodes, unsigned char *series, const size_t time)
+from libc.stdint cimport (int64_t, uint32_t, uint64_t)
 
+
+cdef extern from "dynamics.h" nogil:
+    int DYNAMICS_SUCCESS
+    int DYNAMICS_MEMORY_ERROR
+    int DYNAMICS_NOT_FOUND
+    int UPDATE_SYNCHRONOUS
+    int UPDATE_SEQUENTIAL
+    int UPDATE_RANDOM_SEQUENTIAL
+    int UPDATE_RANDOM_SINGLE
+    int RULE_MAJORITY
+    int RULE_THRESHOLD
+    int RULE_TRUTH_TABLE
+    int RULE_CANALIZING
+    ctypedef struct BooleanNetwork:
+        int num_nodes
+        int *inc_ptr
+        int *inc_adj
+        int rule
+        int *regulation
+        double *weights
+        double *thresholds
+        uint64_t *tables
+        int64_t *table_ptr
+        unsigned char *canalizing
+        unsigned char *canalized
+        unsigned char *defaults
+        signed char *clamps
+    int time_series(const BooleanNetwork *net, unsigned char *states,
+            unsigned char *series, const size_t time, const int mode,
+            const int *order, uint64_t *rng_state, const int detect_cycle,
+            int64_t *transient, int64_t *period)
+    int ensemble_series(const BooleanNetwork *net, unsigned char *states,
+            const size_t num_states, unsigned char *series, const size_t time,
+            const int mode, const int *order, uint64_t *rng_states,
+            const int detect_cycle, int64_t *transients, int64_t *periods)
+    int window_counts(const BooleanNetwork *net, unsigned char *states,
+            const size_t num_states, const size_t time, const size_t window,
+            const int mode, const int *order, uint64_t *rng_states,
+            uint32_t *counts, const size_t num_windows)
+    int damage_spreading(const BooleanNetwork *net, const int *out_ptr,
+            const int *out_adj, unsigned char *states,
+            const size_t num_states, const int64_t *flip_ptr,
+            const int *flip_nodes, const size_t num_flips,
+            const int shared_flips, const size_t time, const int mode,
+            const int *order, uint64_t *rng_states, uint32_t *distances)
+    int knockout_screen(const BooleanNetwork *net, const int *nodes,
+            const unsigned char *values, const size_t num_knockouts,
+            const unsigned char *states, const size_t num_states,
+            const size_t time, const int mode, const int *order,
+            const uint64_t *rng_states, uint32_t *counts)
+    void packed_ensemble_series(uint64_t *states, int *inc_adj, int *inc_reg,
+            int *inc_ptr, const int num_nodes, const size_t num_words,
+            uint64_t *series, const size_t time)
+    int find_attractor(const BooleanNetwork *net, unsigned char *states,
+            const size_t max_steps, int64_t *transient, int64_t *period,
+            unsigned char *attractor)
+    int find_attractors(const BooleanNetwork *net, unsigned char *states,
+            const size_t num_states, const size_t max_steps,
+            int64_t *transients, int64_t *periods, unsigned char *attractors)
+    int state_transitions(const BooleanNetwork *net, const int mode,
+            const int *order, const uint64_t first, const size_t num_states,
+            uint32_t *successors)
+    size_t attractor_basins(const uint32_t *successors,
+            const size_t num_states, uint32_t *basins, unsigned char *cyclic)
+    int cuthill_mckee(const int *inc_ptr, const int *inc_adj,
+            const int num_nodes, int *ordering)
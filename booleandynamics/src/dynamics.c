@@ -29,7 +29,6 @@ majority_activation(unsigned char current, unsigned char *states,
         int *inc_adj, int *regulation, const int num_pred)
 {
     int i = 0;
-    int pred = 0;
     int state_sum = 0;
     for (i = 0; i < num_pred; ++i) {
         state_sum += states[inc_adj[i]] * regulation[i];
@@ -45,64 +44,980 @@ majority_activation(unsigned char current, unsigned char *states,
     }
 }
 
-void
-attractor_finder(unsigned char *states, int *inc_adj, int *regulation, int *inc_ptr,
-        const int num_nodes,
-        size_t *attractor_id, const size_t num_states)
+static unsigned char
+majority_rule(const BooleanNetwork *net, const int node,
+        const unsigned char *states)
+{
+    const int begin = net->inc_ptr[node];
+    return majority_activation(states[node], (unsigned char *)states,
+            &net->inc_adj[begin], &net->regulation[begin],
+            net->inc_ptr[node + 1] - begin);
+}
+
+static unsigned char
+threshold_rule(const BooleanNetwork *net, const int node,
+        const unsigned char *states)
+{
+    int i = 0;
+    double weight_sum = 0.0;
+    for (i = net->inc_ptr[node]; i < net->inc_ptr[node + 1]; ++i) {
+        weight_sum += states[net->inc_adj[i]] * net->weights[i];
+    }
+    if (weight_sum > net->thresholds[node]) {
+        return (unsigned char)1;
+    }
+    else if (weight_sum < net->thresholds[node]) {
+        return (unsigned char)0;
+    }
+    else {
+        return states[node];
+    }
+}
+
+static unsigned char
+truth_table_rule(const BooleanNetwork *net, const int node,
+        const unsigned char *states)
+{
+    int i = 0;
+    uint64_t index = 0;
+    const uint64_t *table = &net->tables[net->table_ptr[node]];
+    /* the state of the k-th predecessor is bit k of the table index */
+    for (i = net->inc_ptr[node + 1] - 1; i >= net->inc_ptr[node]; --i) {
+        index = (index << 1) | states[net->inc_adj[i]];
+    }
+    return (unsigned char)((table[index >> 6] >> (index & 63)) & 1);
+}
+
+static unsigned char
+canalizing_rule(const BooleanNetwork *net, const int node,
+        const unsigned char *states)
+{
+    int i = 0;
+    /* the first predecessor in its canalizing state determines the output */
+    for (i = net->inc_ptr[node]; i < net->inc_ptr[node + 1]; ++i) {
+        if (states[net->inc_adj[i]] == net->canalizing[i]) {
+            return net->canalized[i];
+        }
+    }
+    return net->defaults[node];
+}
+
+/* clamped nodes keep their value whatever their rule says */
+#define CLAMPED(net, n, value) \
+    (((net)->clamps != NULL && (net)->clamps[n] >= 0) ? \
+     (unsigned char)(net)->clamps[n] : (value))
+
+/* one synchronous update function per rule such that the rule is inlined and
+ * the choice of rule is made once per run rather than once per node */
+#define SYNCHRONOUS_UPDATE(name, rule) \
+static void \
+name(const BooleanNetwork *net, const unsigned char *old_states, \
+        unsigned char *new_states) \
+{ \
+    int n = 0; \
+    for (n = 0; n < net->num_nodes; ++n) { \
+        new_states[n] = CLAMPED(net, n, rule(net, n, old_states)); \
+    } \
+}
+
+SYNCHRONOUS_UPDATE(majority_update, majority_rule)
+SYNCHRONOUS_UPDATE(threshold_update, threshold_rule)
+SYNCHRONOUS_UPDATE(truth_table_update, truth_table_rule)
+SYNCHRONOUS_UPDATE(canalizing_update, canalizing_rule)
+
+typedef unsigned char (*node_rule)(const BooleanNetwork *net, const int node,
+        const unsigned char *states);
+typedef void (*synchronous_update)(const BooleanNetwork *net,
+        const unsigned char *old_states, unsigned char *new_states);
+
+/* indexed by the RULE_* constants */
+static const node_rule NODE_RULES[] = {majority_rule, threshold_rule,
+    truth_table_rule, canalizing_rule};
+static const synchronous_update SYNCHRONOUS_UPDATES[] = {majority_update,
+    threshold_update, truth_table_update, canalizing_update};
+
+static void
+swap_states(unsigned char **first, unsigned char **second)
+{
+    unsigned char *tmp = *first;
+    *first = *second;
+    *second = tmp;
+}
+
+static int
+periodic_tail(unsigned char *series, const int num_nodes, const size_t t,
+        const size_t time, size_t *checkpoint, size_t *power,
+        int64_t *transient, int64_t *period)
+{
+    size_t lambda = 0;
+    size_t mu = 0;
+    size_t s = 0;
+    const size_t size = num_nodes * sizeof(unsigned char);
+    /* Brent's cycle detection on the stored rows: the checkpoint waits at
+     * powers of two for the latest state to come around */
+    if (memcmp(&series[t * num_nodes], &series[*checkpoint * num_nodes],
+                size) != 0) {
+        if (t - *checkpoint == *power) {
+            *checkpoint = t;
+            *power *= 2;
+        }
+        return 0;
+    }
+    lambda = t - *checkpoint;
+    while (memcmp(&series[mu * num_nodes], &series[(mu + lambda) * num_nodes],
+                size) != 0) {
+        ++mu;
+    }
+    /* the remaining rows simply repeat the cycle */
+    for (s = t + 1; s < time; ++s) {
+        memcpy(&series[s * num_nodes], &series[(s - lambda) * num_nodes], size);
+    }
+    *transient = (int64_t)mu;
+    *period = (int64_t)lambda;
+    return 1;
+}
+
+static void
+asynchronous_update(const BooleanNetwork *net, unsigned char *states,
+        const node_rule rule, const int mode, const int *order,
+        int *permutation, uint64_t *rng_state)
+{
+    const int num_nodes = net->num_nodes;
+    int n = 0;
+    int i = 0;
+    int j = 0;
+    /* nodes are updated in place such that later nodes see the new states */
+    switch (mode) {
+        case UPDATE_SEQUENTIAL:
+            for (i = 0; i < num_nodes; ++i) {
+                n = order[i];
+                states[n] = CLAMPED(net, n, rule(net, n, states));
+            }
+            break;
+        case UPDATE_RANDOM_SEQUENTIAL:
+            /* inside-out Fisher-Yates shuffle of the identity, each step thus
+             * only depends on the state of the random stream */
+            for (i = 0; i < num_nodes; ++i) {
+                j = (int)rng_bounded(rng_state, (uint32_t)(i + 1));
+                permutation[i] = permutation[j];
+                permutation[j] = i;
+            }
+            for (i = 0; i < num_nodes; ++i) {
+                n = permutation[i];
+                states[n] = CLAMPED(net, n, rule(net, n, states));
+            }
+            break;
+        case UPDATE_RANDOM_SINGLE:
+            /* one step consists of as many single node updates as there are
+             * nodes, drawn with replacement */
+            for (i = 0; i < num_nodes; ++i) {
+                n = (int)rng_bounded(rng_state, (uint32_t)num_nodes);
+                states[n] = CLAMPED(net, n, rule(net, n, states));
+            }
+            break;
+    }
+}
+
+static void
+advance(const BooleanNetwork *net, const synchronous_update update,
+        const node_rule rule, const int mode, const int *order,
+        int *permutation, uint64_t *rng_state, const unsigned char *old_states,
+        unsigned char *new_states)
+{
+    if (mode == UPDATE_SYNCHRONOUS) {
+        update(net, old_states, new_states);
+    }
+    else {
+        memcpy(new_states, old_states, net->num_nodes * sizeof(unsigned char));
+        asynchronous_update(net, new_states, rule, mode, order, permutation,
+                rng_state);
+    }
+}
+
+static int
+new_permutation(const int mode, const int num_nodes, int **permutation)
+{
+    *permutation = NULL;
+    if (mode != UPDATE_RANDOM_SEQUENTIAL) {
+        return DYNAMICS_SUCCESS;
+    }
+    *permutation = malloc(num_nodes * sizeof(int));
+    if (*permutation == NULL) {
+        return DYNAMICS_MEMORY_ERROR;
+    }
+    return DYNAMICS_SUCCESS;
+}
+
+int
+ensemble_series(const BooleanNetwork *net, unsigned char *states,
+        const size_t num_states, unsigned char *series, const size_t time,
+        const int mode, const int *order, uint64_t *rng_states,
+        const int detect_cycle, int64_t *transients, int64_t *periods)
+{
+    const int num_nodes = net->num_nodes;
+    const synchronous_update update = SYNCHRONOUS_UPDATES[net->rule];
+    const node_rule rule = NODE_RULES[net->rule];
+    size_t i = 0;
+    size_t t = 0;
+    size_t checkpoint = 0;
+    size_t power = 1;
+    unsigned char *trajectory = NULL;
+    int *permutation = NULL;
+    if (new_permutation(mode, num_nodes, &permutation) != DYNAMICS_SUCCESS) {
+        return DYNAMICS_MEMORY_ERROR;
+    }
+    for (i = 0; i < num_states; ++i) {
+        transients[i] = -1;
+        periods[i] = 0;
+        checkpoint = 0;
+        power = 1;
+        /* each trajectory occupies a contiguous (time x num_nodes) block and
+         * every step is written directly into the next row of that block */
+        trajectory = &series[i * time * num_nodes];
+        memcpy(trajectory, &states[i * num_nodes],
+                num_nodes * sizeof(unsigned char));
+        for (t = 1; t < time; ++t) {
+            advance(net, update, rule, mode, order, permutation,
+                    &rng_states[4 * i], &trajectory[(t - 1) * num_nodes],
+                    &trajectory[t * num_nodes]);
+            if (detect_cycle && periodic_tail(trajectory, num_nodes, t, time,
+                        &checkpoint, &power, &transients[i], &periods[i])) {
+                break;
+            }
+        }
+    }
+    free(permutation);
+    return DYNAMICS_SUCCESS;
+}
+
+int
+time_series(const BooleanNetwork *net, unsigned char *states,
+        unsigned char *series, const size_t time, const int mode,
+        const int *order, uint64_t *rng_state, const int detect_cycle,
+        int64_t *transient, int64_t *period)
 {
+    return ensemble_series(net, states, 1, series, time, mode, order, rng_state,
+            detect_cycle, transient, period);
+}
+
+int
+window_counts(const BooleanNetwork *net, unsigned char *states,
+        const size_t num_states, const size_t time, const size_t window,
+        const int mode, const int *order, uint64_t *rng_states,
+        uint32_t *counts, const size_t num_windows)
+{
+    const int num_nodes = net->num_nodes;
+    const synchronous_update update = SYNCHRONOUS_UPDATES[net->rule];
+    const node_rule rule = NODE_RULES[net->rule];
     size_t i = 0;
+    size_t t = 0;
+    size_t w = 0;
     int n = 0;
-    int begin = 0;
-    int end = 0;
-    size_t id = 0;
-    size_t old_id = 0;
-    unsigned char *old_states = NULL;
-    old_states = malloc(num_nodes * sizeof(unsigned char));
-    if (old_states == NULL) {
-        printf("memory allocation failed");
-        return;
+    unsigned char *buffer = NULL;
+    unsigned char *current = NULL;
+    unsigned char *next = NULL;
+    uint32_t *row = NULL;
+    int *permutation = NULL;
+    if (new_permutation(mode, num_nodes, &permutation) != DYNAMICS_SUCCESS) {
+        return DYNAMICS_MEMORY_ERROR;
+    }
+    buffer = malloc(2 * num_nodes * sizeof(unsigned char));
+    if (buffer == NULL) {
+        free(permutation);
+        return DYNAMICS_MEMORY_ERROR;
     }
+    memset(counts, 0, num_windows * num_nodes * sizeof(uint32_t));
+    /* the trajectories are stitched together one after the other and only the
+     * number of ON states per node and window of that timeline are kept */
     for (i = 0; i < num_states; ++i) {
-        memcpy(old_states, states, num_nodes * sizeof(unsigned char));
-        old_id = id;
-        for (n = 0; n < num_nodes; ++n) {
-            begin = inc_ptr[n];
-            end = inc_ptr[n + 1];
-            states[n] = majority_activation(old_states[n], old_states,
-                    &inc_adj[begin], &regulation[begin], end - begin);
-            id = get_state_id(states, num_nodes);
+        current = buffer;
+        next = &buffer[num_nodes];
+        memcpy(current, &states[i * num_nodes],
+                num_nodes * sizeof(unsigned char));
+        for (t = 0; t < time; ++t) {
+            w = (i * time + t) / window;
+            if (w >= num_windows) {
+                break;
+            }
+            if (t > 0) {
+                advance(net, update, rule, mode, order, permutation,
+                        &rng_states[4 * i], current, next);
+                swap_states(&current, &next);
+            }
+            row = &counts[w * num_nodes];
+            for (n = 0; n < num_nodes; ++n) {
+                row[n] += current[n];
+            }
         }
-        attractor_id[i] = old_id;
     }
-    free(states);
-    free(old_states);
+    free(buffer);
+    free(permutation);
+    return DYNAMICS_SUCCESS;
 }
 
-void
-time_series(unsigned char *states, int *inc_adj, int *regulation, int *inc_ptr, const int num_nodes,
-        unsigned char *series, const size_t time)
+static uint32_t
+damage_front(const BooleanNetwork *net, const node_rule rule,
+        const int *out_ptr, const int *out_adj, const unsigned char *states,
+        const unsigned char *reference, const int *damaged,
+        const uint32_t num_damaged, int *candidates, size_t *marks,
+        const size_t stamp, int *next_damaged)
 {
+    uint32_t d = 0;
+    uint32_t num_next = 0;
+    size_t num_candidates = 0;
+    size_t c = 0;
+    int j = 0;
+    int n = 0;
+    /* under the synchronous update only damaged nodes and their targets can
+     * differ from the reference in the next step */
+    for (d = 0; d < num_damaged; ++d) {
+        n = damaged[d];
+        if (marks[n] != stamp) {
+            marks[n] = stamp;
+            candidates[num_candidates++] = n;
+        }
+        for (j = out_ptr[n]; j < out_ptr[n + 1]; ++j) {
+            if (marks[out_adj[j]] != stamp) {
+                marks[out_adj[j]] = stamp;
+                candidates[num_candidates++] = out_adj[j];
+            }
+        }
+    }
+    for (c = 0; c < num_candidates; ++c) {
+        n = candidates[c];
+        if (CLAMPED(net, n, rule(net, n, states)) != reference[n]) {
+            next_damaged[num_next++] = n;
+        }
+    }
+    return num_next;
+}
+
+int
+damage_spreading(const BooleanNetwork *net, const int *out_ptr,
+        const int *out_adj, unsigned char *states, const size_t num_states,
+        const int64_t *flip_ptr, const int *flip_nodes, const size_t num_flips,
+        const int shared_flips, const size_t time, const int mode,
+        const int *order, uint64_t *rng_states, uint32_t *distances)
+{
+    const int num_nodes = net->num_nodes;
+    const synchronous_update update = SYNCHRONOUS_UPDATES[net->rule];
+    const node_rule rule = NODE_RULES[net->rule];
+    const size_t size = num_nodes * sizeof(unsigned char);
+    /* widespread damage is cheaper to follow with the full update */
+    const size_t mean_degree = net->inc_ptr[num_nodes] / (num_nodes + 1);
+    size_t i = 0;
+    size_t p = 0;
     size_t t = 0;
+    size_t k = 0;
+    size_t stamp = 0;
+    int64_t j = 0;
+    int n = 0;
+    uint32_t d = 0;
+    uint32_t num_damaged = 0;
+    uint64_t start_state[4];
+    uint64_t copy_state[4];
+    unsigned char *buffer = NULL;
+    unsigned char *reference = NULL;
+    unsigned char *current = NULL;
+    unsigned char *next = NULL;
+    uint32_t *distance = NULL;
+    int *lists = NULL;
+    int *damaged = NULL;
+    int *next_damaged = NULL;
+    int *candidates = NULL;
+    int *swap = NULL;
+    size_t *marks = NULL;
+    int *permutation = NULL;
+    if (new_permutation(mode, num_nodes, &permutation) != DYNAMICS_SUCCESS) {
+        return DYNAMICS_MEMORY_ERROR;
+    }
+    buffer = malloc((time + 2) * size);
+    lists = malloc(3 * num_nodes * sizeof(int));
+    marks = calloc(num_nodes, sizeof(size_t));
+    if (buffer == NULL || lists == NULL || marks == NULL) {
+        free(marks);
+        free(lists);
+        free(buffer);
+        free(permutation);
+        return DYNAMICS_MEMORY_ERROR;
+    }
+    reference = buffer;
+    damaged = lists;
+    next_damaged = &lists[num_nodes];
+    candidates = &lists[2 * num_nodes];
+    for (i = 0; i < num_states; ++i) {
+        /* the reference trajectory is computed once per state and every
+         * perturbed copy replays its random stream, i.e., the copies are
+         * updated in the same order and coincide with the reference once
+         * their states do */
+        memcpy(start_state, &rng_states[4 * i], 4 * sizeof(uint64_t));
+        memcpy(reference, &states[i * num_nodes], size);
+        for (t = 1; t < time; ++t) {
+            advance(net, update, rule, mode, order, permutation,
+                    &rng_states[4 * i], &reference[(t - 1) * num_nodes],
+                    &reference[t * num_nodes]);
+        }
+        for (p = 0; p < num_flips; ++p) {
+            k = shared_flips ? p : i * num_flips + p;
+            distance = &distances[(i * num_flips + p) * time];
+            current = &buffer[time * num_nodes];
+            next = &buffer[(time + 1) * num_nodes];
+            memcpy(copy_state, start_state, 4 * sizeof(uint64_t));
+            memcpy(current, &states[i * num_nodes], size);
+            for (j = flip_ptr[k]; j < flip_ptr[k + 1]; ++j) {
+                current[flip_nodes[j]] ^= 1;
+            }
+            num_damaged = 0;
+            for (n = 0; n < num_nodes; ++n) {
+                if (current[n] != reference[n]) {
+                    damaged[num_damaged++] = n;
+                }
+            }
+            distance[0] = num_damaged;
+            for (t = 1; t < time; ++t) {
+                if (distance[t - 1] == 0) {
+                    /* the damage has healed for good */
+                    memset(&distance[t], 0, (time - t) * sizeof(uint32_t));
+                    break;
+                }
+                if (mode == UPDATE_SYNCHRONOUS &&
+                        (size_t)num_damaged * (mean_degree + 1) * 4 <
+                        (size_t)num_nodes) {
+                    num_damaged = damage_front(net, rule, out_ptr, out_adj,
+                            current, &reference[t * num_nodes], damaged,
+                            num_damaged, candidates, marks, ++stamp,
+                            next_damaged);
+                    /* the copy is the reference apart from the damage */
+                    memcpy(current, &reference[t * num_nodes], size);
+                    for (d = 0; d < num_damaged; ++d) {
+                        current[next_damaged[d]] ^= 1;
+                    }
+                    swap = damaged;
+                    damaged = next_damaged;
+                    next_damaged = swap;
+                    distance[t] = num_damaged;
+                }
+                else {
+                    advance(net, update, rule, mode, order, permutation,
+                            copy_state, current, next);
+                    swap_states(&current, &next);
+                    num_damaged = 0;
+                    for (n = 0; n < num_nodes; ++n) {
+                        /* branch-free collection of the damaged nodes */
+                        damaged[num_damaged] = n;
+                        num_damaged += (current[n] !=
+                                reference[t * num_nodes + n]);
+                    }
+                    distance[t] = num_damaged;
+                }
+            }
+        }
+    }
+    free(marks);
+    free(lists);
+    free(buffer);
+    free(permutation);
+    return DYNAMICS_SUCCESS;
+}
+
+int
+knockout_screen(const BooleanNetwork *net, const int *nodes,
+        const unsigned char *values, const size_t num_knockouts,
+        const unsigned char *states, const size_t num_states,
+        const size_t time, const int mode, const int *order,
+        const uint64_t *rng_states, uint32_t *counts)
+{
+    const int num_nodes = net->num_nodes;
+    const size_t size = num_states * num_nodes * sizeof(unsigned char);
+    size_t k = 0;
+    size_t i = 0;
+    int n = 0;
+    int status = DYNAMICS_SUCCESS;
+    BooleanNetwork variant = *net;
+    signed char *clamps = NULL;
+    unsigned char *initial = NULL;
+    uint64_t *streams = NULL;
+    clamps = malloc(num_nodes * sizeof(signed char));
+    initial = malloc(size);
+    streams = malloc(4 * num_states * sizeof(uint64_t));
+    if (clamps == NULL || initial == NULL || streams == NULL) {
+        free(streams);
+        free(initial);
+        free(clamps);
+        return DYNAMICS_MEMORY_ERROR;
+    }
+    if (net->clamps != NULL) {
+        memcpy(clamps, net->clamps, num_nodes * sizeof(signed char));
+    }
+    else {
+        memset(clamps, -1, num_nodes * sizeof(signed char));
+    }
+    variant.clamps = clamps;
+    /* every variant replays the same initial states and random streams such
+     * that differences in activity are due to the knockout alone */
+    for (k = 0; k < num_knockouts && status == DYNAMICS_SUCCESS; ++k) {
+        n = nodes[k];
+        clamps[n] = (signed char)values[k];
+        memcpy(initial, states, size);
+        for (i = 0; i < num_states; ++i) {
+            initial[i * num_nodes + n] = values[k];
+        }
+        memcpy(streams, rng_states, 4 * num_states * sizeof(uint64_t));
+        /* a single window spanning all trajectories */
+        status = window_counts(&variant, initial, num_states, time,
+                num_states * time, mode, order, streams,
+                &counts[k * num_nodes], 1);
+        clamps[n] = (net->clamps != NULL) ? net->clamps[n] : -1;
+    }
+    free(streams);
+    free(initial);
+    free(clamps);
+    return status;
+}
+
+static void
+packed_add(uint64_t *counter, uint64_t *other, uint64_t bits,
+        unsigned int weight, int *top)
+{
+    int slice = 0;
+    int k = 0;
+    uint64_t carry = 0;
+    uint64_t tmp = 0;
+    /* add `weight` copies of the 1-bit lanes in `bits` to the vertical
+     * (bit-sliced) counter by rippling a carry through its slices */
+    for (slice = 0; weight != 0; ++slice, weight >>= 1) {
+        if (!(weight & 1u)) {
+            continue;
+        }
+        carry = bits;
+        for (k = slice; carry != 0 && k < PACKED_SLICES; ++k) {
+            while (*top < k) {
+                /* lazily clear slices that neither counter has used yet */
+                ++(*top);
+                counter[*top] = 0;
+                other[*top] = 0;
+            }
+            tmp = counter[k] & carry;
+            counter[k] ^= carry;
+            carry = tmp;
+        }
+    }
+}
+
+uint64_t
+packed_majority_activation(uint64_t current, uint64_t *states, int *inc_adj,
+        int *regulation, const int num_pred)
+{
+    int i = 0;
+    int k = 0;
+    int top = -1;
+    uint64_t positive[PACKED_SLICES];
+    uint64_t negative[PACKED_SLICES];
+    uint64_t greater = 0;
+    uint64_t less = 0;
+    uint64_t undecided = 0;
+    for (i = 0; i < num_pred; ++i) {
+        if (regulation[i] > 0) {
+            packed_add(positive, negative, states[inc_adj[i]],
+                    (unsigned int)regulation[i], &top);
+        }
+        else if (regulation[i] < 0) {
+            packed_add(negative, positive, states[inc_adj[i]],
+                    (unsigned int)(-regulation[i]), &top);
+        }
+    }
+    /* compare both counters lane-wise starting with the most significant
+     * slice, a lane is decided by the first slice in which they differ */
+    for (k = top; k >= 0; --k) {
+        undecided = ~(greater | less);
+        greater |= undecided & positive[k] & ~negative[k];
+        less |= undecided & negative[k] & ~positive[k];
+    }
+    return greater | (current & ~less);
+}
+
+static void
+packed_synchronous_update(const uint64_t *old_states, uint64_t *new_states,
+        int *inc_adj, int *regulation, int *inc_ptr, const int num_nodes)
+{
     int n = 0;
     int begin = 0;
     int end = 0;
-    unsigned char *old_states = NULL;
-    old_states = malloc(num_nodes * sizeof(unsigned char));
-    if (old_states == NULL) {
-        printf("memory allocation failed\n");
-        return;
-    }
-    memcpy(&series[0], states, num_nodes * sizeof(unsigned char));
-    for (t = 1; t < time; ++t) {
-        memcpy(old_states, states, num_nodes * sizeof(unsigned char));
+    for (n = 0; n < num_nodes; ++n) {
+        begin = inc_ptr[n];
+        end = inc_ptr[n + 1];
+        new_states[n] = packed_majority_activation(old_states[n],
+                (uint64_t *)old_states, &inc_adj[begin], &regulation[begin],
+                end - begin);
+    }
+}
+
+void
+packed_ensemble_series(uint64_t *states, int *inc_adj, int *regulation,
+        int *inc_ptr, const int num_nodes, const size_t num_words,
+        uint64_t *series, const size_t time)
+{
+    size_t i = 0;
+    size_t t = 0;
+    uint64_t *trajectory = NULL;
+    for (i = 0; i < num_words; ++i) {
+        /* every word holds the states of 64 trajectories for one node */
+        trajectory = &series[i * time * num_nodes];
+        memcpy(trajectory, &states[i * num_nodes],
+                num_nodes * sizeof(uint64_t));
+        for (t = 1; t < time; ++t) {
+            packed_synchronous_update(&trajectory[(t - 1) * num_nodes],
+                    &trajectory[t * num_nodes], inc_adj, regulation, inc_ptr,
+                    num_nodes);
+        }
+    }
+}
+
+int
+find_attractor(const BooleanNetwork *net, unsigned char *states,
+        const size_t max_steps, int64_t *transient, int64_t *period,
+        unsigned char *attractor)
+{
+    const int num_nodes = net->num_nodes;
+    const synchronous_update update = SYNCHRONOUS_UPDATES[net->rule];
+    size_t power = 1;
+    size_t lambda = 1;
+    size_t mu = 0;
+    size_t steps = 1;
+    size_t i = 0;
+    const size_t size = num_nodes * sizeof(unsigned char);
+    unsigned char *buffer = NULL;
+    unsigned char *tortoise = NULL;
+    unsigned char *hare = NULL;
+    unsigned char *next = NULL;
+    buffer = malloc(3 * size);
+    if (buffer == NULL) {
+        return DYNAMICS_MEMORY_ERROR;
+    }
+    tortoise = buffer;
+    hare = &buffer[size];
+    next = &buffer[2 * size];
+    /* Brent's cycle detection: the tortoise waits at powers of two for the
+     * hare to come around which yields the period `lambda` */
+    memcpy(tortoise, states, size);
+    update(net, tortoise, hare);
+    while (memcmp(tortoise, hare, size) != 0) {
+        if (max_steps > 0 && steps >= max_steps) {
+            free(buffer);
+            *transient = -1;
+            *period = 0;
+            return DYNAMICS_NOT_FOUND;
+        }
+        if (power == lambda) {
+            memcpy(tortoise, hare, size);
+            power *= 2;
+            lambda = 0;
+        }
+        update(net, hare, next);
+        swap_states(&hare, &next);
+        ++lambda;
+        ++steps;
+    }
+    /* with the hare `lambda` steps ahead both meet at the first state of the
+     * cycle after the transient `mu` */
+    memcpy(tortoise, states, size);
+    memcpy(hare, states, size);
+    for (i = 0; i < lambda; ++i) {
+        update(net, hare, next);
+        swap_states(&hare, &next);
+    }
+    while (memcmp(tortoise, hare, size) != 0) {
+        update(net, tortoise, next);
+        swap_states(&tortoise, &next);
+        update(net, hare, next);
+        swap_states(&hare, &next);
+        ++mu;
+    }
+    /* the lexicographically smallest state of the cycle identifies it */
+    memcpy(attractor, tortoise, size);
+    for (i = 1; i < lambda; ++i) {
+        update(net, tortoise, next);
+        swap_states(&tortoise, &next);
+        if (memcmp(tortoise, attractor, size) < 0) {
+            memcpy(attractor, tortoise, size);
+        }
+    }
+    free(buffer);
+    *transient = (int64_t)mu;
+    *period = (int64_t)lambda;
+    return DYNAMICS_SUCCESS;
+}
+
+int
+find_attractors(const BooleanNetwork *net, unsigned char *states,
+        const size_t num_states, const size_t max_steps, int64_t *transients,
+        int64_t *periods, unsigned char *attractors)
+{
+    const int num_nodes = net->num_nodes;
+    size_t i = 0;
+    int status = DYNAMICS_SUCCESS;
+    int result = DYNAMICS_SUCCESS;
+    for (i = 0; i < num_states; ++i) {
+        status = find_attractor(net, &states[i * num_nodes], max_steps,
+                &transients[i], &periods[i], &attractors[i * num_nodes]);
+        if (status == DYNAMICS_MEMORY_ERROR) {
+            return status;
+        }
+        else if (status == DYNAMICS_NOT_FOUND) {
+            result = status;
+        }
+    }
+    return result;
+}
+
+/* bit n of lane j is bit n of j for the first six nodes of 64 consecutive
+ * state ids starting at a multiple of 64 */
+static const uint64_t LANE_BITS[] = {0xAAAAAAAAAAAAAAAAULL,
+    0xCCCCCCCCCCCCCCCCULL, 0xF0F0F0F0F0F0F0F0ULL, 0xFF00FF00FF00FF00ULL,
+    0xFFFF0000FFFF0000ULL, 0xFFFFFFFF00000000ULL};
+
+static int
+packed_transitions(const BooleanNetwork *net, const uint64_t first,
+        const size_t num_states, uint32_t *successors)
+{
+    const int num_nodes = net->num_nodes;
+    int n = 0;
+    size_t i = 0;
+    size_t j = 0;
+    size_t lanes = 0;
+    uint64_t block = 0;
+    uint64_t word = 0;
+    uint64_t *buffer = NULL;
+    uint64_t *old_states = NULL;
+    uint64_t *new_states = NULL;
+    buffer = malloc(2 * num_nodes * sizeof(uint64_t));
+    if (buffer == NULL) {
+        return DYNAMICS_MEMORY_ERROR;
+    }
+    old_states = buffer;
+    new_states = &buffer[num_nodes];
+    /* the 64 lanes of each word hold consecutive states */
+    for (i = 0; i < num_states; i += 64) {
+        block = first + i;
+        lanes = (num_states - i < 64) ? num_states - i : 64;
+        for (n = 0; n < num_nodes; ++n) {
+            if (n < 6) {
+                old_states[n] = LANE_BITS[n];
+            }
+            else {
+                old_states[n] = ((block >> n) & 1) ? ~(uint64_t)0 : 0;
+            }
+        }
+        packed_synchronous_update(old_states, new_states, net->inc_adj,
+                net->regulation, net->inc_ptr, num_nodes);
+        if (net->clamps != NULL) {
+            for (n = 0; n < num_nodes; ++n) {
+                if (net->clamps[n] >= 0) {
+                    new_states[n] = net->clamps[n] ? ~(uint64_t)0 : 0;
+                }
+            }
+        }
+        memset(&successors[i], 0, lanes * sizeof(uint32_t));
         for (n = 0; n < num_nodes; ++n) {
-            begin = inc_ptr[n];
-            end = inc_ptr[n + 1];
-            states[n] = majority_activation(old_states[n], old_states,
-                    &inc_adj[begin], &regulation[begin], end - begin);
-            memcpy(&series[t * num_nodes], states, num_nodes * sizeof(unsigned char));
+            word = new_states[n];
+            for (j = 0; j < lanes; ++j) {
+                successors[i + j] |= (uint32_t)((word >> j) & 1) << n;
+            }
+        }
+    }
+    free(buffer);
+    return DYNAMICS_SUCCESS;
+}
+
+int
+state_transitions(const BooleanNetwork *net, const int mode, const int *order,
+        const uint64_t first, const size_t num_states, uint32_t *successors)
+{
+    const int num_nodes = net->num_nodes;
+    const synchronous_update update = SYNCHRONOUS_UPDATES[net->rule];
+    const node_rule rule = NODE_RULES[net->rule];
+    size_t i = 0;
+    unsigned char *buffer = NULL;
+    /* the majority rule advances 64 states at once */
+    if (mode == UPDATE_SYNCHRONOUS && net->rule == RULE_MAJORITY &&
+            first % 64 == 0) {
+        return packed_transitions(net, first, num_states, successors);
+    }
+    buffer = malloc(2 * num_nodes * sizeof(unsigned char));
+    if (buffer == NULL) {
+        return DYNAMICS_MEMORY_ERROR;
+    }
+    for (i = 0; i < num_states; ++i) {
+        set_states((size_t)(first + i), buffer, num_nodes);
+        advance(net, update, rule, mode, order, NULL, NULL, buffer,
+                &buffer[num_nodes]);
+        successors[i] = (uint32_t)get_state_id(&buffer[num_nodes], num_nodes);
+    }
+    free(buffer);
+    return DYNAMICS_SUCCESS;
+}
+
+size_t
+attractor_basins(const uint32_t *successors, const size_t num_states,
+        uint32_t *basins, unsigned char *cyclic)
+{
+    const uint32_t unvisited = UINT32_MAX;
+    const uint32_t walking = UINT32_MAX - 1;
+    size_t num_attractors = 0;
+    size_t start = 0;
+    uint32_t state = 0;
+    uint32_t label = 0;
+    memset(cyclic, 0, num_states * sizeof(unsigned char));
+    for (start = 0; start < num_states; ++start) {
+        basins[start] = unvisited;
+    }
+    /* every state of the functional graph is walked at most twice: once until
+     * the walk meets a known state or closes a new cycle, and once to label
+     * the walked states with the attractor they lead to */
+    for (start = 0; start < num_states; ++start) {
+        if (basins[start] != unvisited) {
+            continue;
+        }
+        for (state = (uint32_t)start; basins[state] == unvisited;
+                state = successors[state]) {
+            basins[state] = walking;
+        }
+        if (basins[state] == walking) {
+            label = (uint32_t)num_attractors;
+            ++num_attractors;
+            do {
+                basins[state] = label;
+                cyclic[state] = 1;
+                state = successors[state];
+            } while (basins[state] == walking);
+        }
+        label = basins[state];
+        for (state = (uint32_t)start; basins[state] == walking;
+                state = successors[state]) {
+            basins[state] = label;
         }
     }
-    free(old_states);
+    return num_attractors;
 }
 
+static int
+compare_keys(const void *first, const void *second)
+{
+    const uint64_t a = *(const uint64_t *)first;
+    const uint64_t b = *(const uint64_t *)second;
+    return (a > b) - (a < b);
+}
+
+static void
+sort_by_degree(uint64_t *keys, const int *nodes, const int num,
+        const int *degree, int *sorted)
+{
+    int i = 0;
+    /* the degree in the high bits and the node in the low bits give a total
+     * order such that ties do not depend on the sorting algorithm */
+    for (i = 0; i < num; ++i) {
+        keys[i] = ((uint64_t)degree[nodes[i]] << 32) | (uint32_t)nodes[i];
+    }
+    qsort(keys, num, sizeof(uint64_t), compare_keys);
+    for (i = 0; i < num; ++i) {
+        sorted[i] = (int)(keys[i] & UINT32_MAX);
+    }
+}
+
+int
+cuthill_mckee(const int *inc_ptr, const int *inc_adj, const int num_nodes,
+        int *ordering)
+{
+    const int num_links = inc_ptr[num_nodes];
+    int head = 0;
+    int tail = 0;
+    int first = 0;
+    int i = 0;
+    int node = 0;
+    int k = 0;
+    int *out_ptr = NULL;
+    int *out_adj = NULL;
+    int *degree = NULL;
+    int *starts = NULL;
+    uint64_t *keys = NULL;
+    unsigned char *visited = NULL;
+    out_ptr = calloc(num_nodes + 1, sizeof(int));
+    out_adj = malloc((num_links + 1) * sizeof(int));
+    degree = calloc(num_nodes, sizeof(int));
+    starts = malloc(num_nodes * sizeof(int));
+    keys = malloc(num_nodes * sizeof(uint64_t));
+    visited = calloc(num_nodes, sizeof(unsigned char));
+    if (out_ptr == NULL || out_adj == NULL || degree == NULL ||
+            starts == NULL || keys == NULL || visited == NULL) {
+        free(visited);
+        free(keys);
+        free(starts);
+        free(degree);
+        free(out_adj);
+        free(out_ptr);
+        return DYNAMICS_MEMORY_ERROR;
+    }
+    /* outgoing links by counting sort and the undirected degree without
+     * self-links */
+    for (node = 0; node < num_nodes; ++node) {
+        for (k = inc_ptr[node]; k < inc_ptr[node + 1]; ++k) {
+            ++out_ptr[inc_adj[k] + 1];
+            if (inc_adj[k] != node) {
+                ++degree[node];
+                ++degree[inc_adj[k]];
+            }
+        }
+    }
+    for (node = 0; node < num_nodes; ++node) {
+        out_ptr[node + 1] += out_ptr[node];
+    }
+    for (node = 0; node < num_nodes; ++node) {
+        for (k = inc_ptr[node]; k < inc_ptr[node + 1]; ++k) {
+            out_adj[out_ptr[inc_adj[k]]++] = node;
+        }
+    }
+    for (node = num_nodes; node > 0; --node) {
+        out_ptr[node] = out_ptr[node - 1];
+    }
+    out_ptr[0] = 0;
+    /* components start from their node of lowest degree */
+    for (node = 0; node < num_nodes; ++node) {
+        starts[node] = node;
+    }
+    sort_by_degree(keys, starts, num_nodes, degree, starts);
+    /* the queue of the breadth-first search is the ordering itself, the
+     * newly reached neighbours of each node are appended by increasing
+     * degree */
+    for (i = 0; i < num_nodes; ++i) {
+        if (visited[starts[i]]) {
+            continue;
+        }
+        visited[starts[i]] = 1;
+        ordering[tail++] = starts[i];
+        while (head < tail) {
+            node = ordering[head++];
+            first = tail;
+            for (k = inc_ptr[node]; k < inc_ptr[node + 1]; ++k) {
+                if (!visited[inc_adj[k]]) {
+                    visited[inc_adj[k]] = 1;
+                    ordering[tail++] = inc_adj[k];
+                }
+            }
+            for (k = out_ptr[node]; k < out_ptr[node + 1]; ++k) {
+                if (!visited[out_adj[k]]) {
+                    visited[out_adj[k]] = 1;
+                    ordering[tail++] = out_adj[k];
+                }
+            }
+            sort_by_degree(keys, &ordering[first], tail - first, degree,
+                    &ordering[first]);
+        }
+    }
+    free(visited);
+    free(keys);
+    free(starts);
+    free(degree);
+    free(out_adj);
+    free(out_ptr);
+    return DYNAMICS_SUCCESS;
+}
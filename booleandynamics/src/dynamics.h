@@ -3,16 +3,102 @@
 #define DYNAMICS_H
 
 #include <stdlib.h>
-#include <stdio.h>
 #include <string.h>
+#include <stdint.h>
+
+#include "xoshiro.h"
+
+/* return codes of the kernels */
+#define DYNAMICS_SUCCESS 0
+#define DYNAMICS_MEMORY_ERROR -1
+#define DYNAMICS_NOT_FOUND 1
+
+/* update schemes */
+#define UPDATE_SYNCHRONOUS 0
+#define UPDATE_SEQUENTIAL 1
+#define UPDATE_RANDOM_SEQUENTIAL 2
+#define UPDATE_RANDOM_SINGLE 3
+
+/* update rules */
+#define RULE_MAJORITY 0
+#define RULE_THRESHOLD 1
+#define RULE_TRUTH_TABLE 2
+#define RULE_CANALIZING 3
+
+/* number of bit slices in the vertical counters of the packed engine */
+#define PACKED_SLICES 64
+
+
+/* Network topology in compressed sparse row format of the incoming links
+ * together with the parameters of the update rule. Only the parameters of the
+ * chosen rule are accessed:
+ *  - majority: integer link weights `regulation`
+ *  - threshold: link `weights` and node `thresholds`
+ *  - truth table: packed truth `tables` starting at word `table_ptr[node]`
+ *  - canalizing: link input values `canalizing` producing `canalized` and node
+ *    `defaults` if no input is canalizing
+ * Nodes with a non-negative entry in `clamps` are held at that value, without
+ * any clamped nodes it is NULL.
+ */
+typedef struct {
+    int num_nodes;
+    int *inc_ptr;
+    int *inc_adj;
+    int rule;
+    int *regulation;
+    double *weights;
+    double *thresholds;
+    uint64_t *tables;
+    int64_t *table_ptr;
+    unsigned char *canalizing;
+    unsigned char *canalized;
+    unsigned char *defaults;
+    signed char *clamps;
+} BooleanNetwork;
 
 
 unsigned char majority_activation(unsigned char current, unsigned char *states,
         int *inc_adj, int *regulation, const int num_pred);
-void attractor_finder(unsigned char *states, int *inc_adj, int *regulation, int *inc_ptr,
-        const int num_nodes, size_t *attractor_id, const size_t num_states);
-void time_series(unsigned char *states, int *inc_adj, int *regulation, int *inc_ptr,
-        const int num_nodes, unsigned char *series, const size_t time);
+int time_series(const BooleanNetwork *net, unsigned char *states,
+        unsigned char *series, const size_t time, const int mode,
+        const int *order, uint64_t *rng_state, const int detect_cycle,
+        int64_t *transient, int64_t *period);
+int ensemble_series(const BooleanNetwork *net, unsigned char *states,
+        const size_t num_states, unsigned char *series, const size_t time,
+        const int mode, const int *order, uint64_t *rng_states,
+        const int detect_cycle, int64_t *transients, int64_t *periods);
+int window_counts(const BooleanNetwork *net, unsigned char *states,
+        const size_t num_states, const size_t time, const size_t window,
+        const int mode, const int *order, uint64_t *rng_states,
+        uint32_t *counts, const size_t num_windows);
+int damage_spreading(const BooleanNetwork *net, const int *out_ptr,
+        const int *out_adj, unsigned char *states, const size_t num_states,
+        const int64_t *flip_ptr, const int *flip_nodes, const size_t num_flips,
+        const int shared_flips, const size_t time, const int mode,
+        const int *order, uint64_t *rng_states, uint32_t *distances);
+int knockout_screen(const BooleanNetwork *net, const int *nodes,
+        const unsigned char *values, const size_t num_knockouts,
+        const unsigned char *states, const size_t num_states,
+        const size_t time, const int mode, const int *order,
+        const uint64_t *rng_states, uint32_t *counts);
+uint64_t packed_majority_activation(uint64_t current, uint64_t *states,
+        int *inc_adj, int *regulation, const int num_pred);
+void packed_ensemble_series(uint64_t *states, int *inc_adj, int *regulation,
+        int *inc_ptr, const int num_nodes, const size_t num_words,
+        uint64_t *series, const size_t time);
+int find_attractor(const BooleanNetwork *net, unsigned char *states,
+        const size_t max_steps, int64_t *transient, int64_t *period,
+        unsigned char *attractor);
+int find_attractors(const BooleanNetwork *net, unsigned char *states,
+        const size_t num_states, const size_t max_steps, int64_t *transients,
+        int64_t *periods, unsigned char *attractors);
+int state_transitions(const BooleanNetwork *net, const int mode,
+        const int *order, const uint64_t first, const size_t num_states,
+        uint32_t *successors);
+size_t attractor_basins(const uint32_t *successors, const size_t num_states,
+        uint32_t *basins, unsigned char *cyclic);
+int cuthill_mckee(const int *inc_ptr, const int *inc_adj, const int num_nodes,
+        int *ordering);
 
 #endif // DYNAMICS_H
 
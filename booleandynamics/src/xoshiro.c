@@ -0,0 +1,29 @@
+#include "xoshiro.h"
+
+
+static uint64_t
+rotate_left(const uint64_t x, int k)
+{
+    return (x << k) | (x >> (64 - k));
+}
+
+uint64_t
+rng_next(uint64_t *state)
+{
+    const uint64_t result = rotate_left(state[1] * 5, 7) * 9;
+    const uint64_t t = state[1] << 17;
+    state[2] ^= state[0];
+    state[3] ^= state[1];
+    state[1] ^= state[2];
+    state[0] ^= state[3];
+    state[2] ^= t;
+    state[3] = rotate_left(state[3], 45);
+    return result;
+}
+
+uint32_t
+rng_bounded(uint64_t *state, const uint32_t bound)
+{
+    /* Lemire's multiply-shift maps the upper 32 bits onto [0, bound) */
+    return (uint32_t)(((rng_next(state) >> 32) * (uint64_t)bound) >> 32);
+}
@@ -0,0 +1,13 @@
+#ifndef XOSHIRO_H
+#define XOSHIRO_H
+
+#include <stdint.h>
+
+
+/* xoshiro256** by David Blackman and Sebastiano Vigna, the state consists of
+ * four 64 bit words that must not all be zero, they are seeded by
+ * numpy.random.SeedSequence */
+uint64_t rng_next(uint64_t *state);
+uint32_t rng_bounded(uint64_t *state, const uint32_t bound);
+
+#endif // XOSHIRO_H
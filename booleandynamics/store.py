@@ -0,0 +1,241 @@
+# -*- coding: utf-8 -*-
+
+
+"""
+======================
+Boolean Dynamics Store
+======================
+
+:Author:
+    Moritz Emanuel Beber
+:Date:
+    2026-10-18
+:Copyright:
+    Copyright |c| 2026, Jacobs University Bremen gGmbH, all rights reserved.
+:File:
+    store.py
+
+.. |c| unicode:: U+A9
+"""
+
+
+from __future__ import (absolute_import, unicode_literals)
+
+
+__all__ = ["network_hash", "SeriesStore", "store_series"]
+
+
+import io
+import json
+import struct
+import numbers
+import hashlib
+import logging
+
+import numpy as np
+
+from .classes import BooleanDynamicsError
+
+
+LOGGER = logging.getLogger(__name__)
+LOGGER.addHandler(logging.NullHandler())
+
+
+MAGIC = b"BDSERIES"
+VERSION = 1
+# the series start at a multiple of this many bytes
+ALIGNMENT = 64
+
+
+def network_hash(rbn):
+    """
+    Compute a digest of the topology, rule parameters, clamped nodes, and node
+    ordering of boolean dynamics.
+
+    Parameters
+    ----------
+    rbn: BooleanDynamics
+        An instance of BooleanDynamics with prepared topology.
+
+    Returns
+    -------
+    The SHA-1 hex digest as a string.
+    """
+    digest = hashlib.sha1()
+    digest.update("{:d} {}".format(rbn.num_nodes, rbn.rule).encode("utf-8"))
+    for array in (rbn.incidence_ptr, rbn.incidence_adj, rbn.incidence_func,
+            rbn.weights, rbn.thresholds, rbn.truth_tables, rbn.table_ptr,
+            rbn.canalizing, rbn.canalized, rbn.defaults, rbn.clamps,
+            rbn.ordering):
+        if array is None:
+            digest.update(b"-")
+        else:
+            digest.update(np.ascontiguousarray(array).tobytes())
+    return digest.hexdigest()
+
+def _seed_record(seed):
+    """
+    Describe a seed in JSON such that the series can be reproduced.
+    """
+    if isinstance(seed, np.random.SeedSequence):
+        return {"entropy": seed.entropy, "spawn_key": list(seed.spawn_key)}
+    if isinstance(seed, np.random.Generator) or seed is None:
+        # the state of a generator is not recorded
+        return None
+    return int(seed)
+
+
+class SeriesStore(object):
+    """
+    Simulated series in a memory-mapped binary file.
+
+    The file starts with the magic bytes ``BDSERIES``, a little-endian uint32
+    length of the JSON header that follows, and padding to the next multiple
+    of 64 bytes. The series themselves are stored as ubyte array of shape
+    (number of series x number of time points x number of nodes) in C order.
+
+    Attributes
+    ----------
+    filename: str
+        Path of the file.
+    header: dict
+        Description of the contents, e.g., 'network_hash', 'seed', 'rule', and
+        'steps'.
+    series: numpy.memmap
+        The stored series, only read from disk when accessed.
+    """
+
+    def __init__(self, filename, mode="r"):
+        """
+        Open an existing store.
+
+        Parameters
+        ----------
+        filename: str
+            Path of the file.
+        mode: str (optional)
+            'r' for read-only access, 'r+' to modify the series.
+        """
+        self.filename = filename
+        with io.open(filename, "rb") as file_h:
+            magic = file_h.read(len(MAGIC))
+            if magic != MAGIC:
+                raise BooleanDynamicsError("'{}' is not a series store".format(
+                        filename))
+            (length,) = struct.unpack("<I", file_h.read(4))
+            self.header = json.loads(file_h.read(length).decode("utf-8"))
+        if self.header.get("version") != VERSION:
+            raise BooleanDynamicsError("unsupported series store version {}"\
+                    .format(self.header.get("version")))
+        self.series = np.memmap(filename, dtype=np.ubyte, mode=mode,
+                offset=self.header["offset"], shape=tuple(self.header["shape"]))
+
+    @classmethod
+    def create(cls, filename, rbn, num_series, steps, seed=None,
+            asynchronous=False, **kw_args):
+        """
+        Create a store of zeroed series ready to be simulated into.
+
+        Parameters
+        ----------
+        filename: str
+            Path of the file, an existing file is overwritten.
+        rbn: BooleanDynamics
+            The dynamics whose series are stored.
+        num_series: int
+            The number of series, e.g., initial states or repeats.
+        steps: int
+            The number of steps per series, i.e., there are `steps` + 1 time
+            points.
+        seed: int or numpy.random.SeedSequence (optional)
+            The seed used for the simulation.
+        asynchronous: bool or str (optional)
+            The update scheme used for the simulation.
+
+        Additional keyword arguments must be JSON serializable and are added to
+        the header.
+
+        Returns
+        -------
+        A `SeriesStore` opened for writing.
+        """
+        shape = (int(num_series), int(steps) + 1, int(rbn.num_nodes))
+        header = dict(kw_args)
+        header.update(version=VERSION, network_hash=network_hash(rbn),
+                num_nodes=shape[2], rule=rbn.rule, steps=shape[1] - 1,
+                seed=_seed_record(seed), asynchronous=asynchronous,
+                shape=shape)
+        # the offset is part of the header and thus of its length
+        length = len(json.dumps(dict(header, offset=0)).encode("utf-8")) + 32
+        offset = -(-(len(MAGIC) + 4 + length) // ALIGNMENT) * ALIGNMENT
+        header["offset"] = offset
+        content = json.dumps(header).encode("utf-8")
+        content += b" " * (offset - len(MAGIC) - 4 - len(content))
+        with io.open(filename, "wb") as file_h:
+            file_h.write(MAGIC)
+            file_h.write(struct.pack("<I", len(content)))
+            file_h.write(content)
+            file_h.truncate(offset + int(np.prod(shape)))
+        return cls(filename, mode="r+")
+
+    @property
+    def stitched(self):
+        """
+        The series of all runs one after the other as a (number of nodes x
+        number of series * number of time points) view like `stitch_series`.
+        """
+        (num_series, num_points, num_nodes) = self.series.shape
+        return self.series.reshape((num_series * num_points, num_nodes)).T
+
+    def iter_chunks(self, chunk):
+        """
+        Yield consecutive views of at most `chunk` time points of the stitched
+        series, e.g., for `to_expression`.
+        """
+        stitched = self.stitched
+        for start in range(0, stitched.shape[1], chunk):
+            yield stitched[:, start:start + chunk]
+
+    def flush(self):
+        """
+        Write changes to the series to disk.
+        """
+        self.series.flush()
+
+
+def store_series(filename, rbn, initial_states, steps, seed=None,
+        asynchronous=False, order=None, n_threads=1, **kw_args):
+    """
+    Simulate many initial states straight into a new series store.
+
+    Parameters
+    ----------
+    filename: str
+        Path of the file, an existing file is overwritten.
+    rbn: BooleanDynamics
+        An instance of BooleanDynamics with prepared topology.
+    initial_states: numpy.ndarray or int
+        Two dimensional array of ON/OFF states of shape (number of initial
+        states x number of nodes), or the number of distinct random initial
+        states.
+    steps: int
+        Number of steps in each time series.
+
+    Further arguments are described for `BooleanDynamics.ensemble_series` and
+    `SeriesStore.create`.
+
+    Returns
+    -------
+    The `SeriesStore` holding the series.
+    """
+    if isinstance(initial_states, numbers.Integral):
+        num_series = initial_states
+    else:
+        num_series = len(initial_states)
+    store = SeriesStore.create(filename, rbn, num_series, steps,
+            seed=seed, asynchronous=asynchronous, **kw_args)
+    rbn.ensemble_series(initial_states, steps, out=store.series,
+            asynchronous=asynchronous, seed=seed, order=order,
+            n_threads=n_threads)
+    store.flush()
+    return store
@@ -22,7 +22,9 @@ Boolean Dynamics Utility
 from __future__ import (absolute_import, unicode_literals)
 
 
-__all__ = ["to_expression", "stitch_series"]
+__all__ = ["to_expression", "window_counts", "iter_window_counts",
+        "counts_to_expression", "stitch_series", "pack_states",
+        "unpack_series", "states_to_ids", "ids_to_states"]
 
 
 import logging
@@ -30,58 +32,176 @@ import logging
 import numpy as np
 from numpy.lib.stride_tricks import as_strided
 
+from .classes import (_seed_sequence, unique_states)
+
 
 LOGGER = logging.getLogger(__name__)
 LOGGER.addHandler(logging.NullHandler())
 
 
-def contiguous_blocks(matrix, size, overlap=0):
+def _window_starts(num_cols, size, overlap):
     if overlap < 0:
         raise ValueError("overlap must be zero or positive")
     if overlap >= size:
         raise ValueError("overlap between windows cannot be equal to or"\
                 " greater than the windows themselves")
     step = size - overlap
-    num_cols = matrix.shape[1] // step
+    num_windows = max((num_cols - size) // step + 1, 0)
+    return (step, num_windows)
+
+def contiguous_blocks(matrix, size, overlap=0):
+    (step, num_windows) = _window_starts(matrix.shape[1], size, overlap)
     num_rows = matrix.shape[0]
-    shape = (num_cols, num_rows, size)
-    strides = ((step - overlap) * matrix.strides[-1],) + matrix.strides
+    shape = (num_windows, num_rows, size)
+    strides = (step * matrix.strides[-1],) + matrix.strides
     return as_strided(matrix, shape, strides)
 
-def to_expression(series, size, norm="window"):
+def window_counts(series, size, overlap=0):
     """
-    Compute the activity per gene within a window normalized by the total
-    activity in that window.
+    Count the ON states per node within windows of the series.
 
     Parameters
     ----------
     series: numpy.ndarray
         Boolean array of dimension (number of nodes x number of time steps).
     size: int
-        Size of the windows over which to compute the activity.
+        Size of the windows.
+    overlap: int (optional)
+        Number of time steps shared by consecutive windows.
+
+    Returns
+    -------
+    An integer array of dimension (number of nodes x number of complete
+    windows).
+    """
+    (step, num_windows) = _window_starts(series.shape[1], size, overlap)
+    num_rows = series.shape[0]
+    if num_windows == 0:
+        return np.zeros((num_rows, 0), dtype=np.int64)
+    # sum non-overlapping blocks whose length divides both window size and
+    # step, windows are then differences of the cumulative block sums
+    block = int(np.gcd(size, step))
+    num_blocks = ((num_windows - 1) * step + size) // block
+    sums = np.zeros((num_rows, num_blocks + 1), dtype=np.int64)
+    np.add.reduceat(series[:, :num_blocks * block],
+            np.arange(0, num_blocks * block, block), axis=1, dtype=np.int64,
+            out=sums[:, 1:])
+    if block == size == step:
+        return sums[:, 1:]
+    np.cumsum(sums, axis=1, out=sums)
+    begin = np.arange(num_windows) * (step // block)
+    return sums[:, begin + size // block] - sums[:, begin]
+
+def iter_window_counts(chunks, size, overlap=0):
+    """
+    Count the ON states per node within windows of a series that arrives in
+    chunks, e.g., from `BooleanDynamics.iter_series`.
+
+    Only the time points of the window that is still incomplete are kept
+    between chunks.
+
+    Parameters
+    ----------
+    chunks: iterable
+        Boolean arrays of dimension (number of nodes x number of time steps)
+        that form the series when concatenated along the second dimension.
+    size: int
+        Size of the windows.
+    overlap: int (optional)
+        Number of time steps shared by consecutive windows.
+
+    Yields
+    ------
+    Integer arrays of dimension (number of nodes x number of windows completed
+    by a chunk). Concatenated they equal `window_counts` of the whole series.
+    """
+    (step, _) = _window_starts(size, size, overlap)
+    pending = None
+    for chunk in chunks:
+        if pending is None or pending.shape[1] == 0:
+            pending = chunk
+        else:
+            pending = np.concatenate((pending, chunk), axis=1)
+        counts = window_counts(pending, size, overlap)
+        if counts.shape[1] > 0:
+            pending = pending[:, counts.shape[1] * step:]
+            yield counts
+
+def counts_to_expression(counts, norm="window", total=None):
+    """
+    Normalize the activity per gene and window.
+
+    Parameters
+    ----------
+    counts: numpy.ndarray
+        Array of dimension (number of nodes x number of windows) as returned by
+        `window_counts` or by the `window` option of the simulations.
     norm: str
         Normalize by activity per window or by total activity ('window',
         'total').
+    total: int (optional)
+        Total activity for the 'total' normalization (default: sum of all
+        counts).
 
     Returns
     -------
     """
-    num_cols = series.shape[1] // size
-    num_rows = series.shape[0]
-    expression = np.zeros((num_rows, num_cols))
+    counts = np.asarray(counts, dtype=np.double)
     if norm == "total":
-        for (i, block) in enumerate(contiguous_blocks(series, size)):
-            expression[:, i] = block.sum(axis=1).astype(np.double)
-        expression /= series.sum().astype(np.double)
+        if total is None:
+            total = counts.sum()
+        return counts / float(total)
     elif norm == "window":
-        for (i, block) in enumerate(contiguous_blocks(series, size)):
-            expression[:, i] = block.sum(axis=1).astype(np.double) / block.sum(
-                    ).astype(np.double)
+        return counts / counts.sum(axis=0)
     else:
         raise ValueError("unknown normalization method '{}'".format(norm))
-    return expression
 
-def stitch_series(rbn, repeat, steps, seed=None):
+def to_expression(series, size, norm="window", overlap=0):
+    """
+    Compute the activity per gene within a window normalized by the total
+    activity in that window.
+
+    Parameters
+    ----------
+    series: numpy.ndarray or iterable
+        Boolean array of dimension (number of nodes x number of time steps), or
+        chunks of it as yielded by `BooleanDynamics.iter_series` which are
+        consumed one by one.
+    size: int
+        Size of the windows over which to compute the activity.
+    norm: str
+        Normalize by activity per window or by total activity ('window',
+        'total').
+    overlap: int (optional)
+        Number of time steps shared by consecutive windows.
+
+    Returns
+    -------
+    """
+    if norm not in ("window", "total"):
+        raise ValueError("unknown normalization method '{}'".format(norm))
+    if isinstance(series, np.ndarray):
+        counts = window_counts(series, size, overlap)
+        total = series.sum(dtype=np.int64) if norm == "total" else None
+        return counts_to_expression(counts, norm, total)
+    # the total activity also covers time points outside of complete windows
+    tally = {"total": 0, "num_rows": 0}
+
+    def sum_up(chunks):
+        for chunk in chunks:
+            tally["total"] += chunk.sum(dtype=np.int64)
+            tally["num_rows"] = chunk.shape[0]
+            yield chunk
+
+    counts = list(iter_window_counts(sum_up(series), size, overlap))
+    if len(counts) == 0:
+        counts = np.zeros((tally["num_rows"], 0), dtype=np.int64)
+    else:
+        counts = np.concatenate(counts, axis=1)
+    return counts_to_expression(counts, norm, tally["total"])
+
+def stitch_series(rbn, repeat, steps, seed=None, asynchronous=False,
+        window=None, n_threads=1, out=None):
     """
     Stitch together multiple simulated node activity series for different
     starting conditions.
@@ -91,24 +211,154 @@ def stitch_series(rbn, repeat, steps, seed=None):
     rbn: BooleanDynamics
         An instance of BooleanDynamics with prepared topology.
     repeat: int
-        How many different starting conditions to put together.
+        How many different starting conditions to put together, at most
+        2^N for N nodes.
     steps: int
         The number of steps of activity to follow per run.
+    seed: int, numpy.random.Generator, or numpy.random.SeedSequence (optional)
+        Source of randomness for the initial states and the asynchronous
+        update. Each repeat follows its own child stream.
+    asynchronous: bool or str (optional)
+        The update scheme as described for `BooleanDynamics.time_series`.
+    window: int (optional)
+        Only count the ON states per node in windows of this size along the
+        stitched series instead of storing it.
+    n_threads: int (optional)
+        Simulate the repeats on this many threads, the result does not depend
+        on it.
+    out: numpy.ndarray (optional)
+        A preallocated, C-contiguous ubyte array of shape (`repeat` x `steps`
+        x number of nodes) that the series are written into, e.g., the
+        `series` of ``SeriesStore.create(filename, rbn, repeat, steps - 1)``.
 
     Returns
     -------
     2D array where the first dimension corresponds to the nodes and the second
-    to ``repeat * steps``.
-    """
-    if seed is not None:
-        np.random.seed(seed)
-    long_series = np.zeros((rbn.num_nodes, repeat * steps), dtype=np.ubyte)
-    known_states = set()
-    for i in range(repeat):
-        states = tuple(np.random.random_integers(0, 1, rbn.num_nodes))
-        while states in known_states:
-            states = tuple(np.random.random_integers(0, 1, rbn.num_nodes))
-        t = i * steps
-        long_series[:, t: (t + steps)] = rbn.time_series(steps - 1, states=states)
-    return long_series
+    to ``repeat * steps``, or with `window` to the complete windows.
+    """
+    (state_seed, update_seed) = _seed_sequence(seed).spawn(2)
+    # every repeat starts from a different state
+    initial_states = unique_states(repeat, rbn.num_nodes, state_seed)
+    # (repeat x steps x nodes) buffer whose transposed view is the stitched
+    # (nodes x repeat * steps) series without any further copies, settled
+    # deterministic trajectories are completed by copying their cycle
+    if window is not None:
+        return rbn.ensemble_series(initial_states, steps - 1,
+                asynchronous=asynchronous, seed=update_seed, window=window,
+                n_threads=n_threads)
+    deterministic = asynchronous in (False, "synchronous", "sequential")
+    series = rbn.ensemble_series(initial_states, steps - 1,
+            out=out, detect_cycle=deterministic, asynchronous=asynchronous,
+            seed=update_seed, n_threads=n_threads)
+    if deterministic:
+        series = series[0]
+    return series.reshape((repeat * steps, rbn.num_nodes)).T
+
+def pack_states(states):
+    """
+    Pack the ON/OFF states of many trajectories into words of 64 bits.
+
+    Parameters
+    ----------
+    states: numpy.ndarray
+        Boolean array of dimension (number of trajectories x number of nodes).
+
+    Returns
+    -------
+    A uint64 array of dimension (ceil(number of trajectories / 64) x number of
+    nodes) where bit ``i % 64`` of word ``i // 64`` holds the state of
+    trajectory ``i``. Missing trajectories in the last word are OFF.
+    """
+    states = np.asarray(states, dtype=np.ubyte)
+    if states.ndim != 2:
+        raise ValueError("states must be two dimensional")
+    (num_states, num_nodes) = states.shape
+    num_words = -(-num_states // 64)
+    padded = np.zeros((num_words * 64, num_nodes), dtype=np.ubyte)
+    padded[:num_states] = states
+    # (words x nodes x 64) bits -> (words x nodes x 8) little-endian bytes
+    packed = np.packbits(padded.reshape((num_words, 64, num_nodes)).transpose(
+            (0, 2, 1)), axis=-1, bitorder="little")
+    return np.ascontiguousarray(packed).view("<u8").reshape(
+            (num_words, num_nodes)).astype(np.uint64, copy=False)
+
+def unpack_series(packed, num_states, stitch=False):
+    """
+    Unpack bit-packed states or series into one byte per node and trajectory.
+
+    Parameters
+    ----------
+    packed: numpy.ndarray
+        A uint64 array of dimension (number of words x number of nodes) or
+        (number of words x number of time points x number of nodes) as returned
+        by `pack_states` or `BooleanDynamics.packed_series`.
+    num_states: int
+        The number of trajectories actually packed.
+    stitch: bool (optional)
+        Return a series stitched like `stitch_series` instead.
+
+    Returns
+    -------
+    A ubyte array of dimension (number of trajectories x number of nodes) or
+    (number of trajectories x number of time points x number of nodes), or if
+    `stitch` is true the (number of nodes x number of trajectories * number of
+    time points) view of the latter.
+    """
+    packed = np.asarray(packed, dtype=np.uint64)
+    squeeze = (packed.ndim == 2)
+    if squeeze and stitch:
+        raise ValueError("cannot stitch packed states without time points")
+    if squeeze:
+        packed = packed[:, np.newaxis, :]
+    if packed.ndim != 3:
+        raise ValueError("packed states must be two or three dimensional")
+    (num_words, steps, num_nodes) = packed.shape
+    if num_states > num_words * 64:
+        raise ValueError("cannot unpack {:d} states from {:d} words".format(
+                num_states, num_words))
+    octets = np.ascontiguousarray(packed.astype("<u8", copy=False)).view(
+            np.uint8).reshape((num_words, steps, num_nodes, 8))
+    bits = np.unpackbits(octets, axis=-1, bitorder="little")
+    # (words x time x nodes x 64) -> (trajectories x time x nodes)
+    series = np.ascontiguousarray(bits.transpose((0, 3, 1, 2))).reshape(
+            (num_words * 64, steps, num_nodes))[:num_states]
+    if squeeze:
+        series = series[:, 0, :]
+    elif stitch:
+        series = series.reshape((num_states * steps, num_nodes)).T
+    return series
+
+def states_to_ids(states):
+    """
+    Identify ON/OFF states by integers whose bit `i` is the state of node `i`.
+
+    Parameters
+    ----------
+    states: numpy.ndarray
+        Array of dimension (number of states x number of nodes) with at most 63
+        nodes.
+
+    Returns
+    -------
+    A uint64 array with one id per state, e.g., an index into
+    `BooleanDynamics.state_transition_map`.
+    """
+    states = np.asarray(states, dtype=np.uint64)
+    if states.ndim != 2 or states.shape[1] > 63:
+        raise ValueError("states must be two dimensional with at most 63"\
+                " nodes")
+    weights = np.left_shift(np.uint64(1), np.arange(states.shape[1],
+            dtype=np.uint64))
+    return states.dot(weights)
 
+def ids_to_states(ids, num_nodes):
+    """
+    Turn state ids as returned by `states_to_ids` back into ON/OFF states.
+
+    Returns
+    -------
+    A ubyte array of dimension (number of ids x `num_nodes`).
+    """
+    ids = np.asarray(ids, dtype=np.uint64).reshape((-1, 1))
+    shifts = np.arange(num_nodes, dtype=np.uint64)
+    return (np.right_shift(ids, shifts) & np.uint64(1)).astype(np.ubyte)
@@ -22,14 +22,16 @@ Boolean Dynamics on Networks
 
 from __future__ import (absolute_import, unicode_literals)
 
+import os
 import sys
+import socket
 import logging
 import multiprocessing
 import argparse
 from logging.config import dictConfig
 
 import numpy as np
-from sqlalchemy import create_engine
+from sqlalchemy import (create_engine, func)
 from progressbar import (ProgressBar, Timer, SimpleProgress, Bar, Percentage, ETA)
 
 import booleandynamics as bd
@@ -39,78 +41,145 @@ import pyorganism.regulation as pyreg
 LOGGER = logging.getLogger(__name__)
 LOGGER.addHandler(logging.NullHandler())
 
+# threads per worker process that share one copy of each network
+NUM_THREADS = 1
+# optional cache of networks and series shared by all worker processes
+CACHE = None
 
-def worker(job):
+
+def init_worker(num_threads, cache_dir=None, cache_size=None):
+    global NUM_THREADS
+    global CACHE
+    NUM_THREADS = num_threads
+    if cache_dir is not None:
+        CACHE = bd.SimulationCache(cache_dir, max_bytes=cache_size)
+
+def build_network(job, seed):
+    if job.generator == "random_regulatory":
+        # same ensemble sampled straight into arrays
+        return bd.random_regulatory_dynamics(job.num_nodes,
+                job.num_activating, job.num_inhibiting, seed=seed)
     generator = getattr(bd, job.generator)
     net = generator(job.num_nodes, job.num_activating, job.num_inhibiting,
-            function=job.function, seed=job.seed)
-    rbn = bd.BooleanDynamics(net, function=job.function)
-    series = bd.stitch_series(rbn, job.num_repeats, job.steps, seed=job.seed)
-    expr = bd.to_expression(series, job.win_size)
-    control = pyreg.ContinuousControl()
-    control.from_trn(net, function=job.function)
-    trans_expr = np.ascontiguousarray(expr.T) # necessary for C code
-    results = list()
-    job_id = job.id
-    (z_ca, _, _) = control.series_ctc(trans_expr, "absolute",
-            random_num=job.random_num)
-    # need to add delay: None, otherwise later values are ignored in insert
-    results.extend({"job_id": job_id, "ctc": val, "delay": None,
-            "measure": "absolute"} for val in z_ca)
-    (z_cd, _, _) = control.series_ctc(trans_expr, "difference",
-            random_num=job.random_num)
-    results.extend({"job_id": job_id, "ctc": val, "delay": None,
-            "measure": "difference"} for val in z_cd)
-    (z_cf, _, _) = control.series_ctc(trans_expr, "functional",
-            random_num=job.random_num)
-    results.extend({"job_id": job_id, "ctc": val, "delay": None,
-            "measure": "functional"} for val in z_cf)
-    (z_cs, _, _) = control.series_ctc(trans_expr, "functional-comparison",
-            random_num=job.random_num)
-    results.extend({"job_id": job_id, "ctc": val, "delay": None,
-            "measure": "functional-comparison"} for val in z_cs)
-    (z_ct1, _, _) = control.series_ctc(trans_expr, "delayed-functional",
-            random_num=job.random_num, delay=1)
-    results.extend({"job_id": job_id, "ctc": val, "delay": 1,
-            "measure": "delayed-functional"} for val in z_ct1)
-    (z_ct2, _, _) = control.series_ctc(trans_expr, "delayed-functional",
-            random_num=job.random_num, delay=2)
-    results.extend({"job_id": job_id, "ctc": val, "delay": 2,
-            "measure": "delayed-functional"} for val in z_ct2)
-    (z_ct3, _, _) = control.series_ctc(trans_expr, "delayed-functional",
-            random_num=job.random_num, delay=3)
-    results.extend({"job_id": job_id, "ctc": val, "delay": 3,
-            "measure": "delayed-functional"} for val in z_ct3)
-    return (job_id, results)
+            function=job.function, seed=seed)
+    return bd.BooleanDynamics(net, function=job.function)
+
+def simulate(job, rbn, seed):
+    if CACHE is None:
+        # only the window counts are needed, the series itself is never stored
+        return bd.stitch_series(rbn, job.num_repeats, job.steps, seed=seed,
+                window=job.win_size, n_threads=NUM_THREADS)
+    # jobs that only differ in their analysis share the stored series
+    key = bd.cache_key(network=bd.network_hash(rbn), seed=job.seed,
+            num_repeats=job.num_repeats, steps=job.steps)
+    store = CACHE.fetch_series(key, rbn, job.num_repeats, job.steps - 1,
+            lambda out: bd.stitch_series(rbn, job.num_repeats, job.steps,
+            seed=seed, n_threads=NUM_THREADS, out=out), seed=job.seed)
+    return bd.window_counts(store.stitched, job.win_size)
+
+# control measures computed per job as (measure, delay)
+MEASURES = [("absolute", None), ("difference", None), ("functional", None),
+        ("functional-comparison", None), ("delayed-functional", 1),
+        ("delayed-functional", 2), ("delayed-functional", 3)]
+
+def worker(job):
+    # independent streams for topology and dynamics derived from the job alone,
+    # results thus do not depend on which process runs the job
+    (net_seed, series_seed) = np.random.SeedSequence(job.seed).spawn(2)
+    # time the stages and count the work of the library in this job
+    with bd.recording() as metrics:
+        with metrics.stage("network"):
+            if CACHE is None:
+                rbn = build_network(job, net_seed)
+            else:
+                key = bd.cache_key(generator=job.generator,
+                        num_nodes=job.num_nodes,
+                        num_activating=job.num_activating,
+                        num_inhibiting=job.num_inhibiting,
+                        function=job.function, seed=job.seed)
+                rbn = CACHE.fetch_network(key,
+                        lambda: build_network(job, net_seed))
+        # the graph is only needed for the control analysis
+        with metrics.stage("graph"):
+            net = rbn.to_networkx(function=job.function)
+        with metrics.stage("simulate"):
+            counts = simulate(job, rbn, series_seed)
+        with metrics.stage("expression"):
+            expr = bd.counts_to_expression(counts)
+        control = pyreg.ContinuousControl()
+        control.from_trn(net, function=job.function)
+        trans_expr = np.ascontiguousarray(expr.T) # necessary for C code
+        results = list()
+        job_id = job.id
+        for (measure, delay) in MEASURES:
+            with metrics.stage(measure if delay is None else\
+                    "{}-{:d}".format(measure, delay)):
+                if delay is None:
+                    (z_c, _, _) = control.series_ctc(trans_expr, measure,
+                            random_num=job.random_num)
+                else:
+                    (z_c, _, _) = control.series_ctc(trans_expr, measure,
+                            random_num=job.random_num, delay=delay)
+            # need to add delay: None, otherwise later values are ignored in
+            # insert
+            results.extend({"job_id": job_id, "ctc": val, "delay": delay,
+                    "measure": measure} for val in z_c)
+    return (job_id, results, metrics.rows(job_id))
 
 def main(args):
     engine = create_engine(args.engine)
+    # databases of earlier versions lack the lease columns and metrics table
+    bd.upgrade_schema(engine)
     bd.Base.metadata.bind = engine
     bd.Session.configure(bind=engine)
     session = bd.Session()
-    tasks = session.query(bd.Job).filter(~bd.Job.complete).all()
-    if len(tasks) == 0:
+    num_tasks = session.query(func.count(bd.Job.id)).filter(
+            ~bd.Job.complete).scalar()
+    if num_tasks == 0:
         LOGGER.warn("Nothing to do")
         return
-    pool = multiprocessing.Pool(args.nproc)
-    result_it = pool.imap_unordered(worker, tasks)
-    bar = ProgressBar(maxval=len(tasks), widgets=[Timer(), " ",
+    pool = multiprocessing.Pool(args.nproc, initializer=init_worker,
+            initargs=(args.threads, args.cache_dir, args.cache_size * 2**20))
+    if args.claim:
+        # lease batches of jobs such that several drivers can share the table,
+        # jobs of a crashed driver become available again after the lease
+        worker_id = args.worker_id or "{}-{:d}".format(socket.gethostname(),
+                os.getpid())
+        pages = iter(lambda: bd.Job.claim(session, worker_id, args.page_size,
+                lease=args.lease, max_attempts=args.max_attempts), [])
+        # results of many jobs are written in one transaction, which also
+        # renews the leases of the jobs still running, and results of jobs
+        # taken over by another driver are dropped
+        writer = bd.ResultWriter(session, batch_size=args.batch_size,
+                worker_id=worker_id, lease=args.lease)
+        # other drivers share the pending jobs, the bar grows with every claim
+        num_tasks = 0
+    else:
+        # only one page of jobs is held in memory at a time
+        pages = bd.Job.iter_pending(session, page_size=args.page_size)
+        writer = bd.ResultWriter(session, batch_size=args.batch_size)
+    bar = ProgressBar(maxval=num_tasks, widgets=[Timer(), " ",
             SimpleProgress(), " ", Percentage(), " ", Bar(), " ",
             ETA()]).start()
-    for (job_id, result) in result_it:
-        try:
-            job = session.query(bd.Job).filter_by(id=job_id).one()
-            # more low-level method for speed
-            session.execute(bd.ControlResult.__table__.insert(), result)
-            job.complete = True
-            session.commit()
-        except Exception:
-            session.rollback()
-        bar += 1
+    try:
+        for tasks in pages:
+            if args.claim:
+                bar.maxval += len(tasks)
+            for (job_id, result, metrics) in pool.imap_unordered(worker,
+                    tasks):
+                writer.add(job_id, result,
+                        metrics=metrics if args.metrics else None)
+                bar += 1
+            # complete the batch before claiming more
+            writer.flush()
+    finally:
+        # keep the results computed before a failing job
+        writer.flush()
     bar.finish()
+    pool.close()
+    pool.join()
     session.close()
 
-
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description=None)
     parser.add_argument("-v", "--version", action="version", version="0.1")
@@ -121,6 +190,36 @@ if __name__ == "__main__":
     parser.add_argument("-n", "--nproc", dest="nproc",
             default=multiprocessing.cpu_count(), type=int,
             help="Number of processors to use (default: %(default)s)")
+    parser.add_argument("-t", "--threads", dest="threads", default=1, type=int,
+            help="Number of threads per process that simulate the repeats of"\
+            " a job (default: %(default)s)")
+    parser.add_argument("--page-size", dest="page_size", default=10000,
+            type=int, help="Number of jobs loaded at a time (default:"\
+            " %(default)s)")
+    parser.add_argument("--batch-size", dest="batch_size", default=100,
+            type=int, help="Number of jobs whose results are written in one"\
+            " transaction (default: %(default)s)")
+    parser.add_argument("--claim", dest="claim", action="store_true",
+            default=False, help="Lease batches of --page-size jobs, required"\
+            " when several drivers share the database")
+    parser.add_argument("--worker-id", dest="worker_id", default=None,
+            help="Name of this driver when claiming jobs (default: host name"\
+            " and process id)")
+    parser.add_argument("--lease", dest="lease", default=3600, type=int,
+            help="Seconds before claimed but unfinished jobs may be claimed"\
+            " again, renewed with every written batch (default: %(default)s)")
+    parser.add_argument("--max-attempts", dest="max_attempts", default=None,
+            type=int, help="Do not claim jobs that were claimed this often"\
+            " (default: no limit)")
+    parser.add_argument("--cache-dir", dest="cache_dir", default=None,
+            help="Directory in which to cache networks and series across"\
+            " jobs (default: no caching)")
+    parser.add_argument("--cache-size", dest="cache_size", default=4096,
+            type=int, help="Maximum size of the cache in MiB (default:"\
+            " %(default)s)")
+    parser.add_argument("--metrics", dest="metrics", action="store_true",
+            default=False, help="Store timings and counters of each job in"\
+            " the jobmetrics table")
     parser.add_argument("engine",
             help="Database connection string, e.g., 'sqlite+pysqlite:///file.db'")
     args = parser.parse_args()
@@ -133,9 +232,7 @@ if __name__ == "__main__":
     try:
         sys.exit(main(args))
     except: # we want to catch everything
-        (err, msg, trace) = sys.exc_info()
-        # do something
-        raise err, msg, trace
+        raise
     finally:
         logging.shutdown()
 
@@ -11,7 +11,7 @@ if __name__ == '__main__':
     from numpy import get_include
 
     # dynamics
-    sources = ["_dynamics.pyx", "dynamics.c"]
+    sources = ["_dynamics.pyx", "dynamics.c", "xoshiro.c"]
     c_path = join("booleandynamics", "src")
     dynamics = Extension("booleandynamics._dynamics",
         sources=[join(c_path, src) for src in sources],
@@ -25,6 +25,8 @@ if __name__ == '__main__':
         license="BSD 3-Clause License",
         packages=find_packages(),
         ext_modules=[dynamics],
+        extras_require={"test": ["pytest", "networkx", "scipy", "SQLAlchemy",
+                "pandas", "pyarrow"]},
         cmdclass={"build_ext": build_ext}
     )
 
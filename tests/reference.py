@@ -0,0 +1,141 @@
+# -*- coding: utf-8 -*-
+
+
+"""
+====================================
+Pure Python Reference of the Kernels
+====================================
+
+:Author:
+    Moritz Emanuel Beber
+:Date:
+    2026-10-18
+:Copyright:
+    Copyright |c| 2026, Jacobs University Bremen gGmbH, all rights reserved.
+:File:
+    reference.py
+
+.. |c| unicode:: U+A9
+"""
+
+
+from __future__ import (absolute_import, unicode_literals)
+
+
+import numpy as np
+
+import booleandynamics as bd
+
+
+RULES = ["majority", "threshold", "canalizing", "truth-table"]
+
+
+def small_network(num_nodes, num_links, rule, seed, dense=False):
+    """
+    Random network of a few nodes with self-links and multiple links, `dense`
+    gives a few nodes many more inputs.
+    """
+    rnd = np.random.default_rng(seed)
+    sources = rnd.integers(num_nodes, size=num_links)
+    targets = rnd.integers(num_nodes, size=num_links)
+    if dense:
+        targets[:num_links // 2] = rnd.integers(2, size=num_links // 2)
+    functions = rnd.choice([-1, 1], size=num_links)
+    rbn = bd.BooleanDynamics.from_edge_arrays(sources, targets, functions,
+            num_nodes)
+    if rule == "threshold":
+        # weights on a coarse grid produce ties with the thresholds
+        rbn.set_rule(rule, weights=rnd.integers(-2, 3, size=num_links) / 2.0,
+                thresholds=rnd.integers(-1, 2, size=num_nodes) / 2.0)
+    else:
+        rbn.set_rule(rule, seed=seed)
+    return rbn
+
+def node_rule(rbn, node, state):
+    """
+    The next state of one node.
+    """
+    if rbn.clamps is not None and rbn.clamps[node] >= 0:
+        return int(rbn.clamps[node])
+    links = range(rbn.incidence_ptr[node], rbn.incidence_ptr[node + 1])
+    inputs = [int(state[rbn.incidence_adj[k]]) for k in links]
+    if rbn.rule in ("majority", "threshold"):
+        if rbn.rule == "majority":
+            (weights, threshold) = (rbn.incidence_func, 0.0)
+        else:
+            (weights, threshold) = (rbn.weights, rbn.thresholds[node])
+        total = 0.0
+        for (k, value) in zip(links, inputs):
+            total += value * weights[k]
+        if total > threshold:
+            return 1
+        if total < threshold:
+            return 0
+        return int(state[node])
+    if rbn.rule == "truth-table":
+        index = sum(value << j for (j, value) in enumerate(inputs))
+        return int(rbn._table(node)[index])
+    for (k, value) in zip(links, inputs):
+        if value == rbn.canalizing[k]:
+            return int(rbn.canalized[k])
+    return int(rbn.defaults[node])
+
+def step(rbn, state, order=None):
+    """
+    One synchronous update, or one sequential sweep in `order`.
+    """
+    state = [int(value) for value in state]
+    if order is None:
+        return [node_rule(rbn, node, state) for node in range(rbn.num_nodes)]
+    for node in order:
+        state[node] = node_rule(rbn, node, state)
+    return state
+
+def clamped(rbn, state):
+    state = [int(value) for value in state]
+    if rbn.clamps is not None:
+        for node in range(rbn.num_nodes):
+            if rbn.clamps[node] >= 0:
+                state[node] = int(rbn.clamps[node])
+    return state
+
+def trajectory(rbn, state, steps, order=None):
+    """
+    The `steps` + 1 states of a deterministic trajectory.
+    """
+    states = [clamped(rbn, state)]
+    for _ in range(steps):
+        states.append(step(rbn, states[-1], order))
+    return states
+
+def first_repeat(states):
+    """
+    The time point at which the cycle is entered and its length, (-1, 0) if no
+    state repeats.
+    """
+    seen = dict()
+    for (time, state) in enumerate(states):
+        key = tuple(state)
+        if key in seen:
+            return (seen[key], time - seen[key])
+        seen[key] = time
+    return (-1, 0)
+
+def state_id(state):
+    return sum(int(value) << node for (node, value) in enumerate(state))
+
+def id_state(identifier, num_nodes):
+    return [(identifier >> node) & 1 for node in range(num_nodes)]
+
+def hamming(first, second):
+    return sum(int(a != b) for (a, b) in zip(first, second))
+
+def window_counts(series, size, overlap=0):
+    """
+    The ON states per node in every complete window of a (nodes x time)
+    series.
+    """
+    step = size - overlap
+    return [[int(sum(row[start:start + size]))
+            for start in range(0, len(row) - size + 1, step)]
+            for row in series]
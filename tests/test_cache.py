@@ -0,0 +1,118 @@
+# -*- coding: utf-8 -*-
+
+
+"""
+======================
+Boolean Dynamics Cache
+======================
+
+:Author:
+    Moritz Emanuel Beber
+:Date:
+    2026-10-18
+:Copyright:
+    Copyright |c| 2026, Jacobs University Bremen gGmbH, all rights reserved.
+:File:
+    test_cache.py
+
+.. |c| unicode:: U+A9
+"""
+
+
+from __future__ import (absolute_import, unicode_literals)
+
+
+import os
+
+import numpy as np
+import pytest
+
+import booleandynamics as bd
+
+import reference as ref
+
+
+@pytest.fixture
+def rbn():
+    return ref.small_network(6, 14, "canalizing", 2)
+
+def relabel(rbn, nodes):
+    return bd.BooleanDynamics.from_edge_arrays(rbn.incidence_adj,
+            np.repeat(np.arange(rbn.num_nodes), np.diff(rbn.incidence_ptr)),
+            rbn.incidence_func, rbn.num_nodes, nodes=nodes, rule=rbn.rule,
+            seed=2)
+
+def unused():
+    raise AssertionError("cache hit expected")
+
+def entries(directory):
+    return sorted(name for name in os.listdir(directory))
+
+
+@pytest.mark.parametrize("nodes", [None, list("abcdef"),
+        [1, "b", 2.5, None, "e", 3]], ids=["indices", "strings", "mixed"])
+def test_network_round_trip(rbn, tmp_path, nodes):
+    cache = bd.SimulationCache(str(tmp_path))
+    original = relabel(rbn, nodes)
+    assert cache.fetch_network("net", lambda: original) is original
+    loaded = cache.fetch_network("net", unused)
+    assert loaded.nodes == original.nodes
+    assert loaded.node2id == original.node2id
+    assert bd.network_hash(loaded) == bd.network_hash(original)
+    states = bd.unique_states(20, 6, seed=1)
+    assert np.array_equal(loaded.ensemble_series(states, 10),
+            original.ensemble_series(states, 10))
+
+def test_uncached_labels(rbn, tmp_path):
+    # tuples do not survive JSON, such networks are built every time
+    cache = bd.SimulationCache(str(tmp_path))
+    nodes = [(i, "x") for i in range(6)]
+    calls = list()
+
+    def build():
+        calls.append(1)
+        return relabel(rbn, nodes)
+
+    for _ in range(2):
+        assert cache.fetch_network("net", build).nodes == nodes
+    assert len(calls) == 2
+    assert entries(str(tmp_path)) == []
+
+def test_fetch_series(rbn, tmp_path):
+    cache = bd.SimulationCache(str(tmp_path))
+    calls = list()
+
+    def simulate(out):
+        calls.append(1)
+        bd.stitch_series(rbn, 4, 11, seed=3, out=out)
+
+    store = cache.fetch_series("series", rbn, 4, 10, simulate, seed=3)
+    again = cache.fetch_series("series", rbn, 4, 10, unused)
+    assert len(calls) == 1
+    # no temporary files are left behind
+    assert entries(str(tmp_path)) == ["series.bds"]
+    expected = bd.stitch_series(rbn, 4, 11, seed=3)
+    assert np.array_equal(store.stitched, expected)
+    assert np.array_equal(again.stitched, expected)
+    assert again.header["seed"] == 3
+    assert again.header["network_hash"] == bd.network_hash(rbn)
+    with pytest.raises(ValueError):
+        again.series[0, 0, 0] = 1
+
+def test_evict(rbn, tmp_path):
+    directory = str(tmp_path)
+    size = bd.SimulationCache(directory).fetch_series("first", rbn, 10, 99,
+            lambda out: None).series.nbytes
+    # room for two series
+    cache = bd.SimulationCache(directory, max_bytes=2 * size + 1000)
+    os.utime(os.path.join(directory, "first.bds"), (1, 1))
+    cache.fetch_series("second", rbn, 10, 99, lambda out: None)
+    os.utime(os.path.join(directory, "second.bds"), (2, 2))
+    # a hit marks the first entry as recently used
+    cache.fetch_series("first", rbn, 10, 99, unused)
+    cache.fetch_series("third", rbn, 10, 99, lambda out: None)
+    assert entries(directory) == ["first.bds", "third.bds"]
+    # the most recent entry stays even when it exceeds the limit alone
+    cache = bd.SimulationCache(directory, max_bytes=1)
+    cache.fetch_network("net", lambda: rbn)
+    assert entries(directory) == ["net.npz"]
@@ -0,0 +1,335 @@
+# -*- coding: utf-8 -*-
+
+
+"""
+==================================
+Boolean Dynamics Kernel References
+==================================
+
+:Author:
+    Moritz Emanuel Beber
+:Date:
+    2026-10-18
+:Copyright:
+    Copyright |c| 2026, Jacobs University Bremen gGmbH, all rights reserved.
+:File:
+    test_kernels.py
+
+.. |c| unicode:: U+A9
+"""
+
+
+from __future__ import (absolute_import, unicode_literals)
+
+
+import numpy as np
+import pytest
+
+import booleandynamics as bd
+
+import reference as ref
+
+
+NUM_NODES = 6
+SCHEMES = [False, "sequential"]
+
+
+@pytest.fixture(params=ref.RULES)
+def rule(request):
+    return request.param
+
+@pytest.fixture(params=[1, 2, 3], ids="seed={}".format)
+def rbn(request, rule):
+    return ref.small_network(NUM_NODES, 14, rule, request.param)
+
+@pytest.fixture(params=[False, True], ids=["free", "clamped"])
+def variant(request, rbn):
+    if request.param:
+        rbn = rbn.copy()
+        rbn.clamp([1, 4], [1, 0])
+    return rbn
+
+@pytest.fixture
+def states():
+    return np.random.default_rng(7).integers(2, size=(12, NUM_NODES),
+            dtype=np.ubyte)
+
+def update_order(asynchronous):
+    if asynchronous == "sequential":
+        return [3, 0, 5, 1, 4, 2]
+    return None
+
+
+@pytest.mark.parametrize("asynchronous", SCHEMES)
+def test_ensemble_series(variant, states, asynchronous):
+    order = update_order(asynchronous)
+    series = variant.ensemble_series(states, 20, asynchronous=asynchronous,
+            order=order)
+    for (state, result) in zip(states, series):
+        assert result.tolist() == ref.trajectory(variant, state, 20, order)
+
+@pytest.mark.parametrize("asynchronous", SCHEMES)
+def test_time_series(variant, states, asynchronous):
+    order = update_order(asynchronous)
+    series = variant.time_series(20, states[0], asynchronous=asynchronous,
+            order=order)
+    assert series.T.tolist() == ref.trajectory(variant, states[0], 20, order)
+
+@pytest.mark.parametrize("asynchronous", SCHEMES)
+def test_cycle_detection(variant, states, asynchronous):
+    # 64 states repeat within 64 steps, the remainder are copies of the cycle
+    order = update_order(asynchronous)
+    (series, transients, periods) = variant.ensemble_series(states, 150,
+            detect_cycle=True, asynchronous=asynchronous, order=order)
+    for (i, state) in enumerate(states):
+        expected = ref.trajectory(variant, state, 150, order)
+        assert series[i].tolist() == expected
+        assert (transients[i], periods[i]) == ref.first_repeat(expected)
+
+def test_find_attractors(variant, states):
+    (transients, periods, labels, attractors) = variant.find_attractors(
+            states)
+    for (i, state) in enumerate(states):
+        expected = ref.trajectory(variant, state, 2 ** NUM_NODES)
+        (transient, period) = ref.first_repeat(expected)
+        assert (transients[i], periods[i]) == (transient, period)
+        cycle = expected[transient:transient + period]
+        assert attractors[labels[i]].tolist() == min(cycle)
+
+@pytest.mark.parametrize("asynchronous", SCHEMES)
+def test_window_counts(variant, states, asynchronous):
+    order = update_order(asynchronous)
+    counts = variant.ensemble_series(states, 9, asynchronous=asynchronous,
+            order=order, window=4)
+    stitched = [row for state in states
+            for row in ref.trajectory(variant, state, 9, order)]
+    expected = [[sum(row[node] for row in stitched[start:start + 4])
+            for start in range(0, len(stitched) - 3, 4)]
+            for node in range(NUM_NODES)]
+    assert counts.tolist() == expected
+
+def test_packed_series():
+    # many inputs per node exercise the bit-sliced counters
+    rbn = ref.small_network(NUM_NODES, 120, "majority", 5, dense=True)
+    rbn.clamp(3, 1)
+    states = np.random.default_rng(8).integers(2, size=(150, NUM_NODES),
+            dtype=np.ubyte)
+    packed = rbn.packed_series(bd.pack_states(states), 12)
+    series = bd.unpack_series(packed, len(states))
+    for (state, result) in zip(states, series):
+        assert result.tolist() == ref.trajectory(rbn, state, 12)
+
+@pytest.mark.parametrize("asynchronous", ["random-sequential",
+        "random-single"])
+def test_independent_streams(rbn, states, asynchronous):
+    # a trajectory depends only on its initial state and its own stream
+    series = rbn.ensemble_series(states, 15, asynchronous=asynchronous,
+            seed=np.random.SeedSequence(4))
+    for (i, state) in enumerate(states):
+        single = rbn.ensemble_series(states[i:i + 1], 15,
+                asynchronous=asynchronous,
+                seed=np.random.SeedSequence(4, n_children_spawned=i))
+        assert single[0].tolist() == series[i].tolist()
+
+@pytest.mark.parametrize("chunk", [1, 7, 31, 100])
+@pytest.mark.parametrize("asynchronous", SCHEMES + ["random-sequential",
+        "random-single"])
+def test_iter_series(variant, states, asynchronous, chunk):
+    # the random streams continue across chunk boundaries
+    order = update_order(asynchronous)
+    chunks = list(variant.iter_series(30, states[0], chunk=chunk,
+            asynchronous=asynchronous, seed=3, order=order))
+    assert all(0 < part.shape[1] <= chunk for part in chunks)
+    assert np.array_equal(np.concatenate(chunks, axis=1),
+            variant.time_series(30, states[0], asynchronous=asynchronous,
+            seed=3, order=order))
+    # random initial states are drawn as by time_series
+    assert np.array_equal(np.concatenate(list(variant.iter_series(30,
+            chunk=chunk, asynchronous=asynchronous, seed=5, order=order)),
+            axis=1), variant.time_series(30, asynchronous=asynchronous,
+            seed=5, order=order))
+
+@pytest.mark.parametrize("n_threads", [2, 5, None])
+@pytest.mark.parametrize("asynchronous", SCHEMES + ["random-sequential",
+        "random-single"])
+def test_threads(variant, states, asynchronous, n_threads):
+    # slices of 12 trajectories, windows of 4 cross trajectory boundaries
+    order = update_order(asynchronous)
+    options = dict(asynchronous=asynchronous, order=order, seed=6)
+    series = variant.ensemble_series(states, 9, **options)
+    counts = variant.ensemble_series(states, 9, window=4, **options)
+    assert np.array_equal(variant.run_ensemble(states, 9,
+            n_threads=n_threads, **options), series)
+    assert np.array_equal(variant.run_ensemble(states, 9,
+            n_threads=n_threads, window=4, **options), counts)
+    if not asynchronous or asynchronous == "sequential":
+        expected = variant.ensemble_series(states, 80, detect_cycle=True,
+                **options)
+        result = variant.run_ensemble(states, 80, n_threads=n_threads,
+                detect_cycle=True, **options)
+        for (first, second) in zip(result, expected):
+            assert np.array_equal(first, second)
+
+@pytest.mark.parametrize("asynchronous", SCHEMES)
+def test_state_transition_map(variant, asynchronous):
+    order = update_order(asynchronous)
+    successors = variant.state_transition_map(asynchronous=asynchronous,
+            order=order)
+    expected = [ref.state_id(ref.step(variant, ref.id_state(i, NUM_NODES),
+            order)) for i in range(2 ** NUM_NODES)]
+    assert successors.tolist() == expected
+
+def test_dense_transition_map():
+    # the majority rule advances 64 states per word
+    rbn = ref.small_network(8, 150, "majority", 6, dense=True)
+    expected = [ref.state_id(ref.step(rbn, ref.id_state(i, 8)))
+            for i in range(2 ** 8)]
+    assert rbn.state_transition_map().tolist() == expected
+
+def test_basins_of_attraction(variant):
+    successors = [ref.state_id(ref.step(variant, ref.id_state(i, NUM_NODES)))
+            for i in range(2 ** NUM_NODES)]
+    cycles = dict()
+    for state in range(len(successors)):
+        path = [state]
+        while path.count(path[-1]) < 2:
+            path.append(successors[path[-1]])
+        cycle = path[path.index(path[-1]):-1]
+        cycles[state] = min(cycle)
+    attractors = sorted(set(cycles.values()))
+    (basins, found, periods, sizes, garden_of_eden) =\
+            variant.basins_of_attraction()
+    assert found.tolist() == attractors
+    assert [attractors[label] for label in basins] ==\
+            [cycles[state] for state in range(len(successors))]
+    for (label, attractor) in enumerate(attractors):
+        period = 1
+        state = successors[attractor]
+        while state != attractor:
+            (state, period) = (successors[state], period + 1)
+        assert periods[label] == period
+        assert sizes[label] == list(cycles.values()).count(attractor)
+    assert garden_of_eden.tolist() == [state not in successors
+            for state in range(len(successors))]
+
+@pytest.mark.parametrize("change", [2 ** NUM_NODES, 2 ** 40, -1, 0.5])
+def test_invalid_successors(rbn, change):
+    successors = rbn.state_transition_map().astype(np.int64)
+    with pytest.raises(bd.BooleanDynamicsError):
+        rbn.basins_of_attraction(successors[:-1])
+    successors = successors.astype(type(change))
+    successors[5] = change
+    with pytest.raises(bd.BooleanDynamicsError):
+        rbn.basins_of_attraction(successors)
+
+@pytest.mark.parametrize("asynchronous", SCHEMES)
+def test_damage_spreading(variant, states, asynchronous):
+    order = update_order(asynchronous)
+    flips = [[0], [1], [2, 4], [3, 5], []]
+    masks = np.zeros((len(flips), NUM_NODES), dtype=bool)
+    for (i, nodes) in enumerate(flips):
+        masks[i, nodes] = True
+    distances = variant.damage_spreading(states, masks, 15,
+            asynchronous=asynchronous, order=order)
+    for (i, state) in enumerate(states):
+        original = ref.trajectory(variant, state, 15, order)
+        for (j, nodes) in enumerate(flips):
+            perturbed = ref.clamped(variant, state)
+            for node in nodes:
+                if variant.clamps is None or variant.clamps[node] < 0:
+                    perturbed[node] = 1 - perturbed[node]
+            copy = ref.trajectory(variant, perturbed, 15, order)
+            assert distances[i, j].tolist() == [ref.hamming(a, b)
+                    for (a, b) in zip(original, copy)]
+
+def test_sparse_damage_front():
+    # few damaged nodes in a large sparse network take the sparse path
+    num_nodes = 400
+    rnd = np.random.default_rng(9)
+    rbn = bd.BooleanDynamics.from_edge_arrays(rnd.integers(num_nodes,
+            size=800), rnd.integers(num_nodes, size=800),
+            rnd.choice([-1, 1], size=800), num_nodes)
+    states = rnd.integers(2, size=(3, num_nodes), dtype=np.ubyte)
+    distances = rbn.damage_spreading(states, [0, 17, 250], 12)
+    for (i, state) in enumerate(states):
+        original = ref.trajectory(rbn, state, 12)
+        for (j, node) in enumerate([0, 17, 250]):
+            perturbed = list(state)
+            perturbed[node] = 1 - perturbed[node]
+            copy = ref.trajectory(rbn, perturbed, 12)
+            assert distances[i, j].tolist() == [ref.hamming(a, b)
+                    for (a, b) in zip(original, copy)]
+
+@pytest.mark.parametrize("asynchronous", ["random-sequential",
+        "random-single"])
+def test_random_damage_replays_streams(variant, states, asynchronous):
+    # a copy draws the same node orders as its reference trajectory
+    distances = variant.damage_spreading(states[:1], [0, 2, 5], 15,
+            asynchronous=asynchronous, seed=4)
+    original = variant.ensemble_series(states[:1], 15,
+            asynchronous=asynchronous, seed=4)[0]
+    for (j, node) in enumerate([0, 2, 5]):
+        perturbed = states[:1].copy()
+        perturbed[0, node] ^= 1
+        copy = variant.ensemble_series(perturbed, 15,
+                asynchronous=asynchronous, seed=4)[0]
+        assert distances[0, j].tolist() ==\
+                (original != copy).sum(axis=1).tolist()
+
+@pytest.mark.parametrize("asynchronous", SCHEMES + ["random-sequential"])
+def test_knockout_screen(variant, states, asynchronous):
+    order = update_order(asynchronous)
+    nodes = [0, 2, 3, 5]
+    activity = variant.knockout_screen(states, 10, nodes=nodes, value=[0, 1,
+            0, 1], asynchronous=asynchronous, order=order, seed=4)
+    for (k, (node, value)) in enumerate(zip(nodes, [0, 1, 0, 1])):
+        other = variant.copy()
+        other.clamp(node, value)
+        if asynchronous == "random-sequential":
+            series = other.ensemble_series(states, 10,
+                    asynchronous=asynchronous, seed=4)
+        else:
+            series = np.array([ref.trajectory(other, state, 10, order)
+                    for state in states])
+        assert np.allclose(activity[k], series.mean(axis=(0, 1)))
+
+@pytest.mark.parametrize("method", ["rcm", "degree"])
+@pytest.mark.parametrize("asynchronous", SCHEMES)
+def test_reordered(variant, states, method, asynchronous):
+    order = update_order(asynchronous)
+    other = variant.copy()
+    other.reorder(method)
+    series = other.ensemble_series(states, 20, asynchronous=asynchronous,
+            order=order)
+    for (state, result) in zip(states, series):
+        assert result.tolist() == ref.trajectory(variant, state, 20, order)
+    assert np.array_equal(other.damage_spreading(states, [0, 3], 10,
+            asynchronous=asynchronous, order=order),
+            variant.damage_spreading(states, [0, 3], 10,
+            asynchronous=asynchronous, order=order))
+
+def test_unique_states():
+    for (num_states, num_nodes) in [(64, 6), (50, 6), (300, 40)]:
+        states = bd.unique_states(num_states, num_nodes, seed=3)
+        assert states.shape == (num_states, num_nodes)
+        assert len(set(map(tuple, states.tolist()))) == num_states
+    with pytest.raises(bd.BooleanDynamicsError):
+        bd.unique_states(65, 6)
+
+def test_state_ids():
+    states = [ref.id_state(i, NUM_NODES) for i in range(2 ** NUM_NODES)]
+    assert bd.states_to_ids(states).tolist() == list(range(2 ** NUM_NODES))
+    assert bd.ids_to_states(np.arange(2 ** NUM_NODES), NUM_NODES).tolist() ==\
+            states
+
+@pytest.mark.parametrize("edit", ["flip_edge", "remove_edge"])
+def test_edits(rbn, states, edit):
+    # the kernels see consistent arrays after editing a link in place
+    other = rbn.copy()
+    source = int(other.incidence_adj[other.incidence_ptr[2]])
+    getattr(other, edit)(source, 2)
+    assert other.incidence_ptr[-1] == rbn.incidence_ptr[-1] -\
+            (edit == "remove_edge")
+    series = other.ensemble_series(states, 10)
+    for (state, result) in zip(states, series):
+        assert result.tolist() == ref.trajectory(other, state, 10)
@@ -0,0 +1,322 @@
+# -*- coding: utf-8 -*-
+
+
+"""
+=========================
+Boolean Dynamics Database
+=========================
+
+:Author:
+    Moritz Emanuel Beber
+:Date:
+    2026-10-18
+:Copyright:
+    Copyright |c| 2026, Jacobs University Bremen gGmbH, all rights reserved.
+:File:
+    test_models.py
+
+.. |c| unicode:: U+A9
+"""
+
+
+from __future__ import (absolute_import, unicode_literals)
+
+
+import threading
+
+import numpy as np
+import pandas as pd
+import pytest
+from sqlalchemy import (create_engine, inspect, text, func)
+
+import booleandynamics as bd
+
+
+# the tables as created by the first version of the job database
+BASELINE = [
+    "CREATE TABLE job (id INTEGER NOT NULL, generator VARCHAR, num_nodes"
+    " INTEGER, num_activating INTEGER, num_inhibiting INTEGER, num_repeats"
+    " INTEGER, steps INTEGER, win_size INTEGER, random_num INTEGER, function"
+    " VARCHAR, seed INTEGER, complete BOOLEAN NOT NULL, PRIMARY KEY (id))",
+    "CREATE TABLE controlresult (id INTEGER NOT NULL, job_id INTEGER, ctc"
+    " FLOAT, measure VARCHAR(30), delay INTEGER, PRIMARY KEY (id), FOREIGN"
+    " KEY(job_id) REFERENCES job (id))"
+]
+
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = create_engine("sqlite:///{}".format(tmp_path / "jobs.db"))
+    yield engine
+    engine.dispose()
+
+@pytest.fixture
+def session(engine):
+    bd.Base.metadata.create_all(engine)
+    session = bd.Session(bind=engine)
+    # every third job is complete already
+    session.add_all([bd.Job(id=i, num_nodes=10, complete=(i % 3 == 0),
+            status="complete" if i % 3 == 0 else "pending")
+            for i in range(1, 26)])
+    session.commit()
+    yield session
+    session.close()
+
+def pending_ids(session):
+    return [job_id for (job_id,) in session.query(bd.Job.id).filter(
+            ~bd.Job.complete).order_by(bd.Job.id)]
+
+def results(job_id, num_rows):
+    return [dict(job_id=job_id, ctc=0.1 * i, measure="absolute", delay=i)
+            for i in range(num_rows)]
+
+def schema(engine):
+    inspector = inspect(engine)
+    return dict((table, (sorted(col["name"] for col in
+            inspector.get_columns(table)), sorted(index["name"] for index in
+            inspector.get_indexes(table))))
+            for table in inspector.get_table_names())
+
+
+def test_upgrade_schema(engine):
+    with engine.begin() as conn:
+        for ddl in BASELINE:
+            conn.execute(text(ddl))
+        conn.execute(text("INSERT INTO job (id, num_nodes, complete) VALUES"
+                " (1, 10, 1), (2, 20, 0)"))
+        conn.execute(text("INSERT INTO controlresult (job_id, ctc, measure)"
+                " VALUES (1, 0.5, 'absolute')"))
+    added = bd.upgrade_schema(engine)
+    assert sorted(added) == ["job.attempts", "job.lease_expires",
+            "job.status", "job.worker_id"]
+    upgraded = schema(engine)
+    assert set(upgraded) == {"job", "controlresult", "jobmetrics"}
+    for table in bd.Base.metadata.sorted_tables:
+        assert upgraded[table.name][0] == sorted(col.name for col in
+                table.columns)
+    assert "ix_job_status" in upgraded["job"][1]
+    with engine.connect() as conn:
+        jobs = conn.execute(text("SELECT id, status, attempts, complete FROM"
+                " job ORDER BY id")).fetchall()
+    assert [tuple(row) for row in jobs] == [(1, "complete", 0, 1),
+            (2, "pending", 0, 0)]
+    # a second run finds nothing to do
+    assert bd.upgrade_schema(engine) == []
+    assert schema(engine) == upgraded
+    with engine.connect() as conn:
+        assert [tuple(row) for row in conn.execute(text("SELECT id, status,"
+                " attempts, complete FROM job ORDER BY id"))] ==\
+                [tuple(row) for row in jobs]
+        assert conn.execute(text("SELECT COUNT(*) FROM controlresult")
+                ).scalar() == 1
+
+def test_upgrade_current_schema(engine):
+    bd.Base.metadata.create_all(engine)
+    expected = schema(engine)
+    assert bd.upgrade_schema(engine) == []
+    assert schema(engine) == expected
+
+def test_claim_disjoint(engine, session):
+    expected = pending_ids(session)
+    claimed = dict()
+
+    def drive(worker_id):
+        own = bd.Session(bind=engine)
+        claimed[worker_id] = list()
+        while True:
+            jobs = bd.Job.claim(own, worker_id, 2)
+            if len(jobs) == 0:
+                break
+            claimed[worker_id].extend(job.id for job in jobs)
+        own.close()
+
+    threads = [threading.Thread(target=drive, args=("driver-{:d}".format(i),))
+            for i in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    job_ids = [job_id for ids in claimed.values() for job_id in ids]
+    assert sorted(job_ids) == expected
+    for (worker_id, ids) in claimed.items():
+        assert sorted(job_id for (job_id,) in session.query(bd.Job.id).filter(
+                bd.Job.worker_id == worker_id)) == sorted(ids)
+    assert session.query(bd.Job).filter(bd.Job.status == "running",
+            bd.Job.attempts == 1).count() == len(expected)
+
+def test_expired_lease(session):
+    first = bd.Job.claim(session, "first", 3, lease=-10)
+    assert len(first) == 3
+    # the leases have expired, the jobs are claimable again
+    second = bd.Job.claim(session, "second", 3)
+    assert [job.id for job in second] == [job.id for job in first]
+    assert [job.attempts for job in second] == [2, 2, 2]
+    assert bd.Job.claim(session, "third", 3)[0].id not in\
+            [job.id for job in first]
+    # the first driver lost its jobs, its results are dropped
+    writer = bd.ResultWriter(session, worker_id="first")
+    for job in first:
+        writer.add(job.id, results(job.id, 2))
+    assert writer.flush() == 0
+    assert session.query(bd.ControlResult).count() == 0
+    writer = bd.ResultWriter(session, worker_id="second", lease=600)
+    for job in second:
+        writer.add(job.id, results(job.id, 2))
+    assert writer.flush() == 3
+    assert session.query(bd.ControlResult).count() == 6
+    assert all(job.complete and job.status == "complete" for job in
+            session.query(bd.Job).filter(bd.Job.id.in_([job.id
+            for job in second])))
+
+def test_renew(session):
+    jobs = bd.Job.claim(session, "first", 4, lease=-10)
+    assert bd.Job.renew(session, "first", lease=600) == 4
+    session.commit()
+    # only the jobs that were never claimed
+    claimed = [job.id for job in bd.Job.claim(session, "second", 30)]
+    assert claimed == [job_id for job_id in range(1, 26) if job_id % 3 != 0
+            and job_id not in [job.id for job in jobs]]
+    assert bd.Job.renew(session, "third") == 0
+
+def test_max_attempts(session):
+    for attempt in range(2):
+        jobs = bd.Job.claim(session, "driver", 30, lease=-10, max_attempts=2)
+        assert [job.id for job in jobs] == pending_ids(session)
+    assert bd.Job.claim(session, "driver", 30, lease=-10, max_attempts=2) ==\
+            []
+    assert len(bd.Job.claim(session, "driver", 30, max_attempts=3)) ==\
+            len(jobs)
+
+def test_iter_pending(session):
+    expected = pending_ids(session)
+    visited = list()
+    writer = bd.ResultWriter(session, batch_size=3)
+    for page in bd.Job.iter_pending(session, page_size=4):
+        assert 0 < len(page) <= 4
+        for job in page:
+            visited.append(job.id)
+            # completing jobs while paging skips none of the others
+            writer.add(job.id, results(job.id, 1))
+    writer.flush()
+    assert visited == expected
+    assert pending_ids(session) == []
+    assert list(bd.Job.iter_pending(session)) == []
+
+@pytest.mark.parametrize("worker_id", [None, "driver"])
+def test_failed_flush(session, monkeypatch, worker_id):
+    if worker_id is not None:
+        bd.Job.claim(session, worker_id, 30)
+    job_ids = pending_ids(session)[:6]
+    writer = bd.ResultWriter(session, batch_size=100, worker_id=worker_id)
+    for job_id in job_ids:
+        writer.add(job_id, results(job_id, 3))
+    execute = session.execute
+    calls = {"insert": 0}
+
+    def failing(statement, *args, **kw_args):
+        # the batch fails after its jobs were marked complete
+        if getattr(statement, "table", None) is bd.ControlResult.__table__:
+            calls["insert"] += 1
+            if calls["insert"] == 1:
+                raise RuntimeError("connection lost")
+        return execute(statement, *args, **kw_args)
+
+    monkeypatch.setattr(session, "execute", failing)
+    assert writer.flush() == len(job_ids)
+    monkeypatch.undo()
+    counts = dict(session.query(bd.ControlResult.job_id,
+            func.count(bd.ControlResult.id)).group_by(
+            bd.ControlResult.job_id))
+    assert counts == dict((job_id, 3) for job_id in job_ids)
+    assert pending_ids(session)[0] not in job_ids
+
+def test_failed_job(session):
+    # a job whose results cannot be written stays incomplete
+    job_ids = pending_ids(session)[:4]
+    writer = bd.ResultWriter(session, batch_size=100)
+    for job_id in job_ids:
+        rows = results(job_id, 2)
+        if job_id == job_ids[1]:
+            rows[1]["ctc"] = object()
+        writer.add(job_id, rows)
+    assert writer.flush() == 3
+    assert pending_ids(session)[0] == job_ids[1]
+    counts = dict(session.query(bd.ControlResult.job_id,
+            func.count(bd.ControlResult.id)).group_by(
+            bd.ControlResult.job_id))
+    assert counts == dict((job_id, 2) for job_id in job_ids
+            if job_id != job_ids[1])
+
+@pytest.fixture
+def results_session(session):
+    # ids and counts beyond 2**53 do not fit into a float
+    large = 2 ** 53 + 1
+    rows = [dict(id=large + i, job_id=1 + i % 5, ctc=0.25 * i,
+            measure="absolute" if i % 3 else "delayed",
+            delay=None if i % 4 == 0 else large + i) for i in range(1, 21)]
+    session.execute(bd.ControlResult.__table__.insert(), rows)
+    for job in session.query(bd.Job).filter(bd.Job.id <= 5):
+        job.win_size = 10 * job.id
+    session.commit()
+    return (session, rows)
+
+def expected_frame(rows, jobs=None):
+    frame = pd.DataFrame(rows).set_index("id")
+    frame["delay"] = pd.array([row["delay"] for row in rows], dtype="Int64")
+    if jobs is not None:
+        frame["num_nodes"] = 10
+        frame["win_size"] = frame["job_id"] * 10
+    return frame
+
+def test_load_frame(results_session):
+    (session, rows) = results_session
+    frame = bd.ControlResult.load_frame(session, chunk_size=3)
+    expected = expected_frame(rows)
+    assert frame.index.tolist() == expected.index.tolist()
+    assert frame["job_id"].dtype == np.int64
+    assert frame["delay"].dtype == "Int64"
+    assert frame["delay"].tolist() == expected["delay"].tolist()
+    assert isinstance(frame["measure"].dtype, pd.CategoricalDtype)
+    assert frame["measure"].tolist() == expected["measure"].tolist()
+    assert np.allclose(frame["ctc"], expected["ctc"])
+    # without missing values the column stays plain int64
+    present = bd.ControlResult.load_frame(session, where=
+            bd.ControlResult.delay != None)
+    assert present["delay"].dtype == np.int64
+    assert present["delay"].tolist() == [row["delay"] for row in rows
+            if row["delay"] is not None]
+
+def test_load_frame_filters(results_session):
+    (session, rows) = results_session
+    frame = bd.ControlResult.load_frame(session, job_columns=("num_nodes",
+            "win_size"), measure="absolute", job_id=[1, 2, 4],
+            where=bd.Job.win_size > 10)
+    expected = expected_frame([row for row in rows if row["measure"] ==
+            "absolute" and row["job_id"] in (2, 4)], jobs=True)
+    assert frame.index.tolist() == expected.index.tolist()
+    assert frame.columns.tolist() == ["job_id", "ctc", "measure", "delay",
+            "num_nodes", "win_size"]
+    assert frame["win_size"].tolist() == expected["win_size"].tolist()
+    assert frame["delay"].tolist() == expected["delay"].tolist()
+    # job columns as keyword filters join as well
+    assert bd.ControlResult.load_frame(session, win_size=30,
+            delay=None).index.tolist() == [row["id"] for row in rows
+            if row["job_id"] == 3 and row["delay"] is None]
+    assert len(bd.ControlResult.load_frame(session, measure="none")) == 0
+    with pytest.raises(ValueError):
+        bd.ControlResult.load_frame(session, colour="red")
+
+@pytest.mark.parametrize("extension", [".parquet", ".feather"])
+def test_load_frame_file(results_session, tmp_path, extension):
+    (session, rows) = results_session
+    filename = str(tmp_path / ("results" + extension))
+    frame = bd.ControlResult.load_frame(session, job_columns=("num_nodes",),
+            filename=filename)
+    if extension == ".parquet":
+        loaded = pd.read_parquet(filename)
+    else:
+        loaded = pd.read_feather(filename).set_index("id")
+    pd.testing.assert_frame_equal(loaded, frame)
+    with pytest.raises(ValueError):
+        bd.ControlResult.load_frame(session, filename=str(tmp_path /
+                "results.csv"))
@@ -0,0 +1,156 @@
+# -*- coding: utf-8 -*-
+
+
+"""
+==================================
+Boolean Dynamics Network Structure
+==================================
+
+:Author:
+    Moritz Emanuel Beber
+:Date:
+    2026-10-18
+:Copyright:
+    Copyright |c| 2026, Jacobs University Bremen gGmbH, all rights reserved.
+:File:
+    test_network.py
+
+.. |c| unicode:: U+A9
+"""
+
+
+from __future__ import (absolute_import, unicode_literals)
+
+
+import networkx as nx
+import numpy as np
+import pytest
+import scipy.sparse as sp
+
+import booleandynamics as bd
+
+import reference as ref
+
+
+@pytest.fixture
+def trn():
+    net = nx.DiGraph()
+    net.add_edge("A", "A", function=-1)
+    net.add_edge("B", "C", function=-1)
+    net.add_edge("C", "A", function=1)
+    return net
+
+def signed_edges(net):
+    return sorted(net.edges(data="function"))
+
+
+@pytest.mark.parametrize("node2id", [None, {"C": 0, "A": 1, "B": 2}])
+def test_from_trn(trn, node2id):
+    rbn = bd.BooleanDynamics(trn, node2id=node2id, function="function")
+    if node2id is not None:
+        assert rbn.nodes == ["C", "A", "B"]
+    assert signed_edges(rbn.to_networkx(function="function")) ==\
+            signed_edges(trn)
+
+def test_from_trn_dynamics(trn):
+    # the same dynamics whatever the indices
+    first = bd.BooleanDynamics(trn, function="function")
+    node2id = {"C": 0, "A": 1, "B": 2}
+    second = bd.BooleanDynamics(trn, node2id=node2id, function="function")
+    for state_id in range(8):
+        state = ref.id_state(state_id, 3)
+        permuted = [state[first.node2id[node]] for node in second.nodes]
+        expected = first.time_series(5, state)
+        assert second.time_series(5, permuted).tolist() ==\
+                [expected[first.node2id[node]].tolist()
+                for node in second.nodes]
+
+def test_from_multigraph():
+    # the link function is the key, parallel links may have both functions
+    rnd = np.random.default_rng(4)
+    links = set(zip(rnd.integers(6, size=30).tolist(),
+            rnd.integers(6, size=30).tolist(),
+            rnd.choice([-1, 1], size=30).tolist()))
+    trn = nx.MultiDiGraph()
+    trn.add_edges_from(links)
+    rbn = bd.BooleanDynamics(trn)
+    (sources, targets, functions) = zip(*sorted(links))
+    expected = bd.BooleanDynamics.from_edge_arrays(sources, targets,
+            functions, 6)
+    assert sorted(rbn.to_networkx(multigraph=True).edges(keys=True)) ==\
+            sorted(links)
+    states = [ref.id_state(i, 6) for i in range(2 ** 6)]
+    assert np.array_equal(rbn.ensemble_series(states, 8),
+            expected.ensemble_series(states, 8))
+
+@pytest.mark.parametrize("fmt", ["csc", "csr", "coo"])
+def test_from_scipy_sparse(fmt):
+    rnd = np.random.default_rng(5)
+    pairs = sorted(set(zip(rnd.integers(8, size=25).tolist(),
+            rnd.integers(8, size=25).tolist())))
+    (sources, targets) = zip(*pairs)
+    functions = rnd.choice([-1, 1], size=len(pairs))
+    # an explicitly stored zero is no link
+    functions[3] = 0
+    matrix = sp.coo_matrix((functions, (sources, targets)),
+            shape=(8, 8)).asformat(fmt)
+    original = matrix.copy()
+    rbn = bd.BooleanDynamics.from_scipy_sparse(matrix,
+            nodes=list("abcdefgh"))
+    keep = (functions != 0)
+    expected = bd.BooleanDynamics.from_edge_arrays(
+            np.asarray(sources)[keep], np.asarray(targets)[keep],
+            functions[keep], 8, nodes=list("abcdefgh"))
+    assert signed_edges(rbn.to_networkx()) ==\
+            signed_edges(expected.to_networkx())
+    states = [ref.id_state(i, 8) for i in range(2 ** 8)]
+    assert np.array_equal(rbn.ensemble_series(states, 8),
+            expected.ensemble_series(states, 8))
+    # the caller's matrix keeps its explicit zero
+    assert matrix.nnz == original.nnz == len(pairs)
+    assert (matrix != original).nnz == 0
+
+def test_invalid_scipy_sparse():
+    with pytest.raises(bd.BooleanDynamicsError):
+        bd.BooleanDynamics.from_scipy_sparse(sp.csc_matrix((3, 4)))
+
+@pytest.mark.parametrize("node2id", [{"C": 0, "A": 1, "B": 3},
+        {"C": 0, "A": 1}])
+def test_invalid_node2id(trn, node2id):
+    with pytest.raises(bd.BooleanDynamicsError):
+        bd.BooleanDynamics(trn, node2id=node2id, function="function")
+
+def test_cached_labels(trn, tmp_path):
+    cache = bd.SimulationCache(str(tmp_path))
+    node2id = {"C": 0, "A": 1, "B": 2}
+    rbn = bd.BooleanDynamics(trn, node2id=node2id, function="function")
+    cache.fetch_network("net", lambda: rbn)
+    loaded = cache.fetch_network("net", None)
+    assert loaded.nodes == rbn.nodes
+    assert signed_edges(loaded.to_networkx(function="function")) ==\
+            signed_edges(trn)
+
+def test_random_regulatory():
+    first = bd.random_regulatory(40, 50, 30, seed=7)
+    assert signed_edges(first) ==\
+            signed_edges(bd.random_regulatory(40, 50, 30, seed=7))
+    assert signed_edges(first) !=\
+            signed_edges(bd.random_regulatory(40, 50, 30, seed=8))
+    # every node has an inhibiting input
+    for node in first:
+        assert any(func == -1 for (_, _, func) in
+                first.in_edges(node, data="function"))
+
+def test_feedback():
+    net = bd.test_feedback()
+    assert signed_edges(net) == [("A", "A", -1), ("A", "B", 1),
+            ("B", "B", -1), ("B", "C", 1), ("C", "A", 1), ("C", "C", -1)]
+
+def test_clamp_overrides_states():
+    rbn = ref.small_network(6, 14, "majority", 1)
+    rbn.clamp([0, 3], [1, 0])
+    series = rbn.ensemble_series(np.zeros((4, 6), dtype=np.ubyte) + 1, 10,
+            asynchronous="random-single", seed=2)
+    assert (series[:, :, 0] == 1).all() and (series[:, :, 3] == 0).all()
+    rbn.release()
+    assert rbn.clamps is None
@@ -0,0 +1,109 @@
+# -*- coding: utf-8 -*-
+
+
+"""
+==========================
+Boolean Dynamics Profiling
+==========================
+
+:Author:
+    Moritz Emanuel Beber
+:Date:
+    2026-10-18
+:Copyright:
+    Copyright |c| 2026, Jacobs University Bremen gGmbH, all rights reserved.
+:File:
+    test_profiling.py
+
+.. |c| unicode:: U+A9
+"""
+
+
+from __future__ import (absolute_import, unicode_literals)
+
+
+import threading
+
+import pytest
+
+import booleandynamics as bd
+from booleandynamics import profiling
+
+import reference as ref
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    # every reading of the clock advances it by one second
+    ticks = iter(range(1000))
+    monkeypatch.setattr(profiling, "time", lambda: float(next(ticks)))
+
+
+def test_metrics(clock):
+    metrics = bd.Metrics()
+    for _ in range(3):
+        with metrics.stage("simulate"):
+            pass
+    with pytest.raises(KeyError):
+        with metrics.stage("expression"):
+            raise KeyError("the stage is timed anyway")
+    metrics.count("steps", 10)
+    metrics.count("steps", 5)
+    metrics.count("jobs")
+    assert metrics.timers == {"simulate": 3.0, "expression": 1.0}
+    assert metrics.counters == {"steps": 15, "jobs": 1}
+    assert sorted(metrics.rows(7), key=lambda row: row["name"]) == [
+            {"job_id": 7, "kind": "time", "name": "expression", "value": 1.0},
+            {"job_id": 7, "kind": "count", "name": "jobs", "value": 1},
+            {"job_id": 7, "kind": "time", "name": "simulate", "value": 3.0},
+            {"job_id": 7, "kind": "count", "name": "steps", "value": 15}]
+
+def test_recording(clock):
+    # nothing is recorded outside of a block
+    with profiling.stage("ignored") as metrics:
+        assert metrics is None
+    profiling.count("ignored")
+    with bd.recording() as outer:
+        profiling.count("steps", 2)
+        with bd.recording(bd.Metrics()) as inner:
+            with profiling.stage("inner") as metrics:
+                assert metrics is inner
+            profiling.count("steps")
+        # the outer metrics are active again
+        with profiling.stage("outer"):
+            profiling.count("steps", 3)
+    profiling.count("steps", 100)
+    assert (outer.timers, outer.counters) == ({"outer": 1.0}, {"steps": 5})
+    assert (inner.timers, inner.counters) == ({"inner": 1.0}, {"steps": 1})
+
+def test_threads():
+    # other threads record into their own metrics only
+    metrics = bd.Metrics()
+
+    def work():
+        profiling.count("foreign")
+        for _ in range(1000):
+            metrics.count("shared")
+
+    with bd.recording(metrics):
+        threads = [threading.Thread(target=work) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    assert metrics.counters == {"shared": 4000}
+
+def test_simulation_counters():
+    rbn = ref.small_network(6, 14, "majority", 1)
+    states = bd.unique_states(5, 6, seed=2)
+    with bd.recording() as metrics:
+        rbn.ensemble_series(states, 10, asynchronous="random-single", seed=3)
+    assert metrics.counters == {"steps": 50, "edges": 50 * 14,
+            "bytes": 5 * 11 * 6}
+
+def test_namespace():
+    # the generic helpers are not exported at the top level
+    assert "stage" not in bd.__all__ and "count" not in bd.__all__
+    assert not hasattr(bd, "stage") and not hasattr(bd, "count")
+    assert bd.Metrics is profiling.Metrics
+    assert bd.recording is profiling.recording
@@ -0,0 +1,89 @@
+# -*- coding: utf-8 -*-
+
+
+"""
+======================
+Boolean Dynamics Store
+======================
+
+:Author:
+    Moritz Emanuel Beber
+:Date:
+    2026-10-18
+:Copyright:
+    Copyright |c| 2026, Jacobs University Bremen gGmbH, all rights reserved.
+:File:
+    test_store.py
+
+.. |c| unicode:: U+A9
+"""
+
+
+from __future__ import (absolute_import, unicode_literals)
+
+
+import numpy as np
+import pytest
+
+import booleandynamics as bd
+
+import reference as ref
+
+
+@pytest.fixture
+def rbn():
+    return ref.small_network(6, 14, "threshold", 3)
+
+
+@pytest.mark.parametrize("asynchronous", [False, "random-single"])
+def test_round_trip(rbn, tmp_path, asynchronous):
+    filename = str(tmp_path / "series.bds")
+    store = bd.SeriesStore.create(filename, rbn, 5, 19, seed=7,
+            asynchronous=asynchronous, label="control")
+    bd.stitch_series(rbn, 5, 20, seed=7, asynchronous=asynchronous,
+            out=store.series)
+    store.flush()
+    del store
+    loaded = bd.SeriesStore(filename)
+    assert loaded.header["offset"] % 64 == 0
+    assert loaded.header["network_hash"] == bd.network_hash(rbn)
+    assert (loaded.header["seed"], loaded.header["steps"],
+            loaded.header["num_nodes"], loaded.header["rule"]) ==\
+            (7, 19, 6, "threshold")
+    assert loaded.header["asynchronous"] == asynchronous
+    assert loaded.header["label"] == "control"
+    assert loaded.series.shape == (5, 20, 6)
+    expected = bd.stitch_series(rbn, 5, 20, seed=7, asynchronous=asynchronous)
+    assert np.array_equal(loaded.stitched, expected)
+    assert np.array_equal(np.concatenate(list(loaded.iter_chunks(7)), axis=1),
+            expected)
+    with pytest.raises(ValueError):
+        # opened read-only
+        loaded.series[0, 0, 0] = 1
+
+def test_store_series(rbn, tmp_path):
+    filename = str(tmp_path / "series.bds")
+    seed = np.random.SeedSequence(5).spawn(2)[1]
+    states = bd.unique_states(8, 6, seed=1)
+    store = bd.store_series(filename, rbn, states, 12, seed=seed,
+            asynchronous="random-sequential")
+    record = bd.SeriesStore(filename).header["seed"]
+    assert record == {"entropy": seed.entropy, "spawn_key": [1]}
+    # the record reproduces the series
+    replay = rbn.ensemble_series(states, 12, asynchronous="random-sequential",
+            seed=np.random.SeedSequence(record["entropy"],
+            spawn_key=record["spawn_key"]))
+    assert np.array_equal(bd.SeriesStore(filename).series, replay)
+    assert np.array_equal(store.series, replay)
+
+def test_network_hash(rbn):
+    assert bd.network_hash(rbn) == bd.network_hash(rbn.copy())
+    other = rbn.copy()
+    other.clamp(2, 1)
+    assert bd.network_hash(other) != bd.network_hash(rbn)
+
+def test_invalid_store(tmp_path):
+    filename = tmp_path / "other.bin"
+    filename.write_bytes(b"NOTASTORE" + b"\0" * 64)
+    with pytest.raises(bd.BooleanDynamicsError):
+        bd.SeriesStore(str(filename))
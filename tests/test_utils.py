@@ -0,0 +1,109 @@
+# -*- coding: utf-8 -*-
+
+
+"""
+========================
+Boolean Dynamics Utility
+========================
+
+:Author:
+    Moritz Emanuel Beber
+:Date:
+    2026-10-18
+:Copyright:
+    Copyright |c| 2026, Jacobs University Bremen gGmbH, all rights reserved.
+:File:
+    test_utils.py
+
+.. |c| unicode:: U+A9
+"""
+
+
+from __future__ import (absolute_import, unicode_literals)
+
+
+import numpy as np
+import pytest
+
+import booleandynamics as bd
+from booleandynamics.utils import contiguous_blocks
+
+import reference as ref
+
+
+WINDOWS = [(4, 0), (4, 1), (4, 3), (6, 2), (5, 0)]
+
+
+@pytest.fixture(params=[20, 23, 3], ids="length={}".format)
+def series(request):
+    # a length of 3 is shorter than any window
+    return np.random.default_rng(11).integers(2, size=(6, request.param),
+            dtype=np.ubyte)
+
+
+@pytest.mark.parametrize("size,overlap", WINDOWS)
+def test_window_counts(series, size, overlap):
+    counts = bd.window_counts(series, size, overlap)
+    assert counts.shape[0] == len(series)
+    assert counts.tolist() == ref.window_counts(series.tolist(), size,
+            overlap)
+
+@pytest.mark.parametrize("size,overlap", WINDOWS)
+def test_contiguous_blocks(series, size, overlap):
+    blocks = contiguous_blocks(series, size, overlap)
+    for (i, block) in enumerate(blocks):
+        start = i * (size - overlap)
+        assert block.tolist() == series[:, start:start + size].tolist()
+    assert blocks.sum(axis=2).T.tolist() == ref.window_counts(
+            series.tolist(), size, overlap)
+
+@pytest.mark.parametrize("size,overlap", WINDOWS)
+def test_to_expression(series, size, overlap):
+    counts = np.array(ref.window_counts(series.tolist(), size, overlap),
+            dtype=float).reshape((len(series), -1))
+    assert np.allclose(bd.to_expression(series, size, "total", overlap),
+            counts / series.sum())
+    with np.errstate(invalid="ignore"):
+        assert np.allclose(bd.to_expression(series, size, "window", overlap),
+                counts / counts.sum(axis=0), equal_nan=True)
+
+def split(series, lengths):
+    bounds = np.cumsum(lengths)
+    return np.split(series, bounds[bounds < series.shape[1]], axis=1)
+
+@pytest.mark.parametrize("lengths", [[1], [3, 1, 7], [50]])
+@pytest.mark.parametrize("size,overlap", WINDOWS)
+def test_iter_window_counts(series, size, overlap, lengths):
+    chunks = split(series, lengths * series.shape[1])
+    counts = list(bd.iter_window_counts(iter(chunks), size, overlap))
+    expected = bd.window_counts(series, size, overlap)
+    if len(counts) == 0:
+        assert expected.shape[1] == 0
+    else:
+        assert np.array_equal(np.concatenate(counts, axis=1), expected)
+
+@pytest.mark.parametrize("norm", ["window", "total"])
+@pytest.mark.parametrize("size,overlap", WINDOWS)
+def test_chunked_expression(series, size, overlap, norm):
+    chunks = split(series, [3, 1, 7] * series.shape[1])
+    with np.errstate(invalid="ignore"):
+        assert np.allclose(bd.to_expression(iter(chunks), size, norm,
+                overlap), bd.to_expression(series, size, norm, overlap),
+                equal_nan=True)
+
+@pytest.mark.parametrize("asynchronous", [False, "random-single"])
+def test_simulated_expression(asynchronous):
+    rbn = ref.small_network(8, 20, "majority", 2)
+    expected = bd.to_expression(rbn.time_series(200, asynchronous=asynchronous,
+            seed=1), 10, "total", 3)
+    result = bd.to_expression(rbn.iter_series(200, chunk=16,
+            asynchronous=asynchronous, seed=1), 10, "total", 3)
+    assert np.allclose(result, expected)
+
+def test_invalid_windows(series):
+    with pytest.raises(ValueError):
+        bd.window_counts(series, 4, 4)
+    with pytest.raises(ValueError):
+        bd.window_counts(series, 4, -1)
+    with pytest.raises(ValueError):
+        bd.to_expression(series, 4, "mean")